@@ -0,0 +1,99 @@
+import platform
+import re
+import tempfile
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from benchmarks.suite import (
+    BENCHMARKS,
+    compare,
+    load_baseline,
+    measure,
+    save_baseline,
+)
+from external_resources_io.concurrency import gil_enabled
+from external_resources_io.exit_status import EXIT_ERROR
+
+app = typer.Typer()
+
+DEFAULT_BASELINE = Path(".benchmarks/baseline.json")
+
+
+def _format_ratio(ratio: float | None) -> str:
+    return "-" if ratio is None else f"{ratio:.2f}x"
+
+
+@app.command(name="list")
+def list_benchmarks() -> None:
+    """List all registered benchmarks."""
+    for name in BENCHMARKS:
+        typer.echo(name)
+
+
+@app.command()
+def run(
+    *,
+    filter_: Annotated[
+        str | None,
+        typer.Option("--filter", help="Only run benchmarks matching this regex"),
+    ] = None,
+    repeat: Annotated[int, typer.Option(help="Timed runs per benchmark")] = 5,
+    baseline: Annotated[
+        Path, typer.Option(help="Baseline file to compare against", dir_okay=False)
+    ] = DEFAULT_BASELINE,
+    save: Annotated[
+        bool, typer.Option(help="Store the results as the new baseline")
+    ] = False,
+    time_tolerance: Annotated[
+        float, typer.Option(help="Allowed relative slowdown, e.g. 0.2 = 20%")
+    ] = 0.2,
+    memory_tolerance: Annotated[
+        float, typer.Option(help="Allowed relative peak memory increase")
+    ] = 0.1,
+) -> None:
+    """Run the benchmarks and compare them against the stored baseline."""
+    pattern = re.compile(filter_ or "")
+    baseline_results = load_baseline(baseline)
+    results = []
+    regressions = []
+    typer.echo(
+        f"Python {platform.python_version()}, "
+        f"GIL {'enabled' if gil_enabled() else 'disabled'}"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, benchmark in BENCHMARKS.items():
+            if not pattern.search(name):
+                continue
+            result = measure(benchmark, Path(workdir), repeat)
+            results.append(result)
+            comparison = compare(
+                result,
+                baseline_results.get(name),
+                time_tolerance=time_tolerance,
+                memory_tolerance=memory_tolerance,
+            )
+            if comparison.regression:
+                regressions.append(name)
+            typer.echo(
+                f"{name:<50} {result.seconds * 1000:>10.2f} ms "
+                f"({_format_ratio(comparison.time_ratio):>6}) "
+                f"{result.peak_bytes / 1024 / 1024:>10.2f} MiB "
+                f"({_format_ratio(comparison.memory_ratio):>6})"
+                + (" REGRESSION" if comparison.regression else "")
+            )
+
+    if save:
+        # keep baseline entries of benchmarks which haven't been run
+        merged = {**baseline_results, **{result.name: result for result in results}}
+        save_baseline(baseline, list(merged.values()))
+        typer.echo(f"Baseline saved to {baseline}")
+
+    if regressions and not save:
+        typer.echo(f"{len(regressions)} regression(s) found", err=True)
+        raise typer.Exit(EXIT_ERROR)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,278 @@
+# ruff: file-ignore[suspicious-non-cryptographic-random-usage]
+"""Synthetic data generators for the benchmark suite."""
+
+import json
+import random
+import string
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, create_model
+
+from external_resources_io.input import AppInterfaceProvision
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_ACTIONS: list[list[str]] = [
+    ["no-op"],
+    ["create"],
+    ["update"],
+    ["delete"],
+    ["delete", "create"],
+]
+
+
+class Rule(BaseModel):
+    name: str
+    protocol: str
+    from_port: int
+    to_port: int
+    cidr_blocks: list[str]
+    description: str | None = None
+
+
+class Data(BaseModel):
+    identifier: str
+    region: str
+    tags: dict[str, str]
+    inline_policy: str
+    rules: list[Rule]
+
+
+class AppInterfaceInput(BaseModel):
+    data: Data
+    provision: AppInterfaceProvision
+
+
+class Documents(BaseModel):
+    policies: dict[str, str]
+    certificates: list[str]
+
+
+def documents(count: int, size: int) -> Documents:
+    """`count` policies and certificates of `size` bytes each."""
+    return Documents(
+        policies={f"policy-{i}": "p" * size for i in range(count)},
+        certificates=["c" * size for _ in range(count)],
+    )
+
+
+def provision() -> dict[str, Any]:
+    return {
+        "provision_provider": "aws",
+        "provisioner": "aws-account-01",
+        "provider": "aws-iam-role",
+        "identifier": "benchmark-01",
+        "target_cluster": "cluster-01",
+        "target_namespace": "namespace-01",
+        "target_secret_name": "benchmark-01",
+        "module_provision_data": {
+            "tf_state_bucket": "benchmark-state",
+            "tf_state_region": "us-east-1",
+            "tf_state_key": "aws/aws-account-01/aws-iam-role/benchmark-01/terraform.state",
+        },
+    }
+
+
+def large_input(rules: int) -> dict[str, Any]:
+    """App-interface input with `rules` entries and a policy of matching size."""
+    statements = [
+        {
+            "Effect": "Allow",
+            "Action": [f"service-{i}:Describe*"],
+            "Resource": [f"arn:aws:service-{i}:::resource/*"],
+        }
+        for i in range(rules)
+    ]
+    return {
+        "data": {
+            "identifier": "benchmark-01",
+            "region": "us-east-1",
+            "tags": {f"tag-{i}": f"value-{i}" for i in range(min(rules, 50))},
+            "inline_policy": json.dumps({
+                "Version": "2012-10-17",
+                "Statement": statements,
+            }),
+            "rules": [
+                {
+                    "name": f"rule-{i}",
+                    "protocol": "tcp",
+                    "from_port": i % 65535,
+                    "to_port": i % 65535,
+                    "cidr_blocks": [f"10.{i % 256}.0.0/16", f"10.{i % 256}.1.0/24"],
+                    "description": f"rule {i}" if i % 2 else None,
+                }
+                for i in range(rules)
+            ],
+        },
+        "provision": provision(),
+    }
+
+
+def _resource_change(i: int, *, no_op: bool) -> dict[str, Any]:
+    module = f"module.mod_{i % 10}" if i % 3 else None
+    address = f"aws_instance.res_{i}"
+    values = {
+        "ami": f"ami-{i:08x}",
+        "instance_type": "t3.micro",
+        "tags": {"Name": f"res-{i}", "index": str(i)},
+    }
+    return {
+        "address": f"{module}.{address}" if module else address,
+        "module_address": module,
+        "mode": "managed",
+        "type": "aws_instance",
+        "name": f"res_{i}",
+        "provider_name": "registry.terraform.io/hashicorp/aws",
+        "change": {
+            "actions": ["no-op"] if no_op else _ACTIONS[i % len(_ACTIONS)],
+            "before": values,
+            "after": {**values, "instance_type": "t3.small"},
+            "after_unknown": {"id": True},
+            "before_sensitive": {},
+            "after_sensitive": {},
+        },
+    }
+
+
+def plan(resource_changes: int, *, no_op: bool = False) -> dict[str, Any]:
+    """Terraform JSON plan with `resource_changes` resource changes."""
+    changes = [_resource_change(i, no_op=no_op) for i in range(resource_changes)]
+    return {
+        "format_version": "1.2",
+        "terraform_version": "1.13.4",
+        "planned_values": {"root_module": {}},
+        "resource_changes": changes,
+        "output_changes": {
+            "arn": {
+                "actions": ["no-op"],
+                "before": "arn",
+                "after": "arn",
+                "after_unknown": False,
+            }
+        },
+        "prior_state": {},
+        "configuration": {},
+        "relevant_attributes": [
+            {"resource": change["address"], "attribute": ["tags"]}
+            for change in changes[::10]
+        ],
+        "timestamp": "2025-01-01T00:00:00Z",
+        "errored": False,
+    }
+
+
+def write_plan(path: Path, resource_changes: int, *, no_op: bool = False) -> Path:
+    path.write_text(json.dumps(plan(resource_changes, no_op=no_op)), encoding="utf-8")
+    return path
+
+
+def provider_schema(resource_types: int, attributes: int) -> dict[str, Any]:
+    """`terraform providers schema -json` output of a single AWS provider.
+
+    aws_instance, the type of the resources of `plan()`, is one of the types.
+    """
+    block = {
+        "attributes": {
+            f"attr_{i}": {
+                "type": "string",
+                "description": "".join(random.choices(string.ascii_letters, k=200)),
+                "optional": True,
+                "sensitive": i % 10 == 0,
+            }
+            for i in range(attributes)
+        }
+        | {"tags": {"type": ["map", "string"], "optional": True}},
+        "block_types": {
+            "timeouts": {
+                "nesting_mode": "single",
+                "block": {"attributes": {"create": {"type": "string"}}},
+            }
+        },
+    }
+    names = ["aws_instance", *(f"aws_type_{i}" for i in range(resource_types - 1))]
+    return {
+        "format_version": "1.0",
+        "provider_schemas": {
+            "registry.terraform.io/hashicorp/aws": {
+                "resource_schemas": {
+                    name: {"version": 0, "block": block} for name in names
+                }
+            }
+        },
+    }
+
+
+def state_values(resources: int, depth: int) -> dict[str, Any]:
+    """State values with `resources` resources in modules nested `depth` deep."""
+    modules: list[dict[str, Any]] = []
+    address: str | None = None
+    for level in range(depth + 1):
+        module: dict[str, Any] = {"resources": [], "child_modules": []}
+        if level:
+            address = f"{address}.module.mod_{level}" if address else "module.mod_1"
+            module["address"] = address
+            modules[-1]["child_modules"].append(module)
+        modules.append(module)
+    for i in range(resources):
+        module = modules[i % len(modules)]
+        prefix = f"{module['address']}." if "address" in module else ""
+        module["resources"].append({
+            "address": f"{prefix}aws_instance.res_{i}",
+            "mode": "managed",
+            "type": "aws_instance",
+            "name": f"res_{i}",
+            "provider_name": "registry.terraform.io/hashicorp/aws",
+            "values": {"ami": f"ami-{i:08x}", "instance_type": "t3.micro"},
+        })
+    return {"root_module": modules[0]}
+
+
+def nested_model(depth: int, width: int) -> type[BaseModel]:
+    """Model nested `depth` levels deep with `width` scalar fields per level."""
+    model: type[BaseModel] = create_model(
+        "Level0", **{f"field_{i}": (str, f"value-{i}") for i in range(width)}
+    )
+    for level in range(1, depth + 1):
+        model = create_model(
+            f"Level{level}",
+            child=(model, ...),
+            children=(list[model], []),  # type: ignore[valid-type]
+            **{f"field_{i}": (int | None, None) for i in range(width)},
+        )
+    return model
+
+
+def nested_data(depth: int, width: int, fanout: int = 2) -> dict[str, Any]:
+    """Data matching `nested_model(depth, width)`."""
+    data: dict[str, Any] = {f"field_{i}": f"value-{i}" for i in range(width)}
+    for _ in range(depth):
+        data = {
+            "child": data,
+            "children": [data] * fanout,
+            **{f"field_{i}": i for i in range(width)},
+        }
+    return data
+
+
+def secrets(count: int) -> list[str]:
+    """Distinct random looking secrets of 16 to 40 characters."""
+    rng = random.Random(count)
+    alphabet = string.ascii_letters + string.digits
+    return ["".join(rng.choices(alphabet, k=rng.randint(16, 40))) for _ in range(count)]
+
+
+def terraform_output(size: int, secrets: list[str]) -> str:
+    """Terraform like output of about `size` characters leaking some secrets."""
+    rng = random.Random(size)
+    lines = []
+    length = 0
+    while length < size:
+        i = len(lines)
+        value = secrets[i % len(secrets)] if i % 50 == 0 else f"value-{i}"
+        line = (
+            f'  # aws_instance.res_{i} will be updated\n      ~ attr_{i} = "{value}"\n'
+        )
+        lines.append(line if rng.random() > 0.1 else line.upper())  # ruff: ignore[magic-value-comparison]
+        length += len(line)
+    return "".join(lines)
@@ -0,0 +1,446 @@
+"""Benchmark registry, measurement and baseline comparison."""
+
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from benchmarks import data
+from external_resources_io.concurrency import gil_enabled
+from external_resources_io.input import parse_model, parse_models
+from external_resources_io.redact import Redactor
+from external_resources_io.terraform.generators import (
+    create_tf_vars_json,
+    create_variables_tf_file,
+)
+from external_resources_io.terraform.plan import (
+    Action,
+    Plan,
+    TerraformJsonPlanParser,
+    parse_plans,
+)
+from external_resources_io.terraform.plan_cache import PlanCache
+from external_resources_io.terraform.policy import PolicyEngine, Rule
+from external_resources_io.terraform.provider_schema import (
+    ProviderSchemaCache,
+    ProviderSchemaIndex,
+    index_schema,
+)
+from external_resources_io.terraform.state import StateView
+from external_resources_io.terraform.stream import (
+    ExportFormat,
+    export_resource_changes,
+    plan_has_changes,
+)
+
+# A setup function prepares all inputs in the given working directory and
+# returns the callable to be measured.
+type Setup = Callable[[Path], Callable[[], object]]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Setup
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    seconds: float
+    peak_bytes: int
+
+
+@dataclass(frozen=True)
+class Comparison:
+    result: Result
+    baseline: Result | None
+    time_ratio: float | None
+    memory_ratio: float | None
+    regression: bool
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def register(name: str, setup: Setup) -> None:
+    if name in BENCHMARKS:
+        raise ValueError(f"Benchmark {name} is already registered")
+    BENCHMARKS[name] = Benchmark(name=name, setup=setup)
+
+
+def measure(benchmark: Benchmark, workdir: Path, repeat: int) -> Result:
+    """Run a benchmark and return its median wall time and its peak memory.
+
+    Time and memory are measured in separate runs because tracemalloc slows
+    down the code under test considerably.
+    """
+    func = benchmark.setup(workdir)
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(
+        name=benchmark.name, seconds=statistics.median(timings), peak_bytes=peak
+    )
+
+
+def load_baseline(path: Path) -> dict[str, Result]:
+    if not path.exists():
+        return {}
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    return {name: Result(**result) for name, result in baseline["results"].items()}
+
+
+def save_baseline(path: Path, results: list[Result]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline: dict[str, Any] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        # results of GIL and free-threaded builds aren't comparable
+        "gil": gil_enabled(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(
+    result: Result,
+    baseline: Result | None,
+    *,
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> Comparison:
+    """Compare a result with its baseline. Ratios > 1 mean slower or bigger."""
+    if baseline is None:
+        return Comparison(
+            result=result,
+            baseline=None,
+            time_ratio=None,
+            memory_ratio=None,
+            regression=False,
+        )
+    time_ratio = result.seconds / baseline.seconds if baseline.seconds else 1.0
+    memory_ratio = (
+        result.peak_bytes / baseline.peak_bytes if baseline.peak_bytes else 1.0
+    )
+    return Comparison(
+        result=result,
+        baseline=baseline,
+        time_ratio=time_ratio,
+        memory_ratio=memory_ratio,
+        regression=time_ratio > 1 + time_tolerance
+        or memory_ratio > 1 + memory_tolerance,
+    )
+
+
+#
+# Benchmarks
+#
+def _parse_large_input(
+    workdir: Path,  # ruff: ignore[unused-function-argument]
+    rules: int,
+) -> Callable[[], object]:
+    ai_input = data.large_input(rules)
+    return lambda: parse_model(data.AppInterfaceInput, ai_input)
+
+
+def _tf_vars_json(
+    workdir: Path, rules: int, *, canonical: bool = False
+) -> Callable[[], object]:
+    ai_input = parse_model(data.AppInterfaceInput, data.large_input(rules))
+    output = workdir / f"terraform-{rules}-{canonical}.tfvars.json"
+    return lambda: create_tf_vars_json(ai_input.data, output, canonical=canonical)
+
+
+def _tf_vars_json_documents(
+    workdir: Path, *, streaming: bool, size: int
+) -> Callable[[], object]:
+    documents = data.documents(count=10, size=size)
+    output = workdir / f"terraform-documents-{size}.tfvars.json"
+    return lambda: create_tf_vars_json(documents, output, streaming=streaming)
+
+
+def _parse_nested(
+    workdir: Path,  # ruff: ignore[unused-function-argument]
+    depth: int,
+) -> Callable[[], object]:
+    model = data.nested_model(depth, width=5)
+    nested = data.nested_data(depth, width=5)
+    return lambda: parse_model(model, nested)
+
+
+def _variables_tf(workdir: Path, depth: int, *, force: bool) -> Callable[[], object]:
+    model = data.nested_model(depth, width=5)
+    output = workdir / f"variables-{depth}-{force}.tf"
+    return lambda: create_variables_tf_file(model, output, force=force)
+
+
+def _parse_plan(workdir: Path, changes: int) -> Callable[[], object]:
+    plan_file = data.write_plan(workdir / f"plan-{changes}.json", changes)
+    return lambda: TerraformJsonPlanParser(str(plan_file)).plan
+
+
+# same number of threads and processes, whatever the CPU count
+BULK_WORKERS = 4
+
+
+def _parse_plan_file(plan_path: str) -> Plan:
+    # module level, process pools pickle it by reference
+    return TerraformJsonPlanParser(plan_path).plan
+
+
+def _bulk[T](
+    executor: str, fn: Callable[[T], object], items: list[T]
+) -> Callable[[], object]:
+    """fn over all items, serially or in a process pool."""
+    if executor == "serial":
+        return lambda: [fn(item) for item in items]
+
+    def processes() -> object:
+        # a pool per call, its startup is part of the price
+        with ProcessPoolExecutor(BULK_WORKERS) as pool:
+            return list(pool.map(fn, items))
+
+    return processes
+
+
+def _parse_models(
+    workdir: Path,  # ruff: ignore[unused-function-argument]
+    inputs: int,
+    executor: str,
+) -> Callable[[], object]:
+    items = [data.large_input(1_000) for _ in range(inputs)]
+    if executor == "threads":
+        return lambda: parse_models(
+            data.AppInterfaceInput, items, max_workers=BULK_WORKERS
+        )
+    return _bulk(executor, partial(parse_model, data.AppInterfaceInput), items)
+
+
+def _parse_plans(
+    workdir: Path, plans: int, changes: int, executor: str
+) -> Callable[[], object]:
+    paths = [
+        str(data.write_plan(workdir / f"plan-{changes}-{i}.json", changes))
+        for i in range(plans)
+    ]
+    if executor == "threads":
+        return lambda: parse_plans(paths, max_workers=BULK_WORKERS)
+    return _bulk(executor, _parse_plan_file, paths)
+
+
+def _plan_index(workdir: Path, changes: int) -> Callable[[], object]:
+    plan_file = data.write_plan(workdir / f"plan-{changes}.json", changes)
+    cache = PlanCache(workdir / "plan-cache")
+    # warm up the cache, only cache hits are measured
+    _ = TerraformJsonPlanParser(str(plan_file), cache=cache).index
+    return lambda: TerraformJsonPlanParser(str(plan_file), cache=cache).index
+
+
+def _state_lookup(
+    workdir: Path,  # ruff: ignore[unused-function-argument]
+    resources: int,
+    depth: int,
+) -> Callable[[], object]:
+    values = data.state_values(resources, depth)
+    addresses = [resource.address for resource in StateView(values)]
+
+    def lookup() -> object:
+        view = StateView(values)
+        return [view.attributes(address) for address in addresses]
+
+    return lookup
+
+
+def _policy(
+    workdir: Path,  # ruff: ignore[unused-function-argument]
+    changes: int,
+    rules: int,
+) -> Callable[[], object]:
+    plan = Plan.model_validate(data.plan(changes))
+    engine = PolicyEngine(
+        Rule(
+            name=f"rule-{i}",
+            # only the first rule applies to the resources of the plan
+            resource_types=["aws_instance" if i == 0 else f"aws_type_{i}"],
+            actions=[Action.ActionDelete],
+            exclude_addresses=["module.mod_0.*"],
+        )
+        for i in range(rules)
+    )
+    return lambda: engine.check(plan)
+
+
+def _provider_schema(
+    workdir: Path, resource_types: int, *, cached: bool
+) -> Callable[[], object]:
+    aws = "registry.terraform.io/hashicorp/aws"
+    plan = Plan.model_validate(data.plan(10_000))
+    output = json.dumps(data.provider_schema(resource_types, attributes=50))
+    paths = [["tags", "Name"], ["timeouts", "create"], ["attr_0"]]
+
+    def lookup(index: ProviderSchemaIndex) -> object:
+        return [
+            index.attribute(rc.type, path, provider=rc.provider_name)
+            for rc in plan.resource_changes
+            for path in paths
+        ]
+
+    if not cached:
+        # what every check did before: parse and index the whole output
+        def parse() -> object:
+            schemas = json.loads(output)["provider_schemas"][aws]["resource_schemas"]
+            attributes = {name: index_schema(s) for name, s in schemas.items()}
+            return [
+                attributes[rc.type].get(tuple(path))
+                for rc in plan.resource_changes
+                for path in paths
+            ]
+
+        return parse
+
+    cache = ProviderSchemaCache(workdir / f"provider-schemas-{resource_types}")
+    cache.put(aws, "5.0.0", json.loads(output)["provider_schemas"][aws])
+
+    def cached_lookup() -> object:
+        index = ProviderSchemaIndex(cache, {aws: "5.0.0"})
+        index.load_plan(plan)
+        return lookup(index)
+
+    return cached_lookup
+
+
+def _plan_has_changes(workdir: Path, changes: int) -> Callable[[], object]:
+    plan_file = data.write_plan(
+        workdir / f"plan-{changes}-no-op.json", changes, no_op=True
+    )
+    return lambda: plan_has_changes(plan_file)
+
+
+def _export_changes(
+    workdir: Path, changes: int, export_format: ExportFormat
+) -> Callable[[], object]:
+    plan_file = data.write_plan(workdir / f"plan-{changes}.json", changes)
+    output = workdir / f"changes-{changes}.{export_format}"
+    return lambda: export_resource_changes(
+        plan_file, output, export_format=export_format, changed_attributes=True
+    )
+
+
+def _redact(
+    workdir: Path,  # ruff: ignore[unused-function-argument]
+    secrets: int,
+    *,
+    stream: bool,
+) -> Callable[[], object]:
+    redactor = Redactor(data.secrets(secrets))
+    output = data.terraform_output(5_000_000, data.secrets(secrets))
+    if not stream:
+        return lambda: redactor.redact(output)
+    lines = output.splitlines(keepends=True)
+    return lambda: "".join(redactor.redact_stream(lines))
+
+
+for rules in (100, 1_000, 10_000):
+    register(
+        f"input.parse_model[rules={rules}]", partial(_parse_large_input, rules=rules)
+    )
+    register(
+        f"generators.tf_vars_json[rules={rules}]", partial(_tf_vars_json, rules=rules)
+    )
+    register(
+        f"generators.tf_vars_json[rules={rules}, canonical]",
+        partial(_tf_vars_json, rules=rules, canonical=True),
+    )
+
+for size in (100_000, 1_000_000):
+    for streaming in (False, True):
+        register(
+            f"generators.tf_vars_json[documents=10x{size}, streaming={streaming}]",
+            partial(_tf_vars_json_documents, streaming=streaming, size=size),
+        )
+
+for depth in (4, 8):
+    register(f"input.parse_model[depth={depth}]", partial(_parse_nested, depth=depth))
+    register(
+        f"generators.variables_tf[depth={depth}]",
+        partial(_variables_tf, depth=depth, force=True),
+    )
+    register(
+        f"generators.variables_tf[depth={depth}, unchanged]",
+        partial(_variables_tf, depth=depth, force=False),
+    )
+
+for changes in (1_000, 10_000, 100_000):
+    register(f"plan.parse[changes={changes}]", partial(_parse_plan, changes=changes))
+    register(
+        f"plan.index[changes={changes}, cached]",
+        partial(_plan_index, changes=changes),
+    )
+
+# compare the same benchmarks of a GIL and a free-threaded build (python3.14t)
+for executor in ("serial", "threads", "processes"):
+    register(
+        f"input.parse_models[inputs=32, rules=1000, executor={executor}]",
+        partial(_parse_models, inputs=32, executor=executor),
+    )
+    register(
+        f"plan.parse_plans[plans=8, changes=10000, executor={executor}]",
+        partial(_parse_plans, plans=8, changes=10_000, executor=executor),
+    )
+
+for cached in (False, True):
+    register(
+        f"provider_schema.lookup[types=1500, changes=10000, cached={cached}]",
+        partial(_provider_schema, resource_types=1_500, cached=cached),
+    )
+
+for changes in (1_000, 100_000):
+    register(
+        f"plan.has_changes[changes={changes}, no-op]",
+        partial(_plan_has_changes, changes=changes),
+    )
+
+for export_format in ExportFormat:
+    register(
+        f"plan.export[changes=100000, format={export_format}]",
+        partial(_export_changes, changes=100_000, export_format=export_format),
+    )
+
+for resources in (1_000, 10_000):
+    register(
+        f"plan.state_lookup[resources={resources}, depth=20]",
+        partial(_state_lookup, resources=resources, depth=20),
+    )
+
+for rules in (1, 50):
+    register(
+        f"plan.policy[changes=100000, rules={rules}]",
+        partial(_policy, changes=100_000, rules=rules),
+    )
+
+for secrets in (10, 1_000):
+    for stream in (False, True):
+        register(
+            f"redact.redact[secrets={secrets}, size=5MB, stream={stream}]",
+            partial(_redact, secrets=secrets, stream=stream),
+        )
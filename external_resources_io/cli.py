@@ -1,20 +1,32 @@
-import importlib
 from pathlib import Path
-from typing import Annotated, Protocol, cast
-
-from pydantic import BaseModel
+from typing import TYPE_CHECKING, Annotated, cast
 
 from external_resources_io.config import Config, EnvVar
+from external_resources_io.exit_status import EXIT_ERROR, EXIT_SKIP
 from external_resources_io.input import (
-    AppInterfaceProvision,
+    AppInterfaceInputInterface,
     parse_model,
     read_input_from_file,
+    resolve_app_interface_class,
+    resolve_app_interface_data_class,
 )
+from external_resources_io.profiling import profiled
+from external_resources_io.server import Server
 from external_resources_io.terraform.generators import (
     create_backend_tf_file,
+    create_terraform_files,
     create_tf_vars_json,
     create_variables_tf_file,
+    variables_tf_up_to_date,
+)
+from external_resources_io.terraform.outputs import (
+    SensitiveOutputs,
+    create_outputs_file,
 )
+from external_resources_io.terraform.stream import plan_has_changes
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
 
 try:
     import typer
@@ -30,30 +42,12 @@ app.add_typer(tf_app, name="tf")
 config = Config()
 
 
-class AppInterfaceInputInterface(Protocol):
-    data: BaseModel
-    provision: AppInterfaceProvision
-
-
 def _get_app_interface_class(app_interface_input_class: str) -> type[BaseModel]:
-    ai_module_name, ai_class_name = app_interface_input_class.rsplit(".", maxsplit=1)
-    ai_class = getattr(importlib.import_module(ai_module_name), ai_class_name)
-    if not issubclass(ai_class, BaseModel):
-        raise TypeError(
-            f"{app_interface_input_class} must be a subclass of pydantic.BaseModel"
-        )
-    return ai_class
+    return resolve_app_interface_class(app_interface_input_class)
 
 
 def _get_app_interface_data_class(app_interface_input_class: str) -> type[BaseModel]:
-    data_class = (
-        _get_app_interface_class(app_interface_input_class)
-        .model_fields["data"]
-        .annotation
-    )
-    if not data_class or not issubclass(data_class, BaseModel):
-        raise TypeError(f"{data_class} must be a subclass of pydantic.BaseModel")
-    return data_class
+    return resolve_app_interface_data_class(app_interface_input_class)
 
 
 def _get_ai_input(
@@ -70,6 +64,7 @@ def _get_ai_input(
 
 
 @tf_app.command()
+@profiled
 def generate_variables_tf(
     app_interface_input_class: Annotated[
         str,
@@ -87,14 +82,29 @@ def generate_variables_tf(
             envvar=EnvVar.OUTPUTS_FILE,
         ),
     ] = Path(config.variables_tf_file),
+    *,
+    check: Annotated[
+        bool,
+        typer.Option(
+            help="Only check whether the output file is up to date with the input class"
+        ),
+    ] = False,
 ) -> None:
-    """Generates Terraform variables.tf file."""
-    create_variables_tf_file(
-        _get_app_interface_data_class(app_interface_input_class), output
-    )
+    """Generates Terraform variables.tf file.
+
+    The generation is skipped if the file is already up to date with the input class.
+    """
+    data_class = _get_app_interface_data_class(app_interface_input_class)
+    if check:
+        if not variables_tf_up_to_date(data_class, output):
+            typer.echo(f"{output} is outdated", err=True)
+            raise typer.Exit(EXIT_ERROR)
+        return
+    create_variables_tf_file(data_class, output)
 
 
 @tf_app.command()
+@profiled
 def generate_backend_tf(
     app_interface_input_class: Annotated[
         str,
@@ -129,6 +139,7 @@ def generate_backend_tf(
 
 
 @tf_app.command()
+@profiled
 def generate_tf_vars_json(
     app_interface_input_class: Annotated[
         str,
@@ -156,10 +167,161 @@ def generate_tf_vars_json(
             envvar=EnvVar.OUTPUTS_FILE,
         ),
     ] = Path(config.tf_vars_file),
+    *,
+    canonical: Annotated[
+        bool,
+        typer.Option(
+            help="Byte-identical output for semantically identical inputs (sorted keys and sets)"
+        ),
+    ] = False,
 ) -> None:
     """Generates Terraform tfvars.json file."""
     ai_input = _get_ai_input(app_interface_input_class, input_file)
-    create_tf_vars_json(ai_input.data, output)
+    create_tf_vars_json(ai_input.data, output, canonical=canonical)
+
+
+@tf_app.command()
+@profiled
+def generate_all(
+    app_interface_input_class: Annotated[
+        str,
+        typer.Argument(
+            help="App interface input class. E.g. your_module_name.input.AppInterfaceInput",
+            show_default=False,
+        ),
+    ],
+    input_file: Annotated[
+        Path,
+        typer.Argument(
+            help="The App interface input json file",
+            show_default=False,
+            readable=True,
+            file_okay=True,
+            envvar=EnvVar.INPUT_FILE,
+        ),
+    ],
+    backend_tf: Annotated[
+        Path,
+        typer.Option(
+            help="Output backend.tf file",
+            dir_okay=False,
+            writable=True,
+            envvar=EnvVar.BACKEND_TF_FILE,
+        ),
+    ] = Path(config.backend_tf_file),
+    tf_vars_json: Annotated[
+        Path,
+        typer.Option(
+            help="Output tfvars.json file",
+            dir_okay=False,
+            writable=True,
+            envvar=EnvVar.TF_VARS_FILE,
+        ),
+    ] = Path(config.tf_vars_file),
+    variables_tf: Annotated[
+        Path,
+        typer.Option(
+            help="Output variables.tf file",
+            dir_okay=False,
+            writable=True,
+            envvar=EnvVar.VARIABLES_TF_FILE,
+        ),
+    ] = Path(config.variables_tf_file),
+    *,
+    canonical: Annotated[
+        bool,
+        typer.Option(
+            help="Byte-identical tfvars.json for semantically identical inputs (sorted keys and sets)"
+        ),
+    ] = False,
+) -> None:
+    """Generates the Terraform backend.tf, tfvars.json and variables.tf files at once."""
+    create_terraform_files(
+        _get_ai_input(app_interface_input_class, input_file),
+        backend_tf_file=backend_tf,
+        tf_vars_file=tf_vars_json,
+        variables_tf_file=variables_tf,
+        canonical=canonical,
+    )
+
+
+@tf_app.command()
+@profiled
+def generate_outputs(
+    output: Annotated[
+        Path,
+        typer.Option(
+            help="Output file",
+            dir_okay=False,
+            writable=True,
+            envvar=EnvVar.OUTPUTS_FILE,
+        ),
+    ] = Path(config.outputs_file),
+    plan: Annotated[
+        Path | None,
+        typer.Option(
+            help="Terraform JSON plan file, used with --only-changed",
+            dir_okay=False,
+            readable=True,
+            envvar=EnvVar.PLAN_FILE_JSON,
+        ),
+    ] = None,
+    sensitive: Annotated[
+        SensitiveOutputs, typer.Option(help="How to handle sensitive outputs")
+    ] = SensitiveOutputs.KEEP,
+    *,
+    only_changed: Annotated[
+        bool,
+        typer.Option(help="Only write the outputs changed by the plan"),
+    ] = False,
+) -> None:
+    """Writes the Terraform outputs (terraform output -json) to the outputs file."""
+    create_outputs_file(
+        output, plan_file=plan, only_changed=only_changed, sensitive=sensitive
+    )
+
+
+@tf_app.command()
+@profiled
+def has_changes(
+    plan: Annotated[
+        Path,
+        typer.Option(
+            help="Terraform JSON plan file",
+            dir_okay=False,
+            readable=True,
+            envvar=EnvVar.PLAN_FILE_JSON,
+        ),
+    ] = Path(config.plan_file_json),
+) -> None:
+    """Exits with EXIT_SKIP (42) if the Terraform JSON plan doesn't change anything.
+
+    Only the actions of the plan are read, which is much faster than parsing it.
+    """
+    if not plan_has_changes(plan):
+        raise typer.Exit(EXIT_SKIP)
+
+
+@app.command()
+def serve(
+    socket: Annotated[
+        Path | None,
+        typer.Option(
+            help="Listen on this Unix socket instead of stdin/stdout",
+            dir_okay=False,
+        ),
+    ] = None,
+) -> None:
+    """Serves the tf commands and plan parsing as line based JSON-RPC 2.0 requests.
+
+    Input classes stay imported between requests, which avoids the startup
+    costs of a CLI call per command.
+    """
+    server = Server(config)
+    if socket:
+        server.serve_unix_socket(socket)
+    else:
+        server.serve_stdio()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,28 @@
+"""Thread based parallelism for GIL and free-threaded (python3.14t) builds."""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+
+def gil_enabled() -> bool:
+    """Whether the GIL is enabled, i.e. threads don't run Python in parallel."""
+    return sys._is_gil_enabled()  # ruff: ignore[private-member-access]
+
+
+def thread_map[T, R](
+    fn: Callable[[T], R], items: Iterable[T], *, max_workers: int | None = None
+) -> list[R]:
+    """fn over all items in a thread pool, results in input order.
+
+    CPU bound work only runs in parallel on free-threaded builds. With the
+    GIL, the threads would just contend for it, so unless max_workers is
+    given, the items are processed serially in the calling thread.
+    """
+    if max_workers == 1 or (max_workers is None and gil_enabled()):
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers) as executor:
+        return list(executor.map(fn, items))
@@ -9,14 +9,28 @@ class Action(StrEnum):
     DESTROY = "destroy"
 
 
+class LogFormat(StrEnum):
+    TEXT = "text"
+    JSON = "json"
+
+
 class EnvVar:
     ACTION = "ACTION"
     DRY_RUN = "DRY_RUN"
     LOG_LEVEL = "LOG_LEVEL"
+    LOG_FORMAT = "LOG_FORMAT"
+    LOG_QUEUE = "LOG_QUEUE"
+    MODULE_VERSION = "MODULE_VERSION"
     INPUT_FILE = "INPUT_FILE"
     BACKEND_TF_FILE = "BACKEND_TF_FILE"
     OUTPUTS_FILE = "OUTPUTS_FILE"
     PLAN_FILE_JSON = "PLAN_FILE_JSON"
+    PLAN_CACHE_DIR = "PLAN_CACHE_DIR"
+    PLAN_CACHE_MAX_BYTES = "PLAN_CACHE_MAX_BYTES"
+    PROFILE_DIR = "PROFILE_DIR"
+    PROVIDER_SCHEMA_CACHE_DIR = "PROVIDER_SCHEMA_CACHE_DIR"
+    RUN_CACHE_DIR = "RUN_CACHE_DIR"
+    RUN_CACHE_MAX_AGE = "RUN_CACHE_MAX_AGE"
     TERRAFORM_CMD = "TERRAFORM_CMD"
     TF_VARS_FILE = "TF_VARS_FILE"
     VARIABLES_TF_FILE = "VARIABLES_TF_FILE"
@@ -29,6 +43,14 @@ class Config(BaseSettings):
     action: Action = Field(Action.APPLY, alias=EnvVar.ACTION)
     dry_run: bool = Field(default=True, alias=EnvVar.DRY_RUN)
     log_level: str = Field("INFO", alias=EnvVar.LOG_LEVEL)
+    log_format: LogFormat = Field(LogFormat.TEXT, alias=EnvVar.LOG_FORMAT)
+    # write log records from a background thread
+    log_queue: bool = Field(default=False, alias=EnvVar.LOG_QUEUE)
+    # write cProfile stats and a JSON summary of profiled calls to this directory
+    profile_dir: str | None = Field(None, alias=EnvVar.PROFILE_DIR)
+
+    # version of the module (image), part of the run cache digest
+    module_version: str = Field("", alias=EnvVar.MODULE_VERSION)
 
     # app-interface input related
     input_file: str = Field("/inputs/input.json", alias=EnvVar.INPUT_FILE)
@@ -36,6 +58,17 @@ class Config(BaseSettings):
     backend_tf_file: str = Field("module/backend.tf", alias=EnvVar.BACKEND_TF_FILE)
     outputs_file: str = Field("tmp/outputs.json", alias=EnvVar.OUTPUTS_FILE)
     plan_file_json: str = Field("tmp/plan.json", alias=EnvVar.PLAN_FILE_JSON)
+    # cache parsed plans on disk; disabled if unset
+    plan_cache_dir: str | None = Field(None, alias=EnvVar.PLAN_CACHE_DIR)
+    plan_cache_max_bytes: int = Field(256 * 1024**2, alias=EnvVar.PLAN_CACHE_MAX_BYTES)
+    # provider schemas, one directory per provider version
+    provider_schema_cache_dir: str = Field(
+        "tmp/provider-schemas", alias=EnvVar.PROVIDER_SCHEMA_CACHE_DIR
+    )
+    # skip terraform runs with unchanged inputs; disabled if unset
+    run_cache_dir: str | None = Field(None, alias=EnvVar.RUN_CACHE_DIR)
+    # seconds after which unchanged runs are repeated to detect drift
+    run_cache_max_age: float | None = Field(None, alias=EnvVar.RUN_CACHE_MAX_AGE)
     terraform_cmd: str = Field("terraform", alias=EnvVar.TERRAFORM_CMD)
     tf_vars_file: str = Field("module/terraform.tfvars.json", alias=EnvVar.TF_VARS_FILE)
     variables_tf_file: str = Field(
@@ -1,15 +1,29 @@
 import base64
+import importlib
+import io
 import json
 import os
+from compression import gzip
+from functools import cache, partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, TypeVar
+from typing import TYPE_CHECKING, Any, BinaryIO, Protocol, TypeVar
 
 from pydantic import BaseModel
 
+from external_resources_io.concurrency import thread_map
 from external_resources_io.config import Config
 
+try:
+    from compression import zstd
+except ImportError:
+    # Python has been built without zstd support
+    zstd = None  # type: ignore[assignment]
+
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Iterable, Mapping
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
 
 
 class TerraformProvisionOptions(BaseModel):
@@ -29,6 +43,11 @@ class AppInterfaceProvision(BaseModel):
     module_provision_data: TerraformProvisionOptions
 
 
+class AppInterfaceInputInterface(Protocol):
+    data: BaseModel
+    provision: AppInterfaceProvision
+
+
 T = TypeVar("T", bound=BaseModel)
 
 
@@ -36,16 +55,87 @@ def parse_model[T: BaseModel](model_class: type[T], data: Mapping[str, Any]) ->
     return model_class.model_validate(data)
 
 
-def read_input_from_file(file_path: Path | str | None = None) -> dict[str, Any]:
-    return json.loads(
-        Path(file_path or Config().input_file).read_text(encoding="utf-8")
+def parse_models[T: BaseModel](
+    model_class: type[T],
+    items: Iterable[Mapping[str, Any]],
+    *,
+    max_workers: int | None = None,
+) -> list[T]:
+    """Validate many inputs, results in input order.
+
+    Inputs are validated in parallel threads on free-threaded builds or if
+    max_workers is given, see `thread_map`. Unlike with a process pool,
+    neither inputs nor models are pickled.
+    """
+    return thread_map(partial(parse_model, model_class), items, max_workers=max_workers)
+
+
+@cache
+def resolve_app_interface_class(app_interface_input_class: str) -> type[BaseModel]:
+    """Import and return an app-interface input class, e.g. `module.AppInterfaceInput`.
+
+    The result is memoized, so embedding applications can resolve a class
+    string for every input without paying the import and validation again.
+    """
+    ai_module_name, ai_class_name = app_interface_input_class.rsplit(".", maxsplit=1)
+    ai_class = getattr(importlib.import_module(ai_module_name), ai_class_name)
+    if not isinstance(ai_class, type) or not issubclass(ai_class, BaseModel):
+        raise TypeError(
+            f"{app_interface_input_class} must be a subclass of pydantic.BaseModel"
+        )
+    return ai_class
+
+
+@cache
+def resolve_app_interface_data_class(
+    app_interface_input_class: str,
+) -> type[BaseModel]:
+    """Return the model of the `data` field of an app-interface input class.
+
+    The result is memoized like `resolve_app_interface_class`.
+    """
+    data_class = (
+        resolve_app_interface_class(app_interface_input_class)
+        .model_fields["data"]
+        .annotation
     )
+    if not isinstance(data_class, type) or not issubclass(data_class, BaseModel):
+        raise TypeError(f"{data_class} must be a subclass of pydantic.BaseModel")
+    return data_class
+
+
+def _load_json(fp: BinaryIO) -> dict[str, Any]:
+    """Load JSON from a plain, gzip or zstd compressed stream.
+
+    The compression is detected by the magic bytes. The json module has no
+    incremental parser, so `json.load` reads the whole decompressed document
+    into memory before parsing it; only the compressed payload is streamed
+    from fp instead of being read up front.
+    """
+    magic = fp.read(len(ZSTD_MAGIC))
+    fp.seek(0)
+    if magic.startswith(GZIP_MAGIC):
+        with gzip.GzipFile(fileobj=fp) as gzip_fp:
+            return json.load(gzip_fp)
+    if magic.startswith(ZSTD_MAGIC):
+        if zstd is None:
+            raise ImportError(
+                "zstd compressed input requires a Python build with zstd support"
+            )
+        with zstd.ZstdFile(fp) as zstd_fp:
+            return json.load(zstd_fp)
+    return json.load(fp)
+
+
+def read_input_from_file(file_path: Path | str | None = None) -> dict[str, Any]:
+    """Read the input JSON file. gzip and zstd compressed files are supported."""
+    with Path(file_path or Config().input_file).open("rb") as fp:
+        return _load_json(fp)
 
 
 def read_input_from_env_var(var: str = "INPUT") -> dict[str, Any]:
-    b64data = os.environ[var]
-    str_input = base64.b64decode(b64data.encode("utf-8")).decode("utf-8")
-    return json.loads(str_input)
+    """Read the base64 encoded input JSON. gzip and zstd compressed payloads are supported."""
+    return _load_json(io.BytesIO(base64.b64decode(os.environ[var])))
 
 
 def get_ai_provision_data() -> AppInterfaceProvision:
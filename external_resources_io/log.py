@@ -1,7 +1,56 @@
+import atexit
+import copy
+import json
 import logging
 import logging.config
+import logging.handlers
+import threading
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+from queue import Queue, SimpleQueue
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, override
 
-from external_resources_io.config import Config
+from external_resources_io.config import Config, LogFormat
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+
+    from external_resources_io.config import Action
+    from external_resources_io.input import AppInterfaceProvision
+
+_log_context: ContextVar[Mapping[str, object]] = ContextVar(
+    "log_context", default=MappingProxyType({})
+)
+
+
+@contextmanager
+def log_context(**context: object) -> Iterator[None]:
+    """Attach the given fields to all log records emitted within the block.
+
+    Nested blocks extend the context of the enclosing one. The fields are
+    rendered by the JSON formatter only.
+    """
+    token = _log_context.set({**_log_context.get(), **context})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def provision_log_context(
+    provision: AppInterfaceProvision, action: Action | None = None
+) -> AbstractContextManager[None]:
+    """Log context identifying the resource of the given provision data."""
+    return log_context(
+        provision_provider=provision.provision_provider,
+        provisioner=provision.provisioner,
+        provider=provision.provider,
+        identifier=provision.identifier,
+        target_cluster=provision.target_cluster,
+        target_namespace=provision.target_namespace,
+        **({"action": action.value} if action else {}),
+    )
 
 
 class DryRunFilter(logging.Filter):
@@ -20,21 +69,218 @@ class DryRunFilter(logging.Filter):
         return True
 
 
+class ContextFilter(logging.Filter):
+    """Adds the current log_context fields to the record"""
+
+    @override
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Filter method"""
+        # only a reference to the immutable context mapping, no copy
+        record.context = _log_context.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record, including its log_context fields, as a single JSON line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format method"""
+        entry: dict[str, Any] = {
+            **getattr(record, "context", {}),
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": f"{getattr(record, 'prefix', '')}{record.getMessage()}",
+        }
+        # exc_text may have been set (and redacted) by a filter or formatted
+        # before the record was queued, see ExceptionQueueHandler
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """StreamHandler which buffers formatted records and writes them in batches.
+
+    The buffer is written once it holds `capacity` records or on `flush`.
+    `BatchQueueListener` flushes it whenever the queue runs empty.
+    """
+
+    def __init__(self, capacity: int = 100) -> None:
+        super().__init__()
+        self.capacity = capacity
+        self.buffer: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Emit method"""
+        try:
+            self.buffer.append(self.format(record) + self.terminator)
+        except Exception:  # ruff: ignore[blind-except]
+            self.handleError(record)
+        if len(self.buffer) >= self.capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered records with a single write call"""
+        self.acquire()
+        try:
+            if self.buffer:
+                self.stream.write("".join(self.buffer))
+                self.buffer.clear()
+        finally:
+            self.release()
+        super().flush()
+
+    def close(self) -> None:
+        """Close method"""
+        self.flush()
+        super().close()
+
+
+class ExceptionQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler which keeps the traceback apart from the message.
+
+    The stock handler merges the formatted traceback into the message, so
+    the JSON formatter couldn't render it as its own field.
+    """
+
+    @override
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Prepare method"""
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            # the traceback can't be queued, only its text
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.exc_info = None
+        record.exc_text = None
+        prepared = super().prepare(record)
+        prepared.exc_text = exc_text
+        return prepared
+
+
+class BatchQueueListener(logging.handlers.QueueListener):
+    """QueueListener which flushes its handlers once the queue is drained"""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        """Handle method"""
+        super().handle(record)
+        if isinstance(self.queue, Queue | SimpleQueue) and not self.queue.empty():
+            return
+        self.flush()
+
+    def flush(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+    def stop(self) -> None:
+        """Stop method"""
+        super().stop()
+        self.flush()
+
+
+_listener: logging.handlers.QueueListener | None = None
+# serializes setup_logging calls, e.g. of several threads of a free-threaded
+# build, so only one listener is ever running
+_setup_lock = threading.RLock()
+
+
+# filters added to the root handlers by add_log_filter, e.g. redaction,
+# which are added again whenever setup_logging replaces the handlers
+_log_filters: list[logging.Filter] = []
+
+
+def add_log_filter(log_filter: logging.Filter) -> None:
+    """Add a filter to all root handlers, now and after later setup_logging calls."""
+    with _setup_lock:
+        _log_filters.append(log_filter)
+        for handler in logging.getLogger().handlers:
+            handler.addFilter(log_filter)
+
+
+def remove_log_filter(log_filter: logging.Filter) -> None:
+    """Remove a filter added by add_log_filter."""
+    with _setup_lock:
+        if log_filter in _log_filters:
+            _log_filters.remove(log_filter)
+        for handler in logging.getLogger().handlers:
+            handler.removeFilter(log_filter)
+
+
+def log_filters() -> tuple[logging.Filter, ...]:
+    """The filters added by add_log_filter."""
+    with _setup_lock:
+        return tuple(_log_filters)
+
+
+def _stop_listener() -> None:
+    global _listener  # ruff: ignore[global-statement]
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(_stop_listener)
+
+
 def setup_logging() -> None:
     """Returns a logger"""
+    with _setup_lock:
+        _setup_logging()
+
+
+def _setup_logging() -> None:
+    global _listener  # ruff: ignore[global-statement]
     config = Config()
+    _stop_listener()
+    handlers: dict[str, dict[str, Any]] = {
+        "console": {
+            "class": "logging.StreamHandler",
+            "filters": ["prefix_filter", "context_filter"],
+            "formatter": config.log_format,
+        }
+    }
+    root_handler = "console"
+    if config.log_queue:
+        # records are put on a queue by the calling thread and written to
+        # stderr in batches by the listener thread
+        handlers["console"] = {
+            "()": BatchStreamHandler,
+            "formatter": config.log_format,
+        }
+        handlers["queue"] = {
+            "class": "external_resources_io.log.ExceptionQueueHandler",
+            "filters": ["prefix_filter", "context_filter"],
+            "handlers": ["console"],
+            "listener": BatchQueueListener,
+        }
+        root_handler = "queue"
+
     logging.config.dictConfig({
         "version": 1,
         "disable_existing_loggers": False,
-        "filters": {"prefix_filter": {"()": DryRunFilter, "dry_run": config.dry_run}},
-        "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "filters": ["prefix_filter"],
-                "formatter": "base",
-            }
+        "filters": {
+            "prefix_filter": {"()": DryRunFilter, "dry_run": config.dry_run},
+            "context_filter": {"()": ContextFilter},
         },
-        "formatters": {"base": {"format": "%(prefix)s%(levelname)s - %(message)s"}},
-        "root": {"level": config.log_level, "handlers": ["console"]},
-        "botocore": {"level": "ERROR", "handlers": ["console"]},
+        "handlers": handlers,
+        "formatters": {
+            LogFormat.TEXT: {"format": "%(prefix)s%(levelname)s - %(message)s"},
+            LogFormat.JSON: {"()": JsonFormatter},
+        },
+        "root": {"level": config.log_level, "handlers": [root_handler]},
+        "botocore": {"level": "ERROR", "handlers": [root_handler]},
     })
+
+    for handler in logging.getLogger().handlers:
+        for log_filter in _log_filters:
+            handler.addFilter(log_filter)
+
+    queue_handler = logging.getHandlerByName("queue")
+    if isinstance(queue_handler, logging.handlers.QueueHandler):
+        _listener = queue_handler.listener
+        if _listener:
+            _listener.start()
@@ -0,0 +1,250 @@
+# ruff: file-ignore[any-type]
+"""Redaction of sensitive values from Terraform output and log records.
+
+All secrets are compiled into a single trie-structured regular expression:
+secrets sharing a prefix share the path through the pattern, so the regex
+engine walks at most one branch per input character, similar to an
+Aho-Corasick automaton. Text is redacted in a single pass regardless of the
+number of secrets. Overlapping or adjacent secrets are replaced as a whole.
+
+`redact_logs` protects all log records, including the output of failed
+terraform runs, and the output attached to their errors.
+"""
+
+import json
+import logging
+import re
+from typing import TYPE_CHECKING, Any, override
+
+from pydantic import BaseModel, SecretBytes, SecretStr
+
+from external_resources_io.log import add_log_filter, log_filters
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from external_resources_io.terraform.plan import Plan
+
+REDACTED = "***"
+# shorter values, e.g. "1" or "true", would mangle the whole output
+MIN_SECRET_LENGTH = 4
+
+
+def _trie_pattern(node: dict[str, Any]) -> str:
+    # "" marks the end of a secret
+    terminal = "" in node
+    branches = []
+    for char, child in sorted(node.items()):
+        if not char:
+            continue
+        # collapse chains without branches into a single literal
+        literal, rest = char, child
+        while len(rest) == 1 and "" not in rest:
+            (next_char, rest), *_ = rest.items()
+            literal += next_char
+        branches.append(re.escape(literal) + _trie_pattern(rest))
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    # optional, but greedy: longer secrets win over their prefixes
+    return f"(?:{pattern})?" if terminal else pattern
+
+
+def _spans(pattern: re.Pattern[str], text: str) -> Iterator[tuple[int, int]]:
+    # matches don't overlap, but secrets may, e.g. "abcd" and "cdef" in
+    # "abcdef": the text after the start of each match is searched again and
+    # overlapping or touching matches are merged, so no part of a secret is
+    # left
+    match = pattern.search(text)
+    while match:
+        start, end = match.span()
+        match = pattern.search(text, start + 1)
+        while match and match.start() <= end:
+            end = max(end, match.end())
+            match = pattern.search(text, match.start() + 1)
+        yield start, end
+
+
+class Redactor:
+    """Replaces all occurrences of the given secrets."""
+
+    def __init__(
+        self,
+        secrets: Iterable[str],
+        *,
+        replacement: str = REDACTED,
+        min_length: int = MIN_SECRET_LENGTH,
+    ) -> None:
+        self.replacement = replacement
+        self.secrets = frozenset(s for s in secrets if len(s) >= max(min_length, 1))
+        self.max_length = max(map(len, self.secrets), default=0)
+        # matches can't span lines, streams can be redacted line by line
+        self._single_line = not any("\n" in s for s in self.secrets)
+        trie: dict[str, Any] = {}
+        for secret in self.secrets:
+            node = trie
+            for char in secret:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._pattern = re.compile(_trie_pattern(trie)) if self.secrets else None
+
+    def redact(self, text: str) -> str:
+        """Redact all secrets in text."""
+        if self._pattern is None:
+            return text
+        parts: list[str] = []
+        pos = 0
+        for start, end in _spans(self._pattern, text):
+            parts.extend((text[pos:start], self.replacement))
+            pos = end
+        if not parts:
+            return text
+        parts.append(text[pos:])
+        return "".join(parts)
+
+    def redact_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Redact a stream of text chunks, e.g. lines of a running process.
+
+        Secrets split across chunks are redacted as well: incomplete lines, or
+        up to max_length - 1 characters for multi-line secrets, are held back
+        until the next chunk arrives.
+        """
+        if self._pattern is None:
+            yield from chunks
+            return
+        carry = ""
+        for chunk in chunks:
+            buffer = carry + chunk
+            # matches starting before cut can't grow with the next chunk
+            cut = len(buffer) - self.max_length + 1
+            if self._single_line and (end := buffer.rfind("\n") + 1) >= cut:
+                carry = buffer[end:]
+                if end:
+                    yield self.redact(buffer[:end])
+                continue
+            if cut <= 0:
+                carry = buffer
+                continue
+            parts: list[str] = []
+            pos = end = 0
+            for start, span_end in _spans(self._pattern, buffer):
+                if span_end >= cut:
+                    # may still be merged with a match of the next chunk
+                    end = min(start, cut)
+                    break
+                parts.extend((buffer[pos:start], self.replacement))
+                pos = span_end
+            else:
+                end = max(cut, pos)
+            parts.append(buffer[pos:end])
+            carry = buffer[end:]
+            if text := "".join(parts):
+                yield text
+        if carry:
+            yield self.redact(carry)
+
+
+class RedactionFilter(logging.Filter):
+    """Redacts secrets from the message and exception of a record"""
+
+    def __init__(self, redactor: Redactor) -> None:
+        super().__init__()
+        self.redactor = redactor
+
+    @override
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Filter method"""
+        record.msg = self.redactor.redact(record.getMessage())
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        if record.exc_text:
+            record.exc_text = self.redactor.redact(record.exc_text)
+        return True
+
+
+def redact_logs(redactor: Redactor) -> RedactionFilter:
+    """Redact secrets from all log records and terraform errors.
+
+    The filter is added to all handlers of the root logger, also to those of
+    later setup_logging calls, until it's removed with `remove_log_filter`.
+    """
+    redaction_filter = RedactionFilter(redactor)
+    add_log_filter(redaction_filter)
+    return redaction_filter
+
+
+def redact_installed(text: str) -> str:
+    """Redact the secrets of all filters installed by `redact_logs`."""
+    for log_filter in log_filters():
+        if isinstance(log_filter, RedactionFilter):
+            text = log_filter.redactor.redact(text)
+    return text
+
+
+def _variants(value: str) -> Iterator[str]:
+    yield value
+    # the JSON encoded form, as in terraform's JSON output
+    yield json.dumps(value)[1:-1]
+
+
+def _leaves(value: Any) -> Iterator[str]:
+    match value:
+        case bool() | None:
+            return
+        case str():
+            yield from _variants(value)
+        case int() | float():
+            yield str(value)
+        case dict():
+            for v in value.values():
+                yield from _leaves(v)
+        case list():
+            for v in value:
+                yield from _leaves(v)
+
+
+def _sensitive_leaves(value: Any, sensitive: Any) -> Iterator[str]:
+    # sensitive mirrors the structure of value, sensitive leaves are True
+    if sensitive is True:
+        yield from _leaves(value)
+    elif isinstance(sensitive, dict) and isinstance(value, dict):
+        for key, s in sensitive.items():
+            if key in value:
+                yield from _sensitive_leaves(value[key], s)
+    elif isinstance(sensitive, list) and isinstance(value, list):
+        for v, s in zip(value, sensitive, strict=False):
+            yield from _sensitive_leaves(v, s)
+
+
+def plan_sensitive_values(plan: Plan) -> set[str]:
+    """Values of all sensitive attributes and outputs of a plan."""
+    changes = [rc.change for rc in plan.resource_changes if rc.change]
+    changes.extend(plan.output_changes.values())
+    values: set[str] = set()
+    for change in changes:
+        values.update(_sensitive_leaves(change.before, change.before_sensitive))
+        values.update(_sensitive_leaves(change.after, change.after_sensitive))
+    return values
+
+
+def input_sensitive_values(value: Any) -> set[str]:
+    """Values of all SecretStr and SecretBytes fields of an input model."""
+    values: set[str] = set()
+    match value:
+        case SecretStr():
+            values.update(_variants(value.get_secret_value()))
+        case SecretBytes():
+            values.update(
+                _variants(value.get_secret_value().decode("utf-8", errors="replace"))
+            )
+        case BaseModel():
+            for name in type(value).model_fields:
+                values |= input_sensitive_values(getattr(value, name))
+        case dict():
+            for v in value.values():
+                values |= input_sensitive_values(v)
+        case list() | tuple() | set() | frozenset():
+            for v in value:
+                values |= input_sensitive_values(v)
+    return values
@@ -0,0 +1,231 @@
+"""Long-running JSON-RPC 2.0 server for the generators and the plan parser.
+
+The server reads one JSON-RPC request per line, either from stdin or from a
+Unix socket, and writes one response per line. Imported app-interface input
+classes are kept in memory, so only the first request for an input class pays
+for the import and the validator build.
+"""
+
+import json
+import logging
+import os
+import socketserver
+import stat
+import sys
+from pathlib import Path
+from typing import Any, ClassVar, TextIO, cast
+
+from pydantic import BaseModel, ValidationError
+
+from external_resources_io.config import Config
+from external_resources_io.input import (
+    AppInterfaceInputInterface,
+    parse_model,
+    read_input_from_file,
+    resolve_app_interface_class,
+    resolve_app_interface_data_class,
+)
+from external_resources_io.terraform.generators import (
+    create_backend_tf_file,
+    create_terraform_files,
+    create_tf_vars_json,
+    create_variables_tf_file,
+)
+from external_resources_io.terraform.plan import TerraformJsonPlanParser
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class JsonRpcError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class GenerateVariablesTfParams(BaseModel):
+    input_class: str
+    output: Path | None = None
+
+
+class InputParams(BaseModel):
+    input_class: str
+    # either the path to the input file or the input data itself
+    input_file: Path | None = None
+    input: dict[str, Any] | None = None
+
+
+class GenerateFileParams(InputParams):
+    output: Path | None = None
+
+
+class GenerateTfVarsJsonParams(GenerateFileParams):
+    canonical: bool = False
+
+
+class GenerateAllParams(InputParams):
+    backend_tf_file: Path | None = None
+    tf_vars_file: Path | None = None
+    variables_tf_file: Path | None = None
+    canonical: bool = False
+
+
+class ParsePlanParams(BaseModel):
+    plan_file: Path | None = None
+    # top-level plan fields to return; all fields if omitted
+    fields: set[str] | None = None
+
+
+class Server:
+    # JSON-RPC method name -> (Server method name, params model)
+    methods: ClassVar[dict[str, tuple[str, type[BaseModel]]]] = {
+        "generate-variables-tf": ("generate_variables_tf", GenerateVariablesTfParams),
+        "generate-backend-tf": ("generate_backend_tf", GenerateFileParams),
+        "generate-tf-vars-json": ("generate_tf_vars_json", GenerateTfVarsJsonParams),
+        "generate-all": ("generate_all", GenerateAllParams),
+        "parse-plan": ("parse_plan", ParsePlanParams),
+    }
+
+    def __init__(self, config: Config | None = None) -> None:
+        # a copy, the given config may be changed by other threads
+        self.config = config.model_copy() if config else Config()
+
+    def _get_ai_input(self, params: InputParams) -> AppInterfaceInputInterface:
+        data = (
+            params.input
+            if params.input is not None
+            else read_input_from_file(params.input_file or self.config.input_file)
+        )
+        return cast(
+            "AppInterfaceInputInterface",
+            parse_model(resolve_app_interface_class(params.input_class), data),
+        )
+
+    def generate_variables_tf(self, params: GenerateVariablesTfParams) -> str:
+        data_class = resolve_app_interface_data_class(params.input_class)
+        output = params.output or self.config.variables_tf_file
+        return str(create_variables_tf_file(data_class, output))
+
+    def generate_backend_tf(self, params: GenerateFileParams) -> str:
+        provision = self._get_ai_input(params).provision
+        output = params.output or self.config.backend_tf_file
+        return str(create_backend_tf_file(provision, output))
+
+    def generate_tf_vars_json(self, params: GenerateTfVarsJsonParams) -> str:
+        data = self._get_ai_input(params).data
+        output = params.output or self.config.tf_vars_file
+        return str(create_tf_vars_json(data, output, canonical=params.canonical))
+
+    def generate_all(self, params: GenerateAllParams) -> dict[str, str]:
+        files = create_terraform_files(
+            self._get_ai_input(params),
+            backend_tf_file=params.backend_tf_file or self.config.backend_tf_file,
+            tf_vars_file=params.tf_vars_file or self.config.tf_vars_file,
+            variables_tf_file=params.variables_tf_file or self.config.variables_tf_file,
+            canonical=params.canonical,
+        )
+        return {name: str(path) for name, path in files._asdict().items()}
+
+    def parse_plan(self, params: ParsePlanParams) -> dict[str, Any]:
+        plan_file = params.plan_file or self.config.plan_file_json
+        plan = TerraformJsonPlanParser(str(plan_file)).plan
+        return plan.model_dump(mode="json", include=params.fields)
+
+    def _dispatch(self, request: object) -> object:
+        if (
+            not isinstance(request, dict)
+            or request.get("jsonrpc") != "2.0"
+            or not isinstance(request.get("method"), str)
+        ):
+            raise JsonRpcError(INVALID_REQUEST, "Invalid request")
+        if request["method"] not in self.methods:
+            raise JsonRpcError(METHOD_NOT_FOUND, f"Unknown method {request['method']}")
+        method_name, params_model = self.methods[request["method"]]
+        try:
+            params = params_model.model_validate(request.get("params", {}))
+        except ValidationError as e:
+            raise JsonRpcError(INVALID_PARAMS, str(e)) from None
+        try:
+            return getattr(self, method_name)(params)
+        except Exception as e:
+            logger.exception(f"{request['method']} failed")
+            raise JsonRpcError(SERVER_ERROR, str(e)) from None
+
+    def handle(self, line: str | bytes) -> str | None:
+        """Handle a single JSON-RPC request line and return the response line.
+
+        Returns None for notifications, i.e. requests without an id.
+        """
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            request = None
+            response: dict[str, Any] = {
+                "error": {"code": PARSE_ERROR, "message": str(e)}
+            }
+        else:
+            try:
+                response = {"result": self._dispatch(request)}
+            except JsonRpcError as e:
+                response = {"error": {"code": e.code, "message": e.message}}
+            if isinstance(request, dict) and "id" not in request:
+                return None
+        request_id = request.get("id") if isinstance(request, dict) else None
+        return json.dumps({"jsonrpc": "2.0", **response, "id": request_id})
+
+    def serve_stdio(
+        self, stdin: TextIO | None = None, stdout: TextIO | None = None
+    ) -> None:
+        """Serve requests from stdin until EOF."""
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        for line in stdin:
+            if not line.strip():
+                continue
+            if (response := self.handle(line)) is not None:
+                stdout.write(response + "\n")
+                stdout.flush()
+
+    def serve_unix_socket(self, path: Path | str) -> None:
+        """Serve requests on a Unix socket. Each connection gets its own thread.
+
+        A socket left over at path is replaced, any other file is an error.
+        """
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    if (response := server.handle(line)) is not None:
+                        self.wfile.write(response.encode("utf-8") + b"\n")
+
+        _remove_stale_socket(Path(path))
+        # only the owner may connect, from the moment the socket exists
+        umask = os.umask(0o177)
+        try:
+            unix_server = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+        finally:
+            os.umask(umask)
+        with unix_server:
+            logger.info(f"Listening on {path}")
+            unix_server.serve_forever()
+
+
+def _remove_stale_socket(path: Path) -> None:
+    try:
+        mode = path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        msg = f"{path} exists and is not a socket"
+        raise FileExistsError(msg)
+    path.unlink()
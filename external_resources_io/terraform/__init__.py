@@ -1,8 +1,16 @@
 from .generators import (
+    TerraformFiles,
+    canonical_tf_vars_json,
     create_backend_tf_file,
+    create_terraform_files,
     create_tf_vars_json,
     create_variables_tf_file,
+    model_fingerprint,
+    tf_vars_digest,
+    variables_tf_up_to_date,
+    write_tf_vars_json,
 )
+from .outputs import SensitiveOutputs, changed_outputs, create_outputs_file
 from .plan import (
     Action,
     Change,
@@ -10,20 +18,96 @@ from .plan import (
     Plan,
     ResourceAttribute,
     ResourceChange,
+    ResourceChangeDetails,
     TerraformJsonPlanParser,
+    parse_plans,
+)
+from .plan_cache import PlanCache, PlanIndex, ResourceChangeIndex
+from .policy import PolicyEngine, Rule, Violation
+from .provider_schema import (
+    AttributeSchema,
+    ProviderSchemaCache,
+    ProviderSchemaIndex,
+    load_provider_schemas,
+    provider_versions,
+)
+from .run import terraform_run, terraform_stdout
+from .run_cache import (
+    LocalRunCacheStore,
+    RunCache,
+    RunCacheStore,
+    RunRecord,
+    cached_terraform_run,
+    run_digest,
+    run_key,
+)
+from .scheduler import StateKey, StateKeyScheduler, WaitMetrics
+from .state import StateResource, StateView
+from .stream import (
+    ExportFormat,
+    changed_attribute_paths,
+    changed_output_names,
+    export_resource_changes,
+    iter_members,
+    iter_raw_resource_changes,
+    iter_resource_changes,
+    plan_has_changes,
 )
-from .run import terraform_run
 
 __all__ = [
     "Action",
+    "AttributeSchema",
     "Change",
     "DeferredResourceChange",
+    "ExportFormat",
+    "LocalRunCacheStore",
     "Plan",
+    "PlanCache",
+    "PlanIndex",
+    "PolicyEngine",
+    "ProviderSchemaCache",
+    "ProviderSchemaIndex",
     "ResourceAttribute",
     "ResourceChange",
+    "ResourceChangeDetails",
+    "ResourceChangeIndex",
+    "Rule",
+    "RunCache",
+    "RunCacheStore",
+    "RunRecord",
+    "SensitiveOutputs",
+    "StateKey",
+    "StateKeyScheduler",
+    "StateResource",
+    "StateView",
+    "TerraformFiles",
     "TerraformJsonPlanParser",
+    "Violation",
+    "WaitMetrics",
+    "cached_terraform_run",
+    "canonical_tf_vars_json",
+    "changed_attribute_paths",
+    "changed_output_names",
+    "changed_outputs",
     "create_backend_tf_file",
+    "create_outputs_file",
+    "create_terraform_files",
     "create_tf_vars_json",
     "create_variables_tf_file",
+    "export_resource_changes",
+    "iter_members",
+    "iter_raw_resource_changes",
+    "iter_resource_changes",
+    "load_provider_schemas",
+    "model_fingerprint",
+    "parse_plans",
+    "plan_has_changes",
+    "provider_versions",
+    "run_digest",
+    "run_key",
     "terraform_run",
+    "terraform_stdout",
+    "tf_vars_digest",
+    "variables_tf_up_to_date",
+    "write_tf_vars_json",
 ]
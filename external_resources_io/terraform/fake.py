@@ -0,0 +1,111 @@
+"""Fake terraform binary replaying recorded responses.
+
+Makes tests and benchmarks of the terraform runner hermetic and
+deterministic. Select it via the TERRAFORM_CMD environment variable:
+
+    TERRAFORM_CMD="python -m external_resources_io.terraform.fake"
+    FAKE_TERRAFORM_RESPONSES=responses.json
+
+The responses file maps terraform commands to their responses, e.g.:
+
+    {
+        "plan": {"stdout": "No changes.", "latency": 0.5},
+        "show -json": {"stdout_file": "plan.json"},
+        "output -json": {"stdout": "{}", "repeat": 1000},
+        "apply": {"stderr": "Error: lock", "returncode": 1}
+    }
+
+The longest matching command wins. Without a recorded response, `fmt -`
+echoes stdin, `version` reports a fake version and any other command fails.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, RootModel
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+RESPONSES_ENV_VAR = "FAKE_TERRAFORM_RESPONSES"
+FAKE_VERSION = "1.99.0-fake"
+
+
+class FakeResponse(BaseModel):
+    stdout: str = ""
+    # file to print instead of stdout, e.g. a recorded plan
+    stdout_file: Path | None = None
+    stderr: str = ""
+    returncode: int = 0
+    # seconds to wait before responding
+    latency: float = 0.0
+    # print stdout this many times, to simulate large outputs
+    repeat: int = 1
+
+
+class FakeResponses(RootModel[dict[str, FakeResponse]]):
+    def lookup(self, args: Sequence[str]) -> FakeResponse | None:
+        """The response of the longest recorded command matching args."""
+        for end in range(len(args), 0, -1):
+            if (response := self.root.get(" ".join(args[:end]))) is not None:
+                return response
+        return None
+
+
+def _load_responses() -> FakeResponses:
+    path = os.environ.get(RESPONSES_ENV_VAR)
+    if not path:
+        return FakeResponses({})
+    return FakeResponses.model_validate_json(Path(path).read_bytes())
+
+
+def _default_response(args: Sequence[str]) -> FakeResponse:
+    match list(args):
+        case ["fmt", *_, "-"]:
+            return FakeResponse(stdout=sys.stdin.read())
+        case ["version", "-json"]:
+            return FakeResponse(
+                stdout=json.dumps({
+                    "terraform_version": FAKE_VERSION,
+                    "platform": "fake",
+                    "provider_selections": {},
+                })
+            )
+        case ["version" | "-version" | "--version", *_]:
+            return FakeResponse(stdout=f"Terraform v{FAKE_VERSION}\n")
+        case _:
+            return FakeResponse(
+                stderr=f"No recorded response for: terraform {' '.join(args)}\n",
+                returncode=1,
+            )
+
+
+def _write(response: FakeResponse) -> None:
+    stdout = (
+        response.stdout_file.read_bytes()
+        if response.stdout_file
+        else response.stdout.encode()
+    )
+    for _ in range(response.repeat):
+        sys.stdout.buffer.write(stdout)
+    sys.stdout.buffer.flush()
+    sys.stderr.write(response.stderr)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    # drop global options like -chdir=DIR
+    while args and args[0].startswith("-chdir"):
+        args.pop(0)
+    response = _load_responses().lookup(args) or _default_response(args)
+    time.sleep(response.latency)
+    _write(response)
+    return response.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,220 @@
 # ruff: file-ignore[any-type]
+import hashlib
 import json
-from collections.abc import Sequence
+import math
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from operator import itemgetter
 from pathlib import Path
-from types import UnionType
-from typing import TYPE_CHECKING, Any, Literal, Union, get_args, get_origin
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    NamedTuple,
+)
 
 from pydantic import BaseModel
-from pydantic_core import PydanticUndefined
+from pydantic_core import PydanticUndefined, to_json, to_jsonable_python
 
 from external_resources_io.config import Config
-from external_resources_io.terraform.run import terraform_fmt
+from external_resources_io.profiling import profiled
+from external_resources_io.terraform.run import terraform_fmt, terraform_fmt_many
+from external_resources_io.terraform.schema_types import (
+    ANY,
+    NUMBER,
+    Collection,
+    Object,
+    TerraformType,
+    Tuple,
+    model_terraform_types,
+    terraform_type,
+)
 
 if TYPE_CHECKING:
-    from external_resources_io.input import AppInterfaceProvision
+    from collections.abc import Iterable
+    from concurrent.futures import Future
+
+    from external_resources_io.input import (
+        AppInterfaceInputInterface,
+        AppInterfaceProvision,
+    )
+
+
+def _sorted(values: Iterable) -> list:
+    # the iteration order of sets differs between processes
+    try:
+        return sorted(values)
+    except TypeError:
+        # mixed or unorderable element types
+        return sorted(
+            values,
+            key=lambda v: json.dumps(to_jsonable_python(v), sort_keys=True),
+        )
+
+
+_PLAIN_TYPES = frozenset({str, int, bool, type(None)})
+
+
+def _canonical_number(value: str) -> str:
+    # decimals are serialized as strings, drop the trailing zeros
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        # a custom serializer
+        return value
+    return format(number.normalize(), "f") if number.is_finite() else value
+
+
+def _canonical(value: Any, tf_type: TerraformType = ANY) -> Any:  # ruff: ignore[too-many-return-statements]
+    """Canonical form of JSON mode data of the given Terraform type.
+
+    Object keys and the elements of sets are sorted and numbers are
+    normalized.
+    """
+    if type(value) in _PLAIN_TYPES and tf_type != NUMBER:
+        # the bulk of the data, skip the pattern matching
+        return value
+    match value:
+        case str() if tf_type == NUMBER:
+            return _canonical_number(value)
+        case float():
+            if not math.isfinite(value):
+                # like model_dump_json
+                return None
+            # 1.0 and 1 are the same number in terraform, -0.0 becomes 0
+            return int(value) if value.is_integer() else value
+        case dict():
+            return _canonical_dict(value, tf_type)
+        case list():
+            return _canonical_list(value, tf_type)
+        case _:
+            return value
+
+
+def _canonical_list(value: list, tf_type: TerraformType) -> list:
+    if isinstance(tf_type, Tuple) and len(tf_type.elements) == len(value):
+        return [_canonical(v, tf_type.elements[i]) for i, v in enumerate(value)]
+    element = tf_type.element if isinstance(tf_type, Collection) else ANY
+    items = [_canonical(v, element) for v in value]
+    if isinstance(tf_type, Collection) and tf_type.kind == "set":
+        return _sorted(items)
+    return items
+
+
+def _canonical_dict(value: dict, tf_type: TerraformType) -> dict[str, Any]:
+    attributes = dict(tf_type.attributes) if isinstance(tf_type, Object) else {}
+    element = (
+        tf_type.element
+        if isinstance(tf_type, Collection) and tf_type.kind == "map"
+        else ANY
+    )
+    # keys are inserted in sorted order, the serializer keeps that order
+    return {
+        k: _canonical(v, attributes.get(k, element))
+        for k, v in sorted(value.items(), key=itemgetter(0))
+    }
 
 
 class SetEncoder(json.JSONEncoder):
     def default(self, obj: Any) -> Any:
-        if isinstance(obj, set):
-            return list(obj)
+        if isinstance(obj, set | frozenset):
+            return _sorted(obj)
         return json.JSONEncoder.default(self, obj)
 
 
+def canonical_tf_vars_json(
+    input_data: BaseModel, *, exclude_none: bool = True
+) -> bytes:
+    """Canonical JSON serialization of the model.
+
+    Semantically identical inputs serialize to identical bytes: object keys
+    and set elements are sorted, numbers are normalized (1.0 -> 1) and there
+    is no insignificant whitespace. The values are those of `model_dump_json`,
+    including JSON only serializers; arrays are sorted where the core schema
+    of the model types them as sets.
+    """
+    model = type(input_data)
+    return to_json(
+        _canonical(
+            input_data.model_dump(mode="json", exclude_none=exclude_none),
+            Object(tuple(model_terraform_types(model).items())),
+        )
+    )
+
+
+def tf_vars_digest(input_data: BaseModel, *, exclude_none: bool = True) -> str:
+    """SHA-256 hex digest of the canonical tfvars.json of the model."""
+    return hashlib.sha256(
+        canonical_tf_vars_json(input_data, exclude_none=exclude_none)
+    ).hexdigest()
+
+
+def write_tf_vars_json(
+    input_data: BaseModel, fp: BinaryIO, *, exclude_none: bool = True
+) -> None:
+    """Serializes the model field by field to a file opened in binary mode.
+
+    The output is identical to `model_dump_json`, but only one serialized
+    field is held in memory at a time instead of the whole document. Custom
+    model serializers ignore the per-field include, so such models are
+    serialized as a whole.
+    """
+    model = type(input_data)
+    if model.__pydantic_decorators__.model_serializers:
+        fp.write(
+            input_data.__pydantic_serializer__.to_json(
+                input_data, exclude_none=exclude_none
+            )
+        )
+        return
+    fields = [
+        *model.model_fields,
+        *(input_data.model_extra or {}),
+        *model.model_computed_fields,
+    ]
+    fp.write(b"{")
+    separator = b""
+    for field in fields:
+        field_json = input_data.__pydantic_serializer__.to_json(
+            input_data, include={field}, exclude_none=exclude_none
+        )
+        if field_json == b"{}":
+            # excluded field
+            continue
+        fp.write(separator)
+        # strip the surrounding braces without copying the field data
+        fp.write(memoryview(field_json)[1:-1])
+        separator = b","
+    fp.write(b"}")
+
+
+@profiled
 def create_tf_vars_json(
     input_data: BaseModel,
     output_file: Path | str | None = None,
     *,
     exclude_none: bool = True,
+    streaming: bool = False,
+    canonical: bool = False,
 ) -> Path:
-    """Helper method to create teraform vars files. Used in terraform based ERv2 modules."""
+    """Helper method to create teraform vars files. Used in terraform based ERv2 modules.
+
+    Use `streaming` for inputs with large embedded documents to lower the peak memory.
+    Use `canonical` for byte-identical files for semantically identical inputs,
+    see `canonical_tf_vars_json`.
+    """
+    if streaming and canonical:
+        raise ValueError("streaming and canonical can't be combined")
     output = Path(output_file or Config().tf_vars_file)
+    if canonical:
+        output.write_bytes(
+            canonical_tf_vars_json(input_data, exclude_none=exclude_none)
+        )
+        return output
+    if streaming:
+        with output.open("wb") as fp:
+            write_tf_vars_json(input_data, fp, exclude_none=exclude_none)
+        return output
     output.write_text(
         input_data.model_dump_json(exclude_none=exclude_none),
         encoding="utf-8",
@@ -37,47 +222,172 @@ def create_tf_vars_json(
     return output
 
 
+def _backend_tf(provision_data: AppInterfaceProvision) -> str:
+    return f"""\
+        terraform {{
+          backend "s3" {{
+            bucket       = "{provision_data.module_provision_data.tf_state_bucket}"
+            key          = "{provision_data.module_provision_data.tf_state_key}"
+            region       = "{provision_data.module_provision_data.tf_state_region}"
+            use_lockfile = true
+            profile      = "external-resources-state"
+          }}
+        }}"""
+
+
+@profiled
 def create_backend_tf_file(
     provision_data: AppInterfaceProvision, output_file: Path | str | None = None
 ) -> Path:
     """Helper method to create teraform backend configuration. Used in terraform based ERv2 modules."""
     output = Path(output_file or Config().backend_tf_file)
-    output.write_text(
-        terraform_fmt(f"""\
-            terraform {{
-              backend "s3" {{
-                bucket       = "{provision_data.module_provision_data.tf_state_bucket}"
-                key          = "{provision_data.module_provision_data.tf_state_key}"
-                region       = "{provision_data.module_provision_data.tf_state_region}"
-                use_lockfile = true
-                profile      = "external-resources-state"
-              }}
-            }}"""),
-        encoding="utf-8",
-    )
+    output.write_text(terraform_fmt(_backend_tf(provision_data)), encoding="utf-8")
     return output
 
 
-def create_variables_tf_file(
+# Bump whenever the formatting of variables.tf changes
+VARIABLES_TF_GENERATOR_VERSION = 3
+_FINGERPRINT_HEADER = "# external-resources-io fingerprint: "
+
+
+def _variables_tf(model: type[BaseModel]) -> str:
+    return _convert_json_to_hcl(_generate_terraform_variables_from_model(model))
+
+
+def _fingerprint(variables_tf: str) -> str:
+    return hashlib.sha256(
+        f"{VARIABLES_TF_GENERATOR_VERSION}\0{variables_tf}".encode()
+    ).hexdigest()
+
+
+def model_fingerprint(model: type[BaseModel]) -> str:
+    """Fingerprint of the variables.tf generated from the model.
+
+    It's a digest of the unformatted HCL, so it changes exactly when the
+    generated file does. Generating the HCL is cheap, only `terraform fmt`
+    is skipped for up-to-date files.
+    """
+    return _fingerprint(_variables_tf(model))
+
+
+def _header(fingerprint: str) -> str:
+    return f"{_FINGERPRINT_HEADER}{fingerprint}\n"
+
+
+def _has_fingerprint(output: Path, fingerprint: str) -> bool:
+    try:
+        with output.open(encoding="utf-8") as f:
+            return f.readline() == _header(fingerprint)
+    except FileNotFoundError:
+        return False
+
+
+def variables_tf_up_to_date(
     model: type[BaseModel], variables_file: Path | str | None = None
+) -> bool:
+    """Checks whether variables.tf has been generated from the current model."""
+    output = Path(variables_file or Config().variables_tf_file)
+    return _has_fingerprint(output, model_fingerprint(model))
+
+
+@profiled
+def create_variables_tf_file(
+    model: type[BaseModel],
+    variables_file: Path | str | None = None,
+    *,
+    force: bool = False,
 ) -> Path:
-    """Generates Terraform variables.tf file."""
+    """Generates Terraform variables.tf file.
+
+    The file starts with a fingerprint of the generated HCL. `terraform fmt`
+    and the write are skipped if the fingerprint of an existing file
+    matches, unless `force` is set.
+    """
     output = Path(variables_file or Config().variables_tf_file)
+    variables_tf = _variables_tf(model)
+    fingerprint = _fingerprint(variables_tf)
+    if not force and _has_fingerprint(output, fingerprint):
+        return output
     output.write_text(
-        terraform_fmt(
-            _convert_json_to_hcl(_generate_terraform_variables_from_model(model))
-        ),
-        encoding="utf-8",
+        _header(fingerprint) + terraform_fmt(variables_tf), encoding="utf-8"
     )
     return output
 
 
+class TerraformFiles(NamedTuple):
+    backend_tf_file: Path
+    tf_vars_file: Path
+    variables_tf_file: Path
+
+
+@profiled
+def create_terraform_files(
+    ai_input: AppInterfaceInputInterface,
+    *,
+    backend_tf_file: Path | str | None = None,
+    tf_vars_file: Path | str | None = None,
+    variables_tf_file: Path | str | None = None,
+    force: bool = False,
+    canonical: bool = False,
+) -> TerraformFiles:
+    """Creates backend.tf, terraform.tfvars.json and variables.tf at once.
+
+    The tfvars json is written while both HCL files are generated and
+    formatted with a single terraform fmt call. variables.tf is skipped like
+    in `create_variables_tf_file` if it is up to date. See
+    `create_tf_vars_json` for `canonical`.
+    """
+    config = Config()
+    files = TerraformFiles(
+        backend_tf_file=Path(backend_tf_file or config.backend_tf_file),
+        tf_vars_file=Path(tf_vars_file or config.tf_vars_file),
+        variables_tf_file=Path(variables_tf_file or config.variables_tf_file),
+    )
+    model = type(ai_input.data)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        writes: list[Future[Any]] = [
+            executor.submit(
+                create_tf_vars_json,
+                ai_input.data,
+                files.tf_vars_file,
+                canonical=canonical,
+            )
+        ]
+        documents = {files.backend_tf_file: _backend_tf(ai_input.provision)}
+        variables_tf = _variables_tf(model)
+        fingerprint = _fingerprint(variables_tf)
+        if force or not _has_fingerprint(files.variables_tf_file, fingerprint):
+            documents[files.variables_tf_file] = variables_tf
+        for output, text in zip(
+            documents, terraform_fmt_many(list(documents.values())), strict=True
+        ):
+            writes.append(
+                executor.submit(
+                    output.write_text,
+                    _header(fingerprint) + text
+                    if output == files.variables_tf_file
+                    else text,
+                    encoding="utf-8",
+                )
+            )
+        # re-raise write errors
+        for write in writes:
+            write.result()
+    return files
+
+
 def _generate_fields(model: type[BaseModel]) -> dict[str, dict]:
+    # empty for models whose core schema isn't a plain model, e.g. root
+    # models, their fields fall back to the type annotation
+    terraform_types = model_terraform_types(model)
     return {
         field_name: _generate_terraform_variable(
             python_type=field_info.annotation,
             default=field_info.default,
             description=field_info.description,
+            terraform_type=tf_type.render()
+            if (tf_type := terraform_types.get(field_name))
+            else None,
         )
         for field_name, field_info in model.model_fields.items()
     }
@@ -89,10 +399,15 @@ def _generate_terraform_variables_from_model(model: type[BaseModel]) -> dict:
 
 
 def _generate_terraform_variable(
-    python_type: Any, default: Any = None, description: str | None = None
+    python_type: Any,
+    default: Any = None,
+    description: str | None = None,
+    terraform_type: str | None = None,
 ) -> dict:
     """Generates a Terraform variable block."""
-    variable_block: dict[str, Any] = {"type": _get_terraform_type(python_type)}
+    variable_block: dict[str, Any] = {
+        "type": terraform_type or _get_terraform_type(python_type)
+    }
 
     if default is not PydanticUndefined:
         variable_block["default"] = (
@@ -105,69 +420,9 @@ def _generate_terraform_variable(
     return variable_block
 
 
-def _convert_generic_types(origin: Any, args: Any) -> str:  # ruff: ignore[too-many-return-statements]
-    """Convert generic types to Terraform types."""
-    match origin:
-        case t if t in {list, Sequence}:
-            return f"list({_get_terraform_type(args[0])})" if args else "list(any)"
-
-        case t if t is set:
-            return f"set({_get_terraform_type(args[0])})" if args else "set(any)"
-
-        case t if t is dict:
-            return f"map({_get_terraform_type(args[1])})" if args else "map(any)"
-
-        case t if t is Literal:
-            if args and all(isinstance(a, bool) for a in args):
-                return "bool"
-            if args and all(isinstance(a, int) for a in args):
-                return "number"
-            return "string"
-
-        case t if t in {UnionType, Union}:
-            if type(None) in args:
-                return _get_terraform_type(args[0])
-            return "any"
-
-        case _:
-            return "any"
-
-
-def _convert_basic_types(python_type: Any) -> str:  # ruff: ignore[too-many-return-statements]
-    """Convert basic python types to Terraform types."""
-    match python_type:
-        case t if t is str:
-            return "string"
-        case t if t is int:
-            return "number"
-        case t if t is bool:
-            return "bool"
-        case t if t is list:
-            return "list(any)"
-        case t if t is set:
-            return "set(any)"
-        case t if t is dict:
-            return "map(any)"
-        case t if issubclass(t, BaseModel):
-            # nested model
-            fields_types = ",".join(
-                f"{k} = {v['type']}" for k, v in _generate_fields(t).items()
-            )
-            return f"object({{{fields_types}}})"
-        case _:
-            return "any"
-
-
 def _get_terraform_type(python_type: Any) -> str:
     """Maps Python types to Terraform types."""
-    origin = get_origin(python_type)
-    args = get_args(python_type)
-
-    return (
-        _convert_generic_types(origin, args)
-        if origin is not None
-        else _convert_basic_types(python_type)
-    )
+    return terraform_type(python_type).render()
 
 
 def _convert_json_value_to_hcl(value: Any) -> str:  # ruff: ignore[too-many-return-statements]
@@ -179,10 +434,12 @@ def _convert_json_value_to_hcl(value: Any) -> str:  # ruff: ignore[too-many-retu
             return str(value).lower()
         case t if isinstance(t, int | float):
             return str(value)
-        case t if isinstance(t, list | set):
+        case t if isinstance(t, list | set | frozenset):
             if not value:
                 return "[]"
-            return "[" + ",".join(_convert_json_value_to_hcl(e) for e in value) + "]"
+            # the iteration order of sets differs between processes
+            elements = _sorted(value) if isinstance(value, set | frozenset) else value
+            return "[" + ",".join(_convert_json_value_to_hcl(e) for e in elements) + "]"
         case t if isinstance(t, dict):
             if not value:
                 return "{}"
@@ -0,0 +1,144 @@
+import json
+import logging
+from contextlib import ExitStack
+from enum import StrEnum
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, TextIO
+
+from external_resources_io._fs import atomic_write
+from external_resources_io.config import Config
+from external_resources_io.redact import REDACTED
+from external_resources_io.terraform.plan import Action, Plan
+from external_resources_io.terraform.run import terraform_stdout
+from external_resources_io.terraform.stream import changed_output_names, iter_members
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from external_resources_io.terraform.plan_cache import PlanIndex
+
+logger = logging.getLogger(__name__)
+
+
+class SensitiveOutputs(StrEnum):
+    # write sensitive values as they are
+    KEEP = "keep"
+    # replace sensitive values with a placeholder
+    REDACT = "redact"
+    # drop sensitive outputs
+    OMIT = "omit"
+
+
+def changed_outputs(plan: Plan | PlanIndex) -> set[str]:
+    """Names of the outputs the plan changes."""
+    if isinstance(plan, Plan):
+        return {
+            name
+            for name, change in plan.output_changes.items()
+            if change.actions != [Action.ActionNoop]
+        }
+    return {
+        name
+        for name, actions in plan.output_changes.items()
+        if actions != (Action.ActionNoop.value,)
+    }
+
+
+def _outputs(
+    outputs: Iterator[tuple[str, dict[str, Any]]],
+    names: set[str] | None,
+    sensitive: SensitiveOutputs,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    for name, output in outputs:
+        if names is not None and name not in names:
+            continue
+        if output.get("sensitive"):
+            if sensitive == SensitiveOutputs.OMIT:
+                continue
+            if sensitive == SensitiveOutputs.REDACT:
+                output = {**output, "value": REDACTED}  # ruff: ignore[redefined-loop-name]
+        yield name, output
+
+
+def _write_outputs(fp: IO[str], outputs: Iterator[tuple[str, dict[str, Any]]]) -> None:
+    # one output at a time, the whole document is never built in memory
+    fp.write("{")
+    for i, (name, output) in enumerate(outputs):
+        if i:
+            fp.write(",")
+        fp.write(f"{json.dumps(name)}:")
+        json.dump(output, fp)
+    fp.write("}")
+
+
+def _write_outputs_atomic(
+    outputs: Iterator[tuple[str, dict[str, Any]]], output_file: Path
+) -> None:
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(output_file) as f:
+        _write_outputs(f, outputs)
+
+
+def _merged(
+    outputs: Iterator[tuple[str, dict[str, Any]]],
+    names: set[str],
+    existing: TextIO | None,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    # only the changed outputs are few enough to be held in memory
+    changed = dict(outputs)
+    if existing is not None:
+        for name, output in iter_members(existing):
+            if name not in names:
+                yield name, output
+            elif name in changed:
+                yield name, changed.pop(name)
+    # new outputs; deleted ones are neither in changed nor kept
+    yield from changed.items()
+
+
+def create_outputs_file(
+    output_file: Path | str | None = None,
+    *,
+    plan: Plan | PlanIndex | None = None,
+    plan_file: Path | str | None = None,
+    only_changed: bool = False,
+    sensitive: SensitiveOutputs = SensitiveOutputs.KEEP,
+) -> Path | None:
+    """Writes the terraform output -json values to the outputs file.
+
+    With only_changed, only the outputs changed by the plan are updated,
+    the others are kept from the existing outputs file, and terraform isn't
+    called at all if the plan doesn't change any output. Returns None in
+    that case. Without a plan, the output changes are streamed from
+    plan_file (Config.plan_file_json by default) without validating it.
+
+    The outputs are streamed from terraform to the file, which is replaced
+    atomically.
+    """
+    config = Config()
+    output = Path(output_file or config.outputs_file)
+    names = None
+    if only_changed:
+        names = (
+            changed_outputs(plan)
+            if plan is not None
+            else changed_output_names(plan_file or config.plan_file_json)
+        )
+        if not names:
+            logger.info("No output changes, skipping outputs")
+            return None
+
+    with (
+        terraform_stdout(["output", "-json"]) as stdout,
+        ExitStack() as stack,
+    ):
+        outputs = _outputs(iter_members(stdout), names, sensitive)
+        if names is not None:
+            existing = (
+                stack.enter_context(output.open(encoding="utf-8"))
+                if output.exists()
+                else None
+            )
+            outputs = _merged(outputs, names, existing)
+        _write_outputs_atomic(outputs, output)
+    return output
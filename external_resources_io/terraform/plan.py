@@ -1,9 +1,19 @@
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 from pydantic import BaseModel
 
+from external_resources_io.concurrency import thread_map
+from external_resources_io.config import Config
+from external_resources_io.profiling import profiled
+from external_resources_io.terraform.plan_cache import PlanCache, PlanIndex
+from external_resources_io.terraform.state import StateView
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
 # Ref: https://github.com/hashicorp/terraform-json/blob/main/plan.go
 
 
@@ -87,7 +97,17 @@ class DeferredResourceChange(BaseModel):
 
 class ResourceAttribute(BaseModel):
     resource: str
-    attribute: list[str]
+    # JSON path of the attribute, e.g. ["ingress", 0, "cidr_blocks"]
+    attribute: list[str | int]
+
+
+class ResourceChangeDetails(NamedTuple):
+    change: ResourceChange
+    # paths of the attributes of this resource which may have contributed
+    # to the planned changes
+    relevant_attributes: tuple[tuple[str | int, ...], ...]
+    # the change of this resource detected outside of terraform, if any
+    drift: ResourceChange | None
 
 
 class Plan(BaseModel):
@@ -155,9 +175,106 @@ class Plan(BaseModel):
 
     errored: bool | None = None
 
+    @cached_property
+    def planned_values_view(self) -> StateView:
+        """Indexed view of planned_values."""
+        return StateView(self.planned_values)
+
+    @cached_property
+    def prior_state_view(self) -> StateView:
+        """Indexed view of the values of prior_state."""
+        return StateView(self.prior_state.get("values") or {})
+
+    @cached_property
+    def change_details(self) -> dict[str, ResourceChangeDetails]:
+        """Resource changes with their relevant attributes and drift, by address.
+
+        Built in a single pass over resource_changes, resource_drift and
+        relevant_attributes.
+        """
+        relevant: dict[str, list[tuple[str | int, ...]]] = {}
+        for attribute in self.relevant_attributes:
+            relevant.setdefault(attribute.resource, []).append(
+                tuple(attribute.attribute)
+            )
+        drift = {rc.address: rc for rc in self.resource_drift if rc.address}
+        return {
+            rc.address: ResourceChangeDetails(
+                change=rc,
+                relevant_attributes=tuple(relevant.get(rc.address, ())),
+                drift=drift.get(rc.address),
+            )
+            for rc in self.resource_changes
+            if rc.address
+        }
+
+    def details(self, address: str) -> ResourceChangeDetails | None:
+        """Details of the change of the resource with the given address."""
+        return self.change_details.get(address)
+
+    def drifted_changes(self) -> Iterator[ResourceChangeDetails]:
+        """Details of all resource changes which drifted outside of terraform."""
+        return (d for d in self.change_details.values() if d.drift is not None)
+
 
 class TerraformJsonPlanParser:
-    def __init__(self, plan_path: str) -> None:
-        self.plan = Plan.model_validate_json(
-            Path(plan_path).read_text(encoding="utf-8")
-        )
+    """Parses a Terraform JSON plan file.
+
+    Without a cache, the plan is validated right away. With a cache, it's
+    parsed on the first access of `.plan`, which is never needed if the
+    index is cached, and validation errors are raised then.
+    """
+
+    def __init__(self, plan_path: str, cache: PlanCache | None = None) -> None:
+        if cache is None and (config := Config()).plan_cache_dir:
+            cache = PlanCache(config.plan_cache_dir, config.plan_cache_max_bytes)
+        self.cache = cache
+        self._plan_path = Path(plan_path)
+        # the raw plan, dropped once the plan or the index is built
+        self._data: bytes | None = self._plan_path.read_bytes()
+        if cache is None:
+            _ = self.plan
+
+    def _raw(self) -> bytes:
+        if self._data is None:
+            return self._plan_path.read_bytes()
+        return self._data
+
+    @cached_property
+    @profiled
+    def plan(self) -> Plan:
+        """The validated plan."""
+        try:
+            return Plan.model_validate_json(self._raw())
+        finally:
+            self._data = None
+
+    @cached_property
+    def index(self) -> PlanIndex:
+        """Summary of the plan changes, read from the cache if possible."""
+        if self.cache is None:
+            return PlanIndex.from_plan(self.plan)
+        key = self.cache.key(self._raw())
+        if (index := self.cache.get(key)) is None:
+            index = PlanIndex.from_plan(self.plan)
+            self.cache.put(key, index)
+        self._data = None
+        return index
+
+
+def parse_plans(
+    plan_paths: Iterable[str],
+    *,
+    max_workers: int | None = None,
+    cache: PlanCache | None = None,
+) -> list[Plan]:
+    """Parse many plan files, results in input order.
+
+    Plans are parsed in parallel threads on free-threaded builds or if
+    max_workers is given, see `thread_map`.
+    """
+
+    def parse(plan_path: str) -> Plan:
+        return TerraformJsonPlanParser(plan_path, cache=cache).plan
+
+    return thread_map(parse, plan_paths, max_workers=max_workers)
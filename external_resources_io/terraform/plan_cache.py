@@ -0,0 +1,169 @@
+"""On-disk cache of Terraform JSON plan indexes.
+
+Building the full `Plan` object graph costs about the same whether it is
+validated from JSON or unpickled, so the cache stores a compact index of the
+plan instead: the summary of every resource and output change, serialized
+with `marshal`. Loading an index is much cheaper than parsing the plan, so
+consumers which only need addresses, types and actions don't parse the plan
+again.
+
+Entries are keyed by the SHA-256 of the plan file contents, written atomically
+(temporary file + rename) and trimmed to `max_bytes` by evicting the least
+recently used entries, so several processes can share one cache directory.
+"""
+
+import contextlib
+import hashlib
+import logging
+import marshal
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from external_resources_io._fs import atomic_write
+
+if TYPE_CHECKING:
+    from external_resources_io.terraform.plan import Plan
+
+logger = logging.getLogger(__name__)
+
+# bump whenever the index layout changes
+PLAN_CACHE_VERSION = 1
+_SUFFIX = ".plan-index"
+
+
+class ResourceChangeIndex(NamedTuple):
+    address: str | None
+    type: str
+    name: str
+    module_address: str | None
+    provider_name: str | None
+    # action values, e.g. ("delete", "create")
+    actions: tuple[str, ...]
+
+
+class PlanIndex(NamedTuple):
+    format_version: str | None
+    terraform_version: str | None
+    complete: bool | None
+    errored: bool | None
+    resource_changes: list[ResourceChangeIndex]
+    # output name -> action values
+    output_changes: dict[str, tuple[str, ...]]
+
+    @classmethod
+    def from_plan(cls, plan: Plan) -> PlanIndex:
+        """Build the index of a parsed plan."""
+        return cls(
+            format_version=plan.format_version,
+            terraform_version=plan.terraform_version,
+            complete=plan.complete,
+            errored=plan.errored,
+            resource_changes=[
+                ResourceChangeIndex(
+                    address=rc.address,
+                    type=rc.type,
+                    name=rc.name,
+                    module_address=rc.module_address,
+                    provider_name=rc.provider_name,
+                    actions=tuple(a.value for a in rc.change.actions)
+                    if rc.change
+                    else (),
+                )
+                for rc in plan.resource_changes
+            ],
+            output_changes={
+                name: tuple(a.value for a in change.actions)
+                for name, change in plan.output_changes.items()
+            },
+        )
+
+    def dumps(self) -> bytes:
+        """Compact binary serialization of the index."""
+        # marshal only supports the builtin types, not NamedTuple subclasses
+        return marshal.dumps((
+            self.format_version,
+            self.terraform_version,
+            self.complete,
+            self.errored,
+            [tuple(rc) for rc in self.resource_changes],
+            self.output_changes,
+        ))
+
+    @classmethod
+    def loads(cls, data: bytes) -> PlanIndex:
+        """Load an index serialized by `dumps`."""
+        # the cache directory is private to the user, see PlanCache.put
+        (
+            format_version,
+            terraform_version,
+            complete,
+            errored,
+            resource_changes,
+            output_changes,
+        ) = marshal.loads(data)  # ruff: ignore[suspicious-marshal-usage]
+        return cls(
+            format_version=format_version,
+            terraform_version=terraform_version,
+            complete=complete,
+            errored=errored,
+            resource_changes=list(map(ResourceChangeIndex._make, resource_changes)),
+            output_changes=output_changes,
+        )
+
+
+class PlanCache:
+    def __init__(self, directory: Path | str, max_bytes: int = 256 * 1024**2) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(plan: bytes) -> str:
+        """Cache key of the given raw plan file contents."""
+        digest = hashlib.sha256(plan)
+        digest.update(f"\0{PLAN_CACHE_VERSION}\0{marshal.version}".encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> PlanIndex | None:
+        """Return the cached plan index or None on a cache miss."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            index = PlanIndex.loads(data)
+        except EOFError, ValueError, TypeError:
+            logger.warning(f"Ignoring corrupt plan cache entry {path}")
+            path.unlink(missing_ok=True)
+            return None
+        # mark as recently used, the entry may have been evicted meanwhile
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        return index
+
+    def put(self, key: str, index: PlanIndex) -> None:
+        """Store the index atomically and evict old entries if needed."""
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with atomic_write(self._path(key), binary=True) as f:
+            f.write(index.dumps())
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for path in self.directory.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
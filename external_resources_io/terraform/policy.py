@@ -0,0 +1,172 @@
+# ruff: file-ignore[any-type]
+"""Guardrails for the resource changes of a plan.
+
+Rules are compiled into a dispatch table keyed by resource type and action,
+so every change is only checked against the rules which can apply to it and
+all rules are evaluated in a single pass over the changes:
+
+    engine = PolicyEngine([
+        Rule(
+            name="no-db-deletes",
+            message="RDS instances must not be deleted",
+            resource_types=["aws_db_instance"],
+            actions=[Action.ActionDelete],
+        ),
+        Rule(
+            name="module-only",
+            message="Only resources of module.app may change",
+            exclude_addresses=["module.app.*"],
+        ),
+    ])
+    violations = engine.check(plan)
+"""
+
+import re
+from fnmatch import translate
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from pydantic import BaseModel
+
+from external_resources_io.terraform.plan import Action, Plan, ResourceChange
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+_MISSING = object()
+
+
+class Rule(BaseModel):
+    name: str
+    message: str = ""
+    # Resource types the rule applies to, all types if empty.
+    resource_types: list[str] = []
+    # The rule applies to changes with any of these actions. If empty, it
+    # applies to all changes but no-ops.
+    actions: list[Action] = []
+    # Only match replacements (True) or anything but replacements (False).
+    replace: bool | None = None
+    # Address globs, e.g. "module.db.*", the rule applies to. All addresses
+    # if empty.
+    addresses: list[str] = []
+    # Address globs the rule doesn't apply to.
+    exclude_addresses: list[str] = []
+    # Attribute paths, e.g. "tags.Name" or "ingress.0.cidr_blocks". If set,
+    # the rule only applies if any of these attributes changes.
+    attributes: list[str] = []
+
+
+class Violation(NamedTuple):
+    rule: Rule
+    address: str | None
+    actions: tuple[Action, ...]
+
+    @property
+    def message(self) -> str:
+        return f"{self.address}: {self.rule.message or self.rule.name}"
+
+
+def _glob_pattern(globs: Sequence[str]) -> re.Pattern[str] | None:
+    if not globs:
+        return None
+    return re.compile("|".join(f"(?:{translate(glob)})" for glob in globs))
+
+
+def _lookup(value: Any, path: Sequence[str]) -> Any:
+    for key in path:
+        match value:
+            case dict() if key in value:
+                value = value[key]
+            case list() if key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            case _:
+                return _MISSING
+    return value
+
+
+def _is_replace(actions: Sequence[Action]) -> bool:
+    return Action.ActionDelete in actions and Action.ActionCreate in actions
+
+
+class _CompiledRule:
+    def __init__(self, position: int, rule: Rule) -> None:
+        self.position = position
+        self.rule = rule
+        self.include = _glob_pattern(rule.addresses)
+        self.exclude = _glob_pattern(rule.exclude_addresses)
+        self.paths = [tuple(path.split(".")) for path in rule.attributes]
+
+    def _attributes_changed(self, rc: ResourceChange) -> bool:
+        if rc.change is None:
+            return False
+        change = rc.change
+        for path in self.paths:
+            if _lookup(change.after_unknown, path) is True:
+                return True
+            if _lookup(change.before, path) != _lookup(change.after, path):
+                return True
+        return False
+
+    def matches(self, rc: ResourceChange, actions: Sequence[Action]) -> bool:
+        # type and action are already matched by the dispatch table
+        if self.rule.replace is not None and self.rule.replace != _is_replace(actions):
+            return False
+        address = rc.address or ""
+        if self.include and not self.include.fullmatch(address):
+            return False
+        if self.exclude and self.exclude.fullmatch(address):
+            return False
+        return not self.paths or self._attributes_changed(rc)
+
+
+class PolicyEngine:
+    """Evaluates all rules in a single pass over the resource changes."""
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.rules = list(rules)
+        # (resource type or None for all types, action or None for all
+        # actions but no-op) -> rules, in declaration order
+        self._dispatch: dict[tuple[str | None, Action | None], list[_CompiledRule]] = {}
+        for position, rule in enumerate(self.rules):
+            compiled = _CompiledRule(position, rule)
+            resource_types: list[str | None] = [*rule.resource_types] or [None]
+            actions: list[Action | None] = [*rule.actions] or [None]
+            for resource_type in resource_types:
+                for action in actions:
+                    self._dispatch.setdefault((resource_type, action), []).append(
+                        compiled
+                    )
+        self._candidates_cache: dict[
+            tuple[str, tuple[Action, ...]], list[_CompiledRule]
+        ] = {}
+
+    def _candidates(
+        self, resource_type: str, actions: tuple[Action, ...]
+    ) -> list[_CompiledRule]:
+        # plans have few distinct (type, actions) combinations
+        if (cached := self._candidates_cache.get((resource_type, actions))) is not None:
+            return cached
+        keys: list[Action | None] = list(actions)
+        if actions and actions != (Action.ActionNoop,):
+            keys.append(None)
+        candidates: dict[int, _CompiledRule] = {}
+        for action in keys:
+            for key in ((resource_type, action), (None, action)):
+                for compiled in self._dispatch.get(key, ()):
+                    candidates.setdefault(compiled.position, compiled)
+        rules = [candidates[position] for position in sorted(candidates)]
+        self._candidates_cache[resource_type, actions] = rules
+        return rules
+
+    def evaluate(self, changes: Iterable[ResourceChange]) -> Iterator[Violation]:
+        """Violations of the given changes, e.g. streamed from a plan file."""
+        for rc in changes:
+            actions = tuple(rc.change.actions) if rc.change else ()
+            for compiled in self._candidates(rc.type, actions):
+                if compiled.matches(rc, actions):
+                    yield Violation(
+                        rule=compiled.rule, address=rc.address, actions=actions
+                    )
+
+    def check(self, plan: Plan) -> list[Violation]:
+        """Violations of all resource changes of the plan."""
+        return list(self.evaluate(plan.resource_changes))
@@ -0,0 +1,324 @@
+"""Cached, indexed provider schemas for attribute lookups.
+
+`terraform providers schema -json` is tens of megabytes for big providers
+like AWS. It's run once per provider version: the output is split into one
+small file per resource type in a `ProviderSchemaCache`, and an index loads
+only the resource types it's asked for, e.g. the types of a plan:
+
+    schemas = load_provider_schemas(plan)
+    schema = schemas.attribute("aws_db_instance", ["password"])
+    if schema and schema.sensitive:
+        ...
+
+The JSON schema has no ForceNew flag, Terraform keeps it inside the
+providers. Use the replace_paths of a plan's resource changes to tell which
+attributes forced a replacement.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from external_resources_io._fs import atomic_directory
+from external_resources_io.config import Config
+from external_resources_io.terraform.run import terraform_run
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from external_resources_io.terraform.plan import Plan
+    from external_resources_io.terraform.plan_cache import PlanIndex
+
+logger = logging.getLogger(__name__)
+
+# bump whenever the cache layout changes
+PROVIDER_SCHEMA_CACHE_VERSION = 1
+
+RESOURCE = "resource"
+DATA_SOURCE = "data"
+
+_COLLECTIONS = frozenset({"list", "set", "map"})
+_SCHEMA_KEYS = {RESOURCE: "resource_schemas", DATA_SOURCE: "data_source_schemas"}
+_SAFE_NAME = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class AttributeSchema(NamedTuple):
+    # cty type, e.g. "string" or ["list", "string"], None for blocks and
+    # nested attributes
+    type: Any
+    description: str | None
+    required: bool
+    optional: bool
+    computed: bool
+    sensitive: bool
+    deprecated: bool
+    # "single", "list", "set" or "map" for blocks and nested attributes,
+    # None for plain attributes
+    nesting_mode: str | None
+
+
+type Attributes = dict[tuple[str, ...], AttributeSchema]
+
+
+def _index_block(
+    block: dict[str, Any], prefix: tuple[str, ...], index: Attributes
+) -> None:
+    for name, attribute in (block.get("attributes") or {}).items():
+        path = (*prefix, name)
+        nested = attribute.get("nested_type")
+        index[path] = AttributeSchema(
+            type=attribute.get("type"),
+            description=attribute.get("description"),
+            required=attribute.get("required", False),
+            optional=attribute.get("optional", False),
+            computed=attribute.get("computed", False),
+            sensitive=attribute.get("sensitive", False),
+            deprecated=attribute.get("deprecated", False),
+            nesting_mode=nested.get("nesting_mode") if nested else None,
+        )
+        if nested:
+            _index_block(nested, path, index)
+    for name, block_type in (block.get("block_types") or {}).items():
+        path = (*prefix, name)
+        nested_block = block_type.get("block") or {}
+        index[path] = AttributeSchema(
+            type=None,
+            description=nested_block.get("description"),
+            required=block_type.get("min_items", 0) > 0,
+            optional=block_type.get("min_items", 0) == 0,
+            computed=False,
+            sensitive=False,
+            deprecated=nested_block.get("deprecated", False),
+            nesting_mode=block_type.get("nesting_mode"),
+        )
+        _index_block(nested_block, path, index)
+
+
+def index_schema(schema: dict[str, Any]) -> Attributes:
+    """Attributes and nested blocks of a resource schema by path."""
+    index: Attributes = {}
+    _index_block(schema.get("block") or {}, (), index)
+    return index
+
+
+def _resolve(
+    attributes: Attributes, path: Sequence[str | int]
+) -> AttributeSchema | None:
+    key: tuple[str, ...] = ()
+    schema = None
+    # the next element may be a list index or map key
+    collection = False
+    for element in path:
+        child = (*key, str(element))
+        if child not in attributes:
+            if collection:
+                collection = False
+                continue
+            # an element of a plain attribute value, e.g. a tag of tags
+            if schema is not None and schema.nesting_mode is None:
+                return schema
+            return None
+        key = child
+        schema = attributes[child]
+        collection = schema.nesting_mode in _COLLECTIONS
+    return schema
+
+
+class ProviderSchemaCache:
+    """Provider schemas on disk, one file per resource type and version."""
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+
+    def _version_dir(self, provider: str, version: str) -> Path:
+        name = hashlib.sha256(
+            f"{PROVIDER_SCHEMA_CACHE_VERSION}\0{provider}\0{version}".encode()
+        ).hexdigest()
+        return self.directory / name
+
+    @staticmethod
+    def _file_name(kind: str, resource_type: str) -> str | None:
+        if not _SAFE_NAME.fullmatch(resource_type):
+            return None
+        return f"{kind}.{resource_type}.json"
+
+    def has(self, provider: str, version: str) -> bool:
+        return self._version_dir(provider, version).is_dir()
+
+    def put(self, provider: str, version: str, schema: dict[str, Any]) -> None:
+        """Store the schema of a provider version atomically.
+
+        The files are written to a temporary directory, which is renamed
+        once complete, so readers never see a partial schema.
+        """
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with atomic_directory(self._version_dir(provider, version)) as tmp:
+            for kind, key in _SCHEMA_KEYS.items():
+                for resource_type, resource_schema in (schema.get(key) or {}).items():
+                    if (name := self._file_name(kind, resource_type)) is None:
+                        logger.warning(f"Not caching schema of {resource_type}")
+                        continue
+                    (tmp / name).write_text(
+                        json.dumps(resource_schema), encoding="utf-8"
+                    )
+
+    def get(
+        self, provider: str, version: str, resource_type: str, kind: str = RESOURCE
+    ) -> dict[str, Any] | None:
+        """The cached schema of a resource type, None if unknown."""
+        if (name := self._file_name(kind, resource_type)) is None:
+            return None
+        path = self._version_dir(provider, version) / name
+        try:
+            return json.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring corrupt provider schema cache entry {path}")
+            return None
+
+
+def _provider_local_name(provider: str) -> str:
+    # registry.terraform.io/hashicorp/aws -> aws
+    return provider.rsplit("/", 1)[-1]
+
+
+def _is_data_source(address: str | None, resource_type: str) -> bool:
+    if not address:
+        return False
+    return address.startswith(f"data.{resource_type}.") or (
+        f".data.{resource_type}." in address
+    )
+
+
+class ProviderSchemaIndex:
+    """Index from (resource type, attribute path) to attribute metadata.
+
+    Resource types are loaded from the cache on first use or in bulk with
+    load_plan().
+    """
+
+    def __init__(self, cache: ProviderSchemaCache, versions: Mapping[str, str]) -> None:
+        self.cache = cache
+        # provider address -> version
+        self.versions = dict(versions)
+        self._loaded: dict[tuple[str, str, str], Attributes] = {}
+
+    def provider_of(self, resource_type: str) -> str | None:
+        """The provider of a resource type by the Terraform naming rule.
+
+        E.g. aws_s3_bucket belongs to the provider with the local name aws.
+        """
+        prefix = resource_type.split("_", 1)[0]
+        for provider in self.versions:
+            if _provider_local_name(provider) == prefix:
+                return provider
+        return None
+
+    @property
+    def loaded_types(self) -> set[str]:
+        return {resource_type for _, _, resource_type in self._loaded}
+
+    def attributes(
+        self,
+        resource_type: str,
+        *,
+        provider: str | None = None,
+        kind: str = RESOURCE,
+    ) -> Attributes | None:
+        """All attributes of a resource type by path, None if unknown."""
+        provider = provider or self.provider_of(resource_type)
+        if provider is None or (version := self.versions.get(provider)) is None:
+            return None
+        key = (provider, kind, resource_type)
+        if (attributes := self._loaded.get(key)) is None:
+            schema = self.cache.get(provider, version, resource_type, kind)
+            if schema is None:
+                return None
+            attributes = self._loaded[key] = index_schema(schema)
+        return attributes
+
+    def attribute(
+        self,
+        resource_type: str,
+        path: Sequence[str | int] | str,
+        *,
+        provider: str | None = None,
+        kind: str = RESOURCE,
+    ) -> AttributeSchema | None:
+        """Metadata of an attribute or nested block, None if unknown.
+
+        The path is a plan path like ["ingress", 0, "cidr_blocks"] or a
+        dotted one like "ingress.0.cidr_blocks". List indexes and map keys
+        are skipped, paths into a plain attribute value, e.g. "tags.Name",
+        return the attribute.
+        """
+        attributes = self.attributes(resource_type, provider=provider, kind=kind)
+        if attributes is None:
+            return None
+        return _resolve(attributes, path.split(".") if isinstance(path, str) else path)
+
+    def load_plan(self, plan: Plan | PlanIndex) -> None:
+        """Load the resource types of all resource changes of the plan."""
+        for rc in plan.resource_changes:
+            kind = DATA_SOURCE if _is_data_source(rc.address, rc.type) else RESOURCE
+            self.attributes(rc.type, provider=rc.provider_name, kind=kind)
+
+
+def _chdir(working_dir: Path | str | None) -> list[str]:
+    return [f"-chdir={working_dir}"] if working_dir else []
+
+
+def provider_versions(working_dir: Path | str | None = None) -> dict[str, str]:
+    """The selected provider versions of an initialized working directory."""
+    # reading the versions is safe in dry-run mode too
+    output = terraform_run([*_chdir(working_dir), "version", "-json"], dry_run=False)
+    return json.loads(output).get("provider_selections") or {}
+
+
+def _fetch_schemas(
+    cache: ProviderSchemaCache,
+    versions: Mapping[str, str],
+    working_dir: Path | str | None,
+) -> None:
+    missing = [p for p, v in versions.items() if not cache.has(p, v)]
+    if not missing:
+        return
+    logger.info(f"Fetching provider schemas of {', '.join(missing)}")
+    output = terraform_run(
+        [*_chdir(working_dir), "providers", "schema", "-json"], dry_run=False
+    )
+    schemas = json.loads(output).get("provider_schemas") or {}
+    for provider in missing:
+        if (schema := schemas.get(provider)) is None:
+            logger.warning(f"No schema of provider {provider}")
+            continue
+        cache.put(provider, versions[provider], schema)
+
+
+def load_provider_schemas(
+    plan: Plan | PlanIndex | None = None,
+    *,
+    working_dir: Path | str | None = None,
+    cache_dir: Path | str | None = None,
+    resource_types: Iterable[str] = (),
+) -> ProviderSchemaIndex:
+    """Index of the provider schemas of an initialized working directory.
+
+    `terraform providers schema -json` only runs if the schema of a selected
+    provider version isn't cached yet (Config.provider_schema_cache_dir by
+    default). The resource types of the plan and resource_types are loaded
+    right away, any other type on its first lookup.
+    """
+    cache = ProviderSchemaCache(cache_dir or Config().provider_schema_cache_dir)
+    versions = provider_versions(working_dir)
+    _fetch_schemas(cache, versions, working_dir)
+    index = ProviderSchemaIndex(cache, versions)
+    if plan is not None:
+        index.load_plan(plan)
+    for resource_type in resource_types:
+        index.attributes(resource_type)
+    return index
@@ -1,28 +1,44 @@
 import logging
 import subprocess
-from typing import TYPE_CHECKING
+import tempfile
+from contextlib import contextmanager
+from functools import cache
+from typing import IO, TYPE_CHECKING
 
 from external_resources_io.config import Config
+from external_resources_io.redact import redact_installed
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterator, Sequence
 
 logger = logging.getLogger(__name__)
 
 
-def terraform_available() -> bool:
+# Separates the documents of a combined terraform fmt call
+_FMT_SEPARATOR = "# external-resources-io: end of document"
+
+
+@cache
+def _terraform_available(terraform_cmd: str) -> bool:
     try:
-        subprocess.run(["terraform", "--version"], check=True, capture_output=True)
+        subprocess.run(
+            [*terraform_cmd.split(), "--version"], check=True, capture_output=True
+        )
         return True
     except subprocess.CalledProcessError, FileNotFoundError:
         return False
 
 
+def terraform_available() -> bool:
+    """Whether the configured terraform command (Config.terraform_cmd) works."""
+    return _terraform_available(Config().terraform_cmd)
+
+
 def terraform_fmt(data: str) -> str:
     if not terraform_available():
         return data
     return subprocess.run(
-        ["terraform", "fmt", "-"],
+        [*Config().terraform_cmd.split(), "fmt", "-"],
         input=data,
         text=True,
         check=True,
@@ -30,6 +46,17 @@ def terraform_fmt(data: str) -> str:
     ).stdout
 
 
+def terraform_fmt_many(documents: Sequence[str]) -> list[str]:
+    """Format several HCL documents with a single terraform fmt call."""
+    if not terraform_available():
+        return list(documents)
+    formatted = terraform_fmt(f"\n{_FMT_SEPARATOR}\n".join(documents))
+    return [
+        document.strip("\n") + "\n"
+        for document in formatted.split(f"\n{_FMT_SEPARATOR}\n")
+    ]
+
+
 def terraform_run(args: Sequence[str], *, dry_run: bool | None = None) -> str:
     """Run a terraform command."""
     config = Config()
@@ -42,7 +69,56 @@ def terraform_run(args: Sequence[str], *, dry_run: bool | None = None) -> str:
     try:
         cmd = subprocess.run(args, capture_output=True, text=True, check=True)
     except subprocess.CalledProcessError as e:
+        # the output may contain secrets, see redact_logs
+        e.stdout = redact_installed(e.stdout or "")
+        e.stderr = redact_installed(e.stderr or "")
         logger.exception(e.stdout)
         logger.exception(e.stderr)
         raise
     return cmd.stdout
+
+
+@contextmanager
+def terraform_stdout(args: Sequence[str]) -> Iterator[IO[str]]:
+    """Run a read-only terraform command and stream its stdout.
+
+    Unlike terraform_run, the output isn't captured as a whole, e.g. for
+    `output -json` of big workspaces. The command always runs, also in
+    dry-run mode. Raises CalledProcessError like terraform_run if it fails,
+    once the block is done reading.
+    """
+    args = [*Config().terraform_cmd.split(), *args]
+    # stderr is spooled to a file, a full pipe would block terraform
+    with (
+        tempfile.TemporaryFile("w+", encoding="utf-8") as stderr,
+        subprocess.Popen(
+            args, stdout=subprocess.PIPE, stderr=stderr, text=True
+        ) as proc,
+    ):
+        if proc.stdout is None:
+            raise RuntimeError("No stdout pipe")
+        try:
+            yield proc.stdout
+        except BaseException as e:
+            proc.kill()
+            # killing an exited process keeps its returncode: the error of a
+            # failed command explains its incomplete output
+            if proc.wait() > 0:
+                raise _called_process_error(proc, args, stderr) from e
+            raise
+        # terraform can't exit while the rest of its output isn't read
+        proc.stdout.read()
+        if proc.wait():
+            raise _called_process_error(proc, args, stderr)
+
+
+def _called_process_error(
+    proc: subprocess.Popen[str], args: Sequence[str], stderr: IO[str]
+) -> subprocess.CalledProcessError:
+    stderr.seek(0)
+    # the output may contain secrets, see redact_logs
+    error = subprocess.CalledProcessError(
+        proc.returncode, args, "", redact_installed(stderr.read())
+    )
+    logger.error(error.stderr)
+    return error
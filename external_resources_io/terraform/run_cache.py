@@ -0,0 +1,189 @@
+"""Skip terraform runs whose inputs didn't change since the last apply.
+
+A run is identified by its Terraform state (bucket and key) and described by
+a digest of everything which determines its outcome: the validated
+app-interface input, the generated backend.tf and variables.tf, the module
+version and the action. After a completed apply or destroy (not a dry-run),
+the digest is recorded in a `RunCacheStore`. Later runs with the same
+digest, e.g. init, plan and apply of an unchanged input, are skipped with
+`EXIT_SKIP`, unless the record is older than `max_age`, which forces
+periodic runs to detect drift. Other commands never record anything, so a
+plan can't make the following apply skip.
+"""
+
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+from pydantic import BaseModel, ValidationError
+
+from external_resources_io._fs import atomic_write
+from external_resources_io.config import Config
+from external_resources_io.exit_status import EXIT_OK, EXIT_SKIP
+from external_resources_io.terraform.generators import canonical_tf_vars_json
+from external_resources_io.terraform.run import terraform_run
+from external_resources_io.terraform.scheduler import StateKey
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from external_resources_io.input import AppInterfaceInputInterface
+
+logger = logging.getLogger(__name__)
+
+# bump whenever the digest or the meaning of records changes
+RUN_CACHE_VERSION = 2
+
+# terraform commands whose success is recorded
+RECORDED_COMMANDS = frozenset({"apply", "destroy"})
+
+
+class RunRecord(BaseModel):
+    digest: str
+    # unix timestamp of the end of the run
+    finished_at: float
+
+
+class RunCacheStore(Protocol):
+    def get(self, key: str) -> RunRecord | None: ...
+
+    def put(self, key: str, record: RunRecord) -> None: ...
+
+
+class LocalRunCacheStore:
+    """One JSON file per state key in a local directory."""
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{name}.json"
+
+    def get(self, key: str) -> RunRecord | None:
+        path = self._path(key)
+        try:
+            return RunRecord.model_validate_json(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValidationError:
+            logger.warning(f"Ignoring corrupt run cache entry {path}")
+            return None
+
+    def put(self, key: str, record: RunRecord) -> None:
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with atomic_write(self._path(key)) as f:
+            f.write(record.model_dump_json())
+
+
+def run_key(ai_input: AppInterfaceInputInterface) -> str:
+    """The run cache key of an input, its Terraform state."""
+    state_key = StateKey.from_provision(ai_input.provision)
+    return f"{state_key.bucket}/{state_key.key}"
+
+
+def run_digest(
+    ai_input: AppInterfaceInputInterface,
+    *,
+    backend_tf_file: Path | str,
+    variables_tf_file: Path | str,
+    module_version: str,
+    action: str,
+) -> str:
+    """SHA-256 hex digest of everything which determines a terraform run."""
+    digest = hashlib.sha256()
+    for part in (
+        str(RUN_CACHE_VERSION).encode(),
+        action.encode(),
+        module_version.encode(),
+        canonical_tf_vars_json(ai_input.data),
+        canonical_tf_vars_json(ai_input.provision),
+        Path(backend_tf_file).read_bytes(),
+        Path(variables_tf_file).read_bytes(),
+    ):
+        # length prefixed, parts can't run into each other
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class RunCache:
+    def __init__(
+        self,
+        store: RunCacheStore,
+        *,
+        max_age: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.store = store
+        # seconds after which a run is repeated even if nothing changed
+        self.max_age = max_age
+        self.clock = clock
+
+    def is_fresh(self, key: str, digest: str) -> bool:
+        """Whether the last recorded apply of key had the same digest."""
+        record = self.store.get(key)
+        if record is None or record.digest != digest:
+            return False
+        return self.max_age is None or self.clock() - record.finished_at < self.max_age
+
+    def record(self, key: str, digest: str) -> None:
+        self.store.put(key, RunRecord(digest=digest, finished_at=self.clock()))
+
+
+def _command(args: Sequence[str]) -> str | None:
+    # the first argument after global options like -chdir=DIR
+    return next((arg for arg in args if not arg.startswith("-")), None)
+
+
+def _default_cache(config: Config) -> RunCache | None:
+    if not config.run_cache_dir:
+        return None
+    return RunCache(
+        LocalRunCacheStore(config.run_cache_dir), max_age=config.run_cache_max_age
+    )
+
+
+def cached_terraform_run(
+    ai_input: AppInterfaceInputInterface,
+    args: Sequence[str],
+    *,
+    cache: RunCache | None = None,
+    module_version: str | None = None,
+    backend_tf_file: Path | str | None = None,
+    variables_tf_file: Path | str | None = None,
+    dry_run: bool | None = None,
+) -> int:
+    """Run terraform unless nothing changed since the last successful apply.
+
+    Returns EXIT_SKIP if the run was skipped and EXIT_OK after a successful
+    run. Only apply and destroy runs are recorded, and only if they aren't
+    dry-runs. Failed runs raise like `terraform_run` and are not recorded.
+    The cache defaults to Config.run_cache_dir; without it, terraform always
+    runs.
+    """
+    config = Config()
+    cache = cache or _default_cache(config)
+    if cache is None:
+        terraform_run(args, dry_run=dry_run)
+        return EXIT_OK
+    dry_run = dry_run if dry_run is not None else config.dry_run
+    key = run_key(ai_input)
+    digest = run_digest(
+        ai_input,
+        backend_tf_file=backend_tf_file or config.backend_tf_file,
+        variables_tf_file=variables_tf_file or config.variables_tf_file,
+        module_version=module_version
+        if module_version is not None
+        else config.module_version,
+        action=config.action,
+    )
+    if cache.is_fresh(key, digest):
+        logger.info(f"Nothing changed since the last apply of {key}, skipping")
+        return EXIT_SKIP
+    terraform_run(args, dry_run=dry_run)
+    if not dry_run and _command(args) in RECORDED_COMMANDS:
+        cache.record(key, digest)
+    return EXIT_OK
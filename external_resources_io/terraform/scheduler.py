@@ -0,0 +1,149 @@
+"""Schedules Terraform runs per remote state.
+
+The S3 backend locks the state with a lockfile, so concurrent runs on the same
+state key fail or wait blindly for the remote lock. `StateKeyScheduler` queues
+runs per (bucket, key) instead: runs on different state keys run in parallel,
+runs on the same state key run one after the other.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import TYPE_CHECKING, NamedTuple, Self
+
+from external_resources_io.terraform.run import terraform_run
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from types import TracebackType
+
+    from external_resources_io.input import AppInterfaceProvision
+
+logger = logging.getLogger(__name__)
+
+
+class StateKey(NamedTuple):
+    bucket: str
+    key: str
+
+    @classmethod
+    def from_provision(cls, provision: AppInterfaceProvision) -> StateKey:
+        options = provision.module_provision_data
+        return cls(options.tf_state_bucket, options.tf_state_key)
+
+
+@dataclass
+class WaitMetrics:
+    """Time runs spent queued before they started."""
+
+    runs: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.runs if self.runs else 0.0
+
+
+class _Task[T](NamedTuple):
+    future: Future[T]
+    fn: Callable[[], T]
+    submitted: float
+
+
+class StateKeyScheduler:
+    """Runs callables concurrently, but serialized per Terraform state key."""
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="state-key-scheduler"
+        )
+        self._lock = threading.Lock()
+        # pending tasks of the state keys which have a running task
+        self._queues: dict[StateKey, deque[_Task]] = {}
+        self._metrics: dict[StateKey, WaitMetrics] = {}
+
+    def submit[T, **P](
+        self,
+        provision: AppInterfaceProvision,
+        fn: Callable[P, T],
+        /,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> Future[T]:
+        """Schedule fn(*args, **kwargs) for the state key of the provision."""
+        state_key = StateKey.from_provision(provision)
+        task = _Task(Future[T](), partial(fn, *args, **kwargs), time.monotonic())
+        with self._lock:
+            if (queue := self._queues.get(state_key)) is not None:
+                queue.append(task)
+                return task.future
+            self._queues[state_key] = deque()
+        try:
+            self._executor.submit(self._run, state_key, task)
+        except RuntimeError:
+            # the scheduler has been shut down
+            with self._lock:
+                del self._queues[state_key]
+            raise
+        return task.future
+
+    def submit_terraform_run(
+        self,
+        provision: AppInterfaceProvision,
+        args: Sequence[str],
+        *,
+        dry_run: bool | None = None,
+    ) -> Future[str]:
+        """Schedule a terraform_run for the state key of the provision."""
+        return self.submit(provision, terraform_run, args, dry_run=dry_run)
+
+    def _run(self, state_key: StateKey, task: _Task | None) -> None:
+        # a worker drains the queue of its state key
+        while task is not None:
+            self._record_wait(state_key, time.monotonic() - task.submitted)
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    result = task.fn()
+                except BaseException as e:  # ruff: ignore[blind-except]
+                    task.future.set_exception(e)
+                else:
+                    task.future.set_result(result)
+            with self._lock:
+                queue = self._queues[state_key]
+                if queue:
+                    task = queue.popleft()
+                else:
+                    del self._queues[state_key]
+                    task = None
+
+    def _record_wait(self, state_key: StateKey, wait: float) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(state_key, WaitMetrics())
+            metrics.runs += 1
+            metrics.total_wait += wait
+            metrics.max_wait = max(metrics.max_wait, wait)
+        logger.debug(f"Waited {wait:.3f}s for state {state_key.bucket}/{state_key.key}")
+
+    def wait_metrics(self) -> dict[StateKey, WaitMetrics]:
+        """Wait time metrics per state key."""
+        with self._lock:
+            return {k: replace(v) for k, v in self._metrics.items()}
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.shutdown()
@@ -0,0 +1,201 @@
+# ruff: file-ignore[any-type]
+"""Compiles pydantic core schemas into Terraform type constraints.
+
+A model's core schema is walked once and turned into a tree of Terraform
+types. Rendering the tree into HCL type constraints is a single linear pass.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, TypeAdapter
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+
+@dataclass(frozen=True)
+class TerraformType(ABC):
+    @abstractmethod
+    def render(self) -> str:
+        """The HCL type constraint, e.g. list(string)."""
+
+
+@dataclass(frozen=True)
+class Primitive(TerraformType):
+    name: str
+
+    def render(self) -> str:
+        return self.name
+
+
+@dataclass(frozen=True)
+class Collection(TerraformType):
+    # list, set or map
+    kind: str
+    element: TerraformType
+
+    def render(self) -> str:
+        return f"{self.kind}({self.element.render()})"
+
+
+@dataclass(frozen=True)
+class Tuple(TerraformType):
+    elements: tuple[TerraformType, ...]
+
+    def render(self) -> str:
+        return f"tuple([{', '.join(e.render() for e in self.elements)}])"
+
+
+@dataclass(frozen=True)
+class Object(TerraformType):
+    attributes: tuple[tuple[str, TerraformType], ...]
+
+    def render(self) -> str:
+        attributes = ",".join(f"{k} = {v.render()}" for k, v in self.attributes)
+        return f"object({{{attributes}}})"
+
+
+STRING = Primitive("string")
+NUMBER = Primitive("number")
+BOOL = Primitive("bool")
+ANY = Primitive("any")
+
+_STRING_SCHEMAS = {
+    "str",
+    "date",
+    "time",
+    "datetime",
+    "timedelta",
+    "url",
+    "multi-host-url",
+    "uuid",
+    "complex",
+}
+_NUMBER_SCHEMAS = {"int", "float", "decimal"}
+# schemas which only wrap another schema in "schema"
+_WRAPPER_SCHEMAS = {
+    "default",
+    "nullable",
+    "function-after",
+    "function-before",
+    "function-wrap",
+    "model",
+    "dataclass",
+}
+
+
+def _literal_type(values: Sequence[Any]) -> TerraformType:
+    if values and all(isinstance(v, bool) for v in values):
+        return BOOL
+    if values and all(isinstance(v, int | float) for v in values):
+        return NUMBER
+    return STRING
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self._definitions: dict[str, Mapping[str, Any]] = {}
+        self._compiled: dict[str, TerraformType] = {}
+        self._compiling: set[str] = set()
+
+    def _ref(self, ref: str) -> TerraformType:
+        if ref in self._compiled:
+            return self._compiled[ref]
+        if ref in self._compiling:
+            # recursive models can't be expressed as Terraform type
+            return ANY
+        self._compiling.add(ref)
+        compiled = self.compile(self._definitions[ref])
+        self._compiling.discard(ref)
+        self._compiled[ref] = compiled
+        return compiled
+
+    def _fields(self, fields: Mapping[str, Mapping[str, Any]]) -> Object:
+        return Object(
+            tuple(
+                (name, self.compile(field["schema"])) for name, field in fields.items()
+            )
+        )
+
+    def _union(self, choices: Sequence[Any]) -> TerraformType:
+        # choices may be (schema, label) tuples
+        types = {self.compile(c[0] if isinstance(c, tuple) else c) for c in choices}
+        return types.pop() if len(types) == 1 else ANY
+
+    def _tuple(self, schema: Mapping[str, Any]) -> TerraformType:
+        items = schema.get("items_schema", [])
+        if "variadic_item_index" in schema:
+            return Collection(
+                "list", self.compile(items[0]) if len(items) == 1 else ANY
+            )
+        return Tuple(tuple(self.compile(item) for item in items))
+
+    def compile(self, schema: Mapping[str, Any]) -> TerraformType:  # ruff: ignore[complex-structure, too-many-branches, too-many-return-statements]
+        """Compile a core schema into a Terraform type."""
+        match schema["type"]:
+            case "definitions":
+                for definition in schema["definitions"]:
+                    self._definitions[definition["ref"]] = definition
+                return self.compile(schema["schema"])
+            case "definition-ref":
+                return self._ref(schema["schema_ref"])
+            case _ if "ref" in schema and schema["ref"] not in self._compiling:
+                # inline definition which may be referenced further down
+                self._definitions[schema["ref"]] = schema
+                return self._ref(schema["ref"])
+            case t if t in _STRING_SCHEMAS:
+                return STRING
+            case t if t in _NUMBER_SCHEMAS:
+                return NUMBER
+            case "bool":
+                return BOOL
+            case "literal":
+                return _literal_type(schema["expected"])
+            case "enum":
+                return _literal_type([m.value for m in schema["members"]])
+            case "list" | "set" | "frozenset" as t:
+                kind = "list" if t == "list" else "set"
+                items = schema.get("items_schema")
+                return Collection(kind, self.compile(items) if items else ANY)
+            case "dict":
+                values = schema.get("values_schema")
+                return Collection("map", self.compile(values) if values else ANY)
+            case "tuple":
+                return self._tuple(schema)
+            case "model-fields" | "typed-dict":
+                return self._fields(schema["fields"])
+            case "dataclass-args":
+                return self._fields({f["name"]: f for f in schema["fields"]})
+            case "union":
+                return self._union(schema["choices"])
+            case "tagged-union":
+                return self._union(list(schema["choices"].values()))
+            case "json-or-python":
+                return self.compile(schema["json_schema"])
+            case "lax-or-strict":
+                return self.compile(schema["lax_schema"])
+            case "chain":
+                return self.compile(schema["steps"][-1])
+            case t if t in _WRAPPER_SCHEMAS:
+                return self.compile(schema["schema"])
+            case _:
+                return ANY
+
+
+@cache
+def model_terraform_types(model: type[BaseModel]) -> dict[str, TerraformType]:
+    """Terraform types of all fields of a model, compiled from its core schema."""
+    compiled = _Compiler().compile(model.__pydantic_core_schema__)
+    if not isinstance(compiled, Object):
+        return {}
+    return dict(compiled.attributes)
+
+
+def terraform_type(python_type: Any) -> TerraformType:
+    """Terraform type of an arbitrary Python type annotation."""
+    if isinstance(python_type, type) and issubclass(python_type, BaseModel):
+        return Object(tuple(model_terraform_types(python_type).items()))
+    return _Compiler().compile(TypeAdapter(python_type).core_schema)
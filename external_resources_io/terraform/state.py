@@ -0,0 +1,112 @@
+"""Typed, indexed views of the state trees of a plan.
+
+`Plan.planned_values` and `Plan.prior_state` are trees of nested modules.
+A `StateView` walks such a tree iteratively, without building a flattened
+copy of it, and builds an index from resource address to resource on the
+first lookup. Resources are validated only when they are returned.
+"""
+
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# Ref: https://github.com/hashicorp/terraform-json/blob/main/state.go
+
+
+class StateResource(BaseModel):
+    # The absolute resource address.
+    address: str
+    # The resource mode.
+    mode: str = "managed"
+    # The resource type, example: "aws_instance" for aws_instance.foo.
+    type: str = ""
+    # The resource name, example: "foo" for aws_instance.foo.
+    name: str = ""
+    # The instance key for any resources that have been created using
+    # "count" or "for_each". If neither of these apply the key will be
+    # empty.
+    index: str | int | None = None
+    # The name of the provider this resource belongs to.
+    provider_name: str | None = None
+    # The version of the resource type schema the values map conforms to.
+    schema_version: int = 0
+    # The JSON representation of the attribute values of the resource,
+    # whose structure depends on the resource type schema. Unknown values
+    # are omitted in planned values.
+    values: dict[str, Any] = {}
+    # A deep object of booleans that denotes sensitive values.
+    sensitive_values: dict[str, Any] = {}
+    # The addresses of the resources this resource depends on.
+    depends_on: list[str] = []
+    # Whether the resource is marked as tainted.
+    tainted: bool = False
+    # The deposed key, set if the resource has been deposed.
+    deposed_key: str | None = None
+    # The address of the module containing this resource, None for the
+    # root module. Not part of the JSON representation.
+    module_address: str | None = None
+
+
+class StateView:
+    """Resources of a state values tree ({"root_module": ..., "outputs": ...})."""
+
+    def __init__(self, values: dict[str, Any]) -> None:
+        self.values = values
+
+    @property
+    def outputs(self) -> dict[str, Any]:
+        return self.values.get("outputs") or {}
+
+    def _walk(self) -> Iterator[tuple[str | None, dict[str, Any]]]:
+        # iterative, deep module nesting can't hit the recursion limit
+        stack = [self.values.get("root_module") or {}]
+        while stack:
+            module = stack.pop()
+            module_address = module.get("address")
+            for resource in module.get("resources") or []:
+                yield module_address, resource
+            stack.extend(reversed(module.get("child_modules") or []))
+
+    @staticmethod
+    def _resource(module_address: str | None, raw: dict[str, Any]) -> StateResource:
+        return StateResource.model_validate({**raw, "module_address": module_address})
+
+    @cached_property
+    def _index(self) -> dict[str, tuple[str | None, dict[str, Any]]]:
+        return {raw["address"]: (module, raw) for module, raw in self._walk()}
+
+    def __iter__(self) -> Iterator[StateResource]:
+        """Stream all resources, module by module, depth first."""
+        for module_address, raw in self._walk():
+            yield self._resource(module_address, raw)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, address: object) -> bool:
+        return address in self._index
+
+    def get(self, address: str) -> StateResource | None:
+        """The resource with the given absolute address."""
+        if (entry := self._index.get(address)) is None:
+            return None
+        return self._resource(*entry)
+
+    def attributes(self, address: str) -> dict[str, Any] | None:
+        """The attribute values of a resource, without validating it."""
+        if (entry := self._index.get(address)) is None:
+            return None
+        return entry[1].get("values") or {}
+
+    def addresses(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def of_type(self, resource_type: str) -> Iterator[StateResource]:
+        """Stream the resources of the given type."""
+        for module_address, raw in self._walk():
+            if raw.get("type") == resource_type:
+                yield self._resource(module_address, raw)
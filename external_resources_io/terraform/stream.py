@@ -0,0 +1,406 @@
+# ruff: file-ignore[any-type]
+"""Streaming access to Terraform JSON plan files.
+
+Plans of big workspaces are hundreds of megabytes. The functions in this
+module read a plan file in chunks and decode only the values they need, one
+at a time, so memory usage stays constant regardless of the plan size.
+Values they don't need, e.g. planned_values, are skipped without decoding
+them.
+"""
+
+import csv
+import json
+import mmap
+import re
+from enum import StrEnum
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from external_resources_io.terraform.plan import Action, ResourceChange
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRUCTURE = re.compile(r'[{}\[\]"]')
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+class _Reader:
+    """Incremental reader of a single JSON document.
+
+    Only the unconsumed part of the file is buffered: a chunk plus the value
+    currently being decoded.
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = CHUNK_SIZE) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # grow geometrically, values bigger than a chunk are decoded again
+        # after every read
+        size = max(self._chunk_size, len(self._buffer) - self._pos)
+        if not (chunk := self._fp.read(size)):
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self) -> str:
+        """The next non-whitespace character."""
+        while True:
+            match = _WHITESPACE.match(self._buffer, self._pos)
+            self._pos = match.end() if match else self._pos
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise self._error("Unexpected end of JSON document")
+
+    def _expect(self, chars: str) -> str:
+        if (char := self.peek()) not in chars:
+            raise self._error(f"Expecting one of {chars!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number may continue in the next chunk, also after a prefix
+            # which is a number on its own, e.g. "1." + "5" or "1e" + "-7"
+            if (
+                end == len(self._buffer)
+                or (
+                    isinstance(value, int | float)
+                    and _NUMBER_TAIL.fullmatch(self._buffer, end)
+                )
+            ) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip(self) -> None:
+        """Skip the next value without decoding it."""
+        if self.peek() not in '{["':
+            self.value()
+            return
+        depth = 0
+        while True:
+            if (match := _STRUCTURE.search(self._buffer, self._pos)) is None:
+                self._pos = len(self._buffer)
+                if not self._fill():
+                    raise self._error("Unexpected end of JSON document")
+                continue
+            if match.group() == '"':
+                if (string := _STRING.match(self._buffer, match.start())) is None:
+                    # the string continues in the next chunk
+                    self._pos = match.start()
+                    if not self._fill():
+                        raise self._error("Unterminated string")
+                    continue
+                self._pos = string.end()
+            else:
+                self._pos = match.end()
+                depth += 1 if match.group() in "{[" else -1
+            if depth == 0:
+                return
+
+    def members(self) -> Iterator[str]:
+        """Iterate the member names of the next object.
+
+        Each value must be consumed with value() or skip() before the next
+        key is read.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def elements(self) -> Iterator[None]:
+        """Iterate the elements of the next array, see members()."""
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            if self._expect(",]") == "]":
+                return
+
+
+def iter_members(
+    fp: IO[str], *, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[str, Any]]:
+    """Stream the members of the JSON object in fp, one decoded value at a time."""
+    reader = _Reader(fp, chunk_size)
+    for key in reader.members():
+        yield key, reader.value()
+
+
+def iter_raw_resource_changes(
+    plan_path: Path | str, *, chunk_size: int = CHUNK_SIZE
+) -> Iterator[dict[str, Any]]:
+    """Stream the resource changes of a plan file as plain dicts."""
+    with Path(plan_path).open(encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        for key in reader.members():
+            if key != "resource_changes":
+                reader.skip()
+                continue
+            for _ in reader.elements():
+                yield reader.value()
+            return
+
+
+def iter_resource_changes(plan_path: Path | str) -> Iterator[ResourceChange]:
+    """Stream the validated resource changes of a plan file."""
+    for rc in iter_raw_resource_changes(plan_path):
+        yield ResourceChange.model_validate(rc)
+
+
+_ACTIONS = re.compile(rb'"actions"\s*:\s*\[([^\]]*)\]')
+_NO_OP = re.compile(rb'\s*"no-op"\s*')
+
+
+def _only_no_op_actions(plan_path: Path | str) -> bool:
+    # An unescaped "actions" followed by a colon can only be an object key, so
+    # this sees the actions of every change. Actions keys of other objects,
+    # e.g. IAM policy statements in attribute values, can only make it return
+    # False wrongly, never True.
+    with (
+        Path(plan_path).open("rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        # a truncated plan must not pass as a plan without changes
+        if not data[-64:].rstrip().endswith(b"}"):
+            return False
+        return all(_NO_OP.fullmatch(m.group(1)) for m in _ACTIONS.finditer(data))
+
+
+def _is_change(change: Any) -> bool:
+    actions = change.get("actions") if isinstance(change, dict) else None
+    return bool(actions) and actions != [Action.ActionNoop.value]
+
+
+def _resource_changes_change(reader: _Reader) -> bool:
+    return any(_is_change(reader.value().get("change")) for _ in reader.elements())
+
+
+def _output_changes_change(reader: _Reader) -> bool:
+    return any(_is_change(reader.value()) for _ in reader.members())
+
+
+def plan_has_changes(plan_path: Path | str, *, chunk_size: int = CHUNK_SIZE) -> bool:
+    """Whether a plan file changes any resource or output.
+
+    Any action but no-op is a change. The plan isn't validated: a scan of
+    the file for actions keys decides for plans without changes. Otherwise
+    resource_changes and output_changes are streamed until the first change.
+    """
+    if Path(plan_path).stat().st_size and _only_no_op_actions(plan_path):
+        return False
+    probes = {
+        "resource_changes": _resource_changes_change,
+        "output_changes": _output_changes_change,
+    }
+    with Path(plan_path).open(encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        for key in reader.members():
+            if (probe := probes.pop(key, None)) is None:
+                reader.skip()
+                continue
+            if probe(reader):
+                return True
+            if not probes:
+                # the rest of the plan doesn't matter
+                return False
+    return False
+
+
+def changed_output_names(
+    plan_path: Path | str, *, chunk_size: int = CHUNK_SIZE
+) -> set[str]:
+    """Names of the outputs a plan file changes, without validating the plan.
+
+    Only output_changes is decoded, the rest of the plan is skipped.
+    """
+    with Path(plan_path).open(encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        for key in reader.members():
+            if key != "output_changes":
+                reader.skip()
+                continue
+            return {name for name in reader.members() if _is_change(reader.value())}
+    return set()
+
+
+_MISSING = object()
+
+
+def _changed_paths(before: Any, after: Any, path: str) -> Iterator[str]:
+    if before == after:
+        return
+    if isinstance(before, dict) and isinstance(after, dict):
+        for key in {**before, **after}:
+            yield from _changed_paths(
+                before.get(key, _MISSING),
+                after.get(key, _MISSING),
+                f"{path}.{key}" if path else key,
+            )
+    elif (
+        isinstance(before, list)
+        and isinstance(after, list)
+        and len(before) == len(after)
+    ):
+        for i, (b, a) in enumerate(zip(before, after, strict=True)):
+            yield from _changed_paths(b, a, f"{path}.{i}" if path else str(i))
+    else:
+        yield path
+
+
+def _unknown_paths(after_unknown: Any, path: str) -> Iterator[str]:
+    if after_unknown is True:
+        yield path
+    elif isinstance(after_unknown, dict):
+        for key, value in after_unknown.items():
+            yield from _unknown_paths(value, f"{path}.{key}" if path else key)
+    elif isinstance(after_unknown, list):
+        for i, value in enumerate(after_unknown):
+            yield from _unknown_paths(value, f"{path}.{i}" if path else str(i))
+
+
+def changed_attribute_paths(change: dict[str, Any]) -> list[str]:
+    """Dotted paths of the attributes a change modifies, e.g. "tags.Name".
+
+    Attributes only known after apply count as changed.
+    """
+    paths = dict.fromkeys(
+        _changed_paths(change.get("before") or {}, change.get("after") or {}, "")
+    )
+    paths.update(dict.fromkeys(_unknown_paths(change.get("after_unknown"), "")))
+    paths.pop("", None)
+    return list(paths)
+
+
+class ExportFormat(StrEnum):
+    JSONL = "jsonl"
+    CSV = "csv"
+
+
+EXPORT_FIELDS = (
+    "plan",
+    "address",
+    "type",
+    "name",
+    "module_address",
+    "provider_name",
+    "actions",
+)
+
+
+def _rows(
+    plan_path: Path | str, plan_id: str, *, changed_attributes: bool
+) -> Iterator[dict[str, Any]]:
+    for rc in iter_raw_resource_changes(plan_path):
+        change = rc.get("change") or {}
+        row = {
+            "plan": plan_id,
+            "address": rc.get("address"),
+            "type": rc.get("type"),
+            "name": rc.get("name"),
+            "module_address": rc.get("module_address"),
+            "provider_name": rc.get("provider_name"),
+            "actions": change.get("actions", []),
+        }
+        if changed_attributes:
+            row["changed_attributes"] = changed_attribute_paths(change)
+        yield row
+
+
+def _write_jsonl(f: IO[str], rows: Iterator[dict[str, Any]]) -> int:
+    count = 0
+    for row in rows:
+        f.write(json.dumps(row) + "\n")
+        count += 1
+    return count
+
+
+def _write_csv(
+    f: IO[str],
+    rows: Iterator[dict[str, Any]],
+    *,
+    changed_attributes: bool,
+    header: bool,
+) -> int:
+    fields = (
+        [*EXPORT_FIELDS, "changed_attributes"] if changed_attributes else EXPORT_FIELDS
+    )
+    writer = csv.DictWriter(f, fieldnames=fields)
+    if header:
+        writer.writeheader()
+    count = 0
+    for row in rows:
+        row["actions"] = ";".join(row["actions"])
+        if changed_attributes:
+            row["changed_attributes"] = ";".join(row["changed_attributes"])
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def export_resource_changes(
+    plan_path: Path | str,
+    output: Path | str,
+    *,
+    export_format: ExportFormat = ExportFormat.JSONL,
+    changed_attributes: bool = False,
+    append: bool = False,
+    plan_id: str | None = None,
+) -> int:
+    """Export the resource changes of a plan file, one row per change.
+
+    Rows are streamed from the plan file to the output, so exporting doesn't
+    depend on the plan size memory-wise. With append, rows are added to an
+    existing output, e.g. to collect the changes of many plans in one file.
+    Each row identifies its plan by plan_id, the plan path by default.
+    Lists (actions, changed_attributes) are joined with ";" in CSV files.
+    Returns the number of exported rows.
+    """
+    output = Path(output)
+    rows = _rows(
+        plan_path, plan_id or str(plan_path), changed_attributes=changed_attributes
+    )
+    # appended CSV rows reuse the header of the existing file
+    header = not (append and output.exists() and output.stat().st_size)
+    with output.open("a" if append else "w", encoding="utf-8", newline="") as f:
+        if export_format == ExportFormat.CSV:
+            return _write_csv(
+                f, rows, changed_attributes=changed_attributes, header=header
+            )
+        return _write_jsonl(f, rows)
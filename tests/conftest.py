@@ -1,9 +1,15 @@
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import pytest
 from pydantic import BaseModel
 
+from external_resources_io.config import EnvVar
 from external_resources_io.input import AppInterfaceProvision, parse_model
+from external_resources_io.profiling import profile_dir
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
 
 
 class Data(BaseModel):
@@ -53,3 +59,12 @@ def provision_data(ai_data: dict[str, Any]) -> AppInterfaceProvision:
 @pytest.fixture
 def data(ai_data: dict[str, Any]) -> Data:
     return parse_model(Data, ai_data["data"])
+
+
+@pytest.fixture
+def profiles(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Enable profiling to a temporary directory."""
+    monkeypatch.setenv(EnvVar.PROFILE_DIR, str(tmp_path / "profiles"))
+    profile_dir.cache_clear()
+    yield tmp_path / "profiles"
+    profile_dir.cache_clear()
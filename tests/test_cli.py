@@ -12,6 +12,7 @@ from external_resources_io.cli import (
     _get_app_interface_data_class,
     tf_app,
 )
+from external_resources_io.exit_status import EXIT_ERROR, EXIT_SKIP
 from external_resources_io.input import AppInterfaceProvision
 
 if TYPE_CHECKING:
@@ -142,3 +143,80 @@ def test_generate_tf_vars_json(
         ],
     )
     assert output_file.exists()
+
+
+def test_generate_all(
+    cli_runner: CliRunner,
+    app_interface_input_class: str,
+    input_file: Path,
+    tmp_path: Path,
+) -> None:
+    result = cli_runner.invoke(
+        tf_app,
+        [
+            "generate-all",
+            app_interface_input_class,
+            str(input_file),
+            "--backend-tf",
+            str(tmp_path / "backend.tf"),
+            "--tf-vars-json",
+            str(tmp_path / "terraform.tfvars.json"),
+            "--variables-tf",
+            str(tmp_path / "variables.tf"),
+        ],
+    )
+    assert result.exit_code == 0
+    assert (tmp_path / "backend.tf").exists()
+    assert (tmp_path / "terraform.tfvars.json").exists()
+    assert (tmp_path / "variables.tf").exists()
+
+
+def test_generate_variables_tf_check(
+    cli_runner: CliRunner, app_interface_input_class: str, output_file: Path
+) -> None:
+    args = [
+        "generate-variables-tf",
+        app_interface_input_class,
+        "--output",
+        str(output_file),
+    ]
+    assert cli_runner.invoke(tf_app, [*args, "--check"]).exit_code == EXIT_ERROR
+    assert not output_file.exists()
+    assert cli_runner.invoke(tf_app, args).exit_code == 0
+    assert cli_runner.invoke(tf_app, [*args, "--check"]).exit_code == 0
+
+
+def test_profile_dir(
+    cli_runner: CliRunner,
+    app_interface_input_class: str,
+    output_file: Path,
+    profiles: Path,
+) -> None:
+    result = cli_runner.invoke(
+        tf_app,
+        [
+            "generate-variables-tf",
+            app_interface_input_class,
+            "--output",
+            str(output_file),
+        ],
+    )
+    assert result.exit_code == 0
+    assert [p.stem.split("-")[0] for p in profiles.glob("*.json")] == [
+        "external_resources_io.cli.generate_variables_tf"
+    ]
+
+
+@pytest.mark.parametrize(
+    ("actions", "exit_code"), [(["no-op"], EXIT_SKIP), (["update"], 0)]
+)
+def test_has_changes(
+    cli_runner: CliRunner, tmp_path: Path, actions: list[str], exit_code: int
+) -> None:
+    plan = tmp_path / "plan.json"
+    plan.write_text(
+        json.dumps({"output_changes": {"arn": {"actions": actions}}}),
+        encoding="utf-8",
+    )
+    result = cli_runner.invoke(tf_app, ["has-changes", "--plan", str(plan)])
+    assert result.exit_code == exit_code
@@ -0,0 +1,31 @@
+import threading
+from typing import TYPE_CHECKING
+
+from external_resources_io import concurrency
+from external_resources_io.concurrency import thread_map
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def _thread_name(_: int) -> str:
+    return threading.current_thread().name
+
+
+def test_thread_map_order() -> None:
+    assert thread_map(str, range(100), max_workers=8) == [str(i) for i in range(100)]
+
+
+def test_thread_map_gil(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(concurrency, "gil_enabled", lambda: True)
+    main = threading.current_thread().name
+    assert set(thread_map(_thread_name, range(4))) == {main}
+    assert main not in thread_map(_thread_name, range(4), max_workers=2)
+
+
+def test_thread_map_free_threaded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(concurrency, "gil_enabled", lambda: False)
+    assert threading.current_thread().name not in thread_map(_thread_name, range(4))
+    assert set(thread_map(_thread_name, range(4), max_workers=1)) == {
+        threading.current_thread().name
+    }
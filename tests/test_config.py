@@ -29,3 +29,9 @@ def test_config_bad_action(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setenv("ACTION", "fake")
     with pytest.raises(ValidationError):
         Config()
+
+
+def test_config_mutable() -> None:
+    config = Config()
+    config.dry_run = False
+    assert not config.dry_run
@@ -0,0 +1,90 @@
+import json
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from external_resources_io.config import EnvVar
+from external_resources_io.terraform.fake import (
+    FAKE_VERSION,
+    RESPONSES_ENV_VAR,
+    FakeResponses,
+)
+from external_resources_io.terraform.run import (
+    terraform_available,
+    terraform_fmt,
+    terraform_run,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def responses(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "responses.json"
+    path.write_text("{}", encoding="utf-8")
+    monkeypatch.setenv(
+        EnvVar.TERRAFORM_CMD,
+        f"{sys.executable} -m external_resources_io.terraform.fake",
+    )
+    monkeypatch.setenv(RESPONSES_ENV_VAR, str(path))
+    return path
+
+
+def _record(path: Path, responses: dict) -> None:
+    path.write_text(json.dumps(responses), encoding="utf-8")
+
+
+def test_lookup_longest_match() -> None:
+    responses = FakeResponses.model_validate({
+        "show": {"stdout": "show"},
+        "show -json": {"stdout": "show -json"},
+    })
+    assert (response := responses.lookup(["show", "-json", "plan.out"]))
+    assert response.stdout == "show -json"
+    assert (response := responses.lookup(["show"]))
+    assert response.stdout == "show"
+    assert responses.lookup(["plan"]) is None
+
+
+@pytest.mark.usefixtures("responses")
+def test_fake_defaults() -> None:
+    assert terraform_available()
+    assert terraform_fmt('variable "a" {}\n') == 'variable "a" {}\n'
+    assert json.loads(terraform_run(["version", "-json"], dry_run=False)) == {
+        "terraform_version": FAKE_VERSION,
+        "platform": "fake",
+        "provider_selections": {},
+    }
+    with pytest.raises(subprocess.CalledProcessError):
+        terraform_run(["apply"], dry_run=False)
+
+
+def test_fake_responses(responses: Path, tmp_path: Path) -> None:
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text('{"format_version": "1.2"}', encoding="utf-8")
+    _record(
+        responses,
+        {
+            "show -json": {"stdout_file": str(plan_file)},
+            "output": {"stdout": "x", "repeat": 1000},
+            "plan": {"stdout": "No changes.", "latency": 0.2},
+        },
+    )
+    assert terraform_run(
+        ["-chdir=module", "show", "-json", "plan.out"], dry_run=False
+    ) == ('{"format_version": "1.2"}')
+    assert terraform_run(["output", "-json"], dry_run=False) == "x" * 1000
+    start = time.monotonic()
+    assert terraform_run(["plan"], dry_run=False) == "No changes."
+    assert time.monotonic() - start >= 0.2  # ruff: ignore[magic-value-comparison]
+
+
+def test_fake_error(responses: Path) -> None:
+    _record(responses, {"apply": {"stderr": "Error: lock", "returncode": 1}})
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        terraform_run(["apply"], dry_run=False)
+    assert e.value.stderr == "Error: lock"
@@ -0,0 +1,67 @@
+# ruff: file-ignore[import-private-name]
+from typing import TYPE_CHECKING
+
+import pytest
+
+from external_resources_io._fs import atomic_directory, atomic_write
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_atomic_write(tmp_path: Path) -> None:
+    path = tmp_path / "file"
+    path.write_text("old")
+    with atomic_write(path) as f:
+        f.write("new")
+        assert path.read_text() == "old"
+    assert path.read_text() == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["file"]
+
+
+def test_atomic_write_binary(tmp_path: Path) -> None:
+    path = tmp_path / "file"
+    with atomic_write(path, binary=True) as f:
+        f.write(b"\x00")
+    assert path.read_bytes() == b"\x00"
+
+
+def _write_and_fail(path: Path) -> None:
+    with atomic_write(path) as f:
+        f.write("new")
+        raise RuntimeError
+
+
+def test_atomic_write_error(tmp_path: Path) -> None:
+    path = tmp_path / "file"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        _write_and_fail(path)
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["file"]
+
+
+def test_atomic_directory(tmp_path: Path) -> None:
+    path = tmp_path / "dir"
+    with atomic_directory(path) as tmp:
+        (tmp / "file").write_text("new")
+        assert not path.exists()
+    assert (path / "file").read_text() == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["dir"]
+
+
+def test_atomic_directory_exists(tmp_path: Path) -> None:
+    path = tmp_path / "dir"
+    with atomic_directory(path) as tmp:
+        (tmp / "file").write_text("new")
+        path.mkdir()
+        (path / "file").write_text("other")
+    assert (path / "file").read_text() == "other"
+    assert [p.name for p in tmp_path.iterdir()] == ["dir"]
+
+
+def test_atomic_directory_error(tmp_path: Path) -> None:
+    path = tmp_path / "dir"
+    with pytest.raises(RuntimeError), atomic_directory(path):
+        raise RuntimeError
+    assert list(tmp_path.iterdir()) == []
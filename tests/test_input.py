@@ -1,17 +1,22 @@
+import base64
 import json
 from typing import TYPE_CHECKING, Any
 
+import pytest
+
 from external_resources_io.input import (
     AppInterfaceProvision,
     TerraformProvisionOptions,
+    parse_models,
+    read_input_from_env_var,
     read_input_from_file,
+    resolve_app_interface_class,
+    resolve_app_interface_data_class,
 )
 
 if TYPE_CHECKING:
     from pathlib import Path
 
-    import pytest
-
 
 def test_parse_provision(provision_data: AppInterfaceProvision) -> None:
     assert isinstance(provision_data, AppInterfaceProvision)
@@ -19,6 +24,18 @@ def test_parse_provision(provision_data: AppInterfaceProvision) -> None:
     assert provision_data.module_provision_data.tf_state_region == "us-east-1"
 
 
+def test_parse_models(ai_data: dict[str, Any]) -> None:
+    items = [{**ai_data["provision"], "identifier": f"id-{i}"} for i in range(20)]
+    provisions = parse_models(AppInterfaceProvision, items, max_workers=4)
+    assert [p.identifier for p in provisions] == [f"id-{i}" for i in range(20)]
+
+
+def test_parse_models_invalid(ai_data: dict[str, Any]) -> None:
+    items = [ai_data["provision"], {}]
+    with pytest.raises(ValueError, match="validation error"):
+        parse_models(AppInterfaceProvision, items)
+
+
 def test_read_input_from_file_env_var(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path, ai_data: dict[str, Any]
 ) -> None:
@@ -36,3 +53,48 @@ def test_read_input_from_file(tmp_path: Path, ai_data: dict[str, Any]) -> None:
 
     input_data = read_input_from_file(file_path=str(input_json.absolute()))
     assert input_data == ai_data
+
+
+def test_resolve_app_interface_class() -> None:
+    resolve_app_interface_class.cache_clear()
+    ai_class = resolve_app_interface_class("tests.test_cli.AppInterfaceInput")
+    assert ai_class.__name__ == "AppInterfaceInput"
+    assert resolve_app_interface_class("tests.test_cli.AppInterfaceInput") is ai_class
+    assert resolve_app_interface_class.cache_info().hits == 1
+
+
+def test_resolve_app_interface_class_no_model() -> None:
+    with pytest.raises(TypeError):
+        resolve_app_interface_class("tests.test_input.read_input_from_file")
+
+
+def test_resolve_app_interface_data_class() -> None:
+    data_class = resolve_app_interface_data_class("tests.test_cli.AppInterfaceInput")
+    assert data_class.__name__ == "Data"
+    assert (
+        resolve_app_interface_data_class("tests.test_cli.AppInterfaceInput")
+        is data_class
+    )
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_read_input_from_file_compressed(
+    tmp_path: Path, ai_data: dict[str, Any], compression: str
+) -> None:
+    module = pytest.importorskip(f"compression.{compression}")
+    input_json = tmp_path / "input.json"
+    input_json.write_bytes(module.compress(json.dumps(ai_data).encode()))
+
+    assert read_input_from_file(file_path=input_json) == ai_data
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_read_input_from_env_var(
+    monkeypatch: pytest.MonkeyPatch, ai_data: dict[str, Any], compression: str | None
+) -> None:
+    payload = json.dumps(ai_data).encode()
+    if compression:
+        payload = pytest.importorskip(f"compression.{compression}").compress(payload)
+    monkeypatch.setenv("INPUT", base64.b64encode(payload).decode())
+
+    assert read_input_from_env_var() == ai_data
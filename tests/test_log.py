@@ -0,0 +1,169 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import pytest
+
+from external_resources_io.config import Action, EnvVar
+from external_resources_io.log import (
+    BatchQueueListener,
+    BatchStreamHandler,
+    ContextFilter,
+    DryRunFilter,
+    JsonFormatter,
+    log_context,
+    provision_log_context,
+    setup_logging,
+)
+
+if TYPE_CHECKING:
+    from external_resources_io.input import AppInterfaceProvision
+
+
+@pytest.fixture
+def record() -> logging.LogRecord:
+    return logging.LogRecord(
+        name="test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=1,
+        msg="hello %s",
+        args=("world",),
+        exc_info=None,
+    )
+
+
+def test_dry_run_filter(record: logging.LogRecord) -> None:
+    assert DryRunFilter(dry_run=True).filter(record)
+    assert record.__dict__["prefix"] == "DRY_RUN - "
+    DryRunFilter(dry_run=False).filter(record)
+    assert not record.__dict__["prefix"]
+
+
+def test_json_formatter(record: logging.LogRecord) -> None:
+    DryRunFilter(dry_run=True).filter(record)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "test"
+    assert entry["message"] == "DRY_RUN - hello world"
+
+
+def test_batch_stream_handler(record: logging.LogRecord) -> None:
+    handler = BatchStreamHandler(capacity=3)
+    written: list[str] = []
+    handler.stream.write = written.append
+    handler.handle(record)
+    handler.handle(record)
+    assert not written
+    handler.handle(record)
+    assert written == ["hello world\n" * 3]
+    handler.handle(record)
+    handler.flush()
+    assert written[-1] == "hello world\n"
+
+
+def test_setup_logging_queue(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setenv(EnvVar.LOG_QUEUE, "1")
+    monkeypatch.setenv(EnvVar.LOG_FORMAT, "json")
+    monkeypatch.setenv(EnvVar.DRY_RUN, "1")
+    setup_logging()
+    logger = logging.getLogger("test")
+    with log_context(identifier="id-01"):
+        for i in range(10):
+            logger.info("message %d", i)
+    # stops the listener and flushes all pending records
+    monkeypatch.setenv(EnvVar.LOG_QUEUE, "0")
+    setup_logging()
+
+    entries = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [entry["message"] for entry in entries] == [
+        f"DRY_RUN - message {i}" for i in range(10)
+    ]
+    assert all(entry["identifier"] == "id-01" for entry in entries)
+
+
+def _log_exception(queue: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(EnvVar.LOG_QUEUE, queue)
+    setup_logging()
+    try:
+        _ = 1 / 0
+    except ZeroDivisionError:
+        logging.getLogger("test").exception("failed %d", 1)
+    monkeypatch.setenv(EnvVar.LOG_QUEUE, "0")
+    setup_logging()
+
+
+def test_setup_logging_queue_exception(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setenv(EnvVar.LOG_FORMAT, "json")
+    monkeypatch.setenv(EnvVar.DRY_RUN, "0")
+    entries = []
+    for queue in ("0", "1"):
+        _log_exception(queue, monkeypatch)
+        entry = json.loads(capsys.readouterr().err)
+        del entry["time"]
+        entries.append(entry)
+    # the traceback isn't merged into the message by the queue handler
+    assert entries[0] == entries[1]
+    assert entries[1]["message"] == "failed 1"
+    assert entries[1]["exception"].endswith("ZeroDivisionError: division by zero")
+
+
+def test_setup_logging_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(EnvVar.LOG_QUEUE, "1")
+    running = []
+    start, stop = BatchQueueListener.start, BatchQueueListener.stop
+
+    def start_listener(listener: BatchQueueListener) -> None:
+        running.append(listener)
+        start(listener)
+
+    def stop_listener(listener: BatchQueueListener) -> None:
+        running.remove(listener)
+        stop(listener)
+
+    monkeypatch.setattr(BatchQueueListener, "start", start_listener)
+    monkeypatch.setattr(BatchQueueListener, "stop", stop_listener)
+    with ThreadPoolExecutor(8) as executor:
+        for _ in range(32):
+            executor.submit(setup_logging)
+    # every listener but the last one has been stopped
+    assert len(running) == 1
+    monkeypatch.setenv(EnvVar.LOG_QUEUE, "0")
+    setup_logging()
+    assert running == []
+
+
+def test_log_context(record: logging.LogRecord) -> None:
+    context_filter = ContextFilter()
+    with log_context(identifier="id-01", provider="rds"):
+        with log_context(action="apply"):
+            context_filter.filter(record)
+            entry = json.loads(JsonFormatter().format(record))
+        assert entry["identifier"] == "id-01"
+        assert entry["provider"] == "rds"
+        assert entry["action"] == "apply"
+        context_filter.filter(record)
+        assert "action" not in record.__dict__["context"]
+    context_filter.filter(record)
+    assert not record.__dict__["context"]
+
+
+def test_provision_log_context(
+    provision_data: AppInterfaceProvision, record: logging.LogRecord
+) -> None:
+    with provision_log_context(provision_data, Action.DESTROY):
+        ContextFilter().filter(record)
+    assert record.__dict__["context"] == {
+        "provision_provider": "aws",
+        "provisioner": "ter-int-dev",
+        "provider": "aws-iam-role",
+        "identifier": "test-external-resources-iam-role",
+        "target_cluster": "app-sre-stage-01",
+        "target_namespace": "test-jpiriz",
+        "action": "destroy",
+    }
@@ -0,0 +1,169 @@
+import io
+import json
+import sys
+from contextlib import contextmanager
+from subprocess import CalledProcessError
+from typing import TYPE_CHECKING
+
+import pytest
+
+from external_resources_io.config import EnvVar
+from external_resources_io.redact import REDACTED
+from external_resources_io.terraform import outputs
+from external_resources_io.terraform.fake import RESPONSES_ENV_VAR
+from external_resources_io.terraform.outputs import (
+    SensitiveOutputs,
+    changed_outputs,
+    create_outputs_file,
+)
+from external_resources_io.terraform.plan import Plan
+from external_resources_io.terraform.plan_cache import PlanIndex
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
+
+TERRAFORM_OUTPUTS = {
+    "arn": {"sensitive": False, "type": "string", "value": "arn:aws:iam::1:role/r"},
+    "password": {"sensitive": True, "type": "string", "value": "hunter22"},
+}
+
+
+@pytest.fixture
+def terraform_calls(monkeypatch: pytest.MonkeyPatch) -> list[Sequence[str]]:
+    calls = []
+
+    @contextmanager
+    def terraform_stdout(args: Sequence[str]) -> Iterator[io.StringIO]:
+        calls.append(args)
+        yield io.StringIO(json.dumps(TERRAFORM_OUTPUTS))
+
+    monkeypatch.setattr(outputs, "terraform_stdout", terraform_stdout)
+    return calls
+
+
+def _plan(**actions: list[str]) -> Plan:
+    return Plan.model_validate({
+        "output_changes": {
+            name: {"actions": a, "after_unknown": False} for name, a in actions.items()
+        }
+    })
+
+
+def test_create_outputs_file(
+    tmp_path: Path, terraform_calls: list[Sequence[str]]
+) -> None:
+    output_file = tmp_path / "tmp" / "outputs.json"
+    assert create_outputs_file(output_file) == output_file
+    assert json.loads(output_file.read_text(encoding="utf-8")) == TERRAFORM_OUTPUTS
+    assert terraform_calls == [["output", "-json"]]
+    assert list(tmp_path.glob("tmp/*.tmp")) == []
+
+
+@pytest.mark.parametrize(
+    ("sensitive", "expected"),
+    [
+        (SensitiveOutputs.OMIT, {"arn"}),
+        (SensitiveOutputs.REDACT, {"arn", "password"}),
+    ],
+)
+def test_create_outputs_file_sensitive(
+    tmp_path: Path,
+    terraform_calls: list[Sequence[str]],  # ruff: ignore[unused-function-argument]
+    sensitive: SensitiveOutputs,
+    expected: set[str],
+) -> None:
+    output_file = tmp_path / "outputs.json"
+    create_outputs_file(output_file, sensitive=sensitive)
+    written = json.loads(output_file.read_text(encoding="utf-8"))
+    assert set(written) == expected
+    assert "hunter22" not in output_file.read_text(encoding="utf-8")
+    if "password" in written:
+        assert written["password"]["value"] == REDACTED
+
+
+def test_create_outputs_file_only_changed(
+    tmp_path: Path, terraform_calls: list[Sequence[str]]
+) -> None:
+    output_file = tmp_path / "outputs.json"
+    plan = _plan(arn=["no-op"], password=["update"])
+    create_outputs_file(output_file, plan=plan, only_changed=True)
+    assert set(json.loads(output_file.read_text(encoding="utf-8"))) == {"password"}
+    assert len(terraform_calls) == 1
+
+
+def test_create_outputs_file_only_changed_merge(
+    tmp_path: Path, terraform_calls: list[Sequence[str]]
+) -> None:
+    output_file = tmp_path / "outputs.json"
+    existing = {
+        "arn": {"sensitive": False, "type": "string", "value": "old-arn"},
+        "password": {"sensitive": True, "type": "string", "value": "old"},
+        "gone": {"sensitive": False, "type": "string", "value": "x"},
+    }
+    output_file.write_text(json.dumps(existing), encoding="utf-8")
+    plan = _plan(arn=["no-op"], password=["update"], gone=["delete"])
+    create_outputs_file(output_file, plan=plan, only_changed=True)
+    # unchanged outputs are kept, deleted ones dropped
+    assert json.loads(output_file.read_text(encoding="utf-8")) == {
+        "arn": existing["arn"],
+        "password": TERRAFORM_OUTPUTS["password"],
+    }
+    assert len(terraform_calls) == 1
+
+
+def test_create_outputs_file_only_changed_plan_file(
+    tmp_path: Path, terraform_calls: list[Sequence[str]]
+) -> None:
+    output_file = tmp_path / "outputs.json"
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(
+        _plan(arn=["create"], password=["no-op"]).model_dump_json(), encoding="utf-8"
+    )
+    create_outputs_file(output_file, plan_file=plan_file, only_changed=True)
+    assert set(json.loads(output_file.read_text(encoding="utf-8"))) == {"arn"}
+    assert len(terraform_calls) == 1
+
+
+def test_create_outputs_file_terraform(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    responses = tmp_path / "responses.json"
+    responses.write_text(
+        json.dumps({"output -json": {"stdout": json.dumps(TERRAFORM_OUTPUTS)}}),
+        encoding="utf-8",
+    )
+    monkeypatch.setenv(
+        EnvVar.TERRAFORM_CMD,
+        f"{sys.executable} -m external_resources_io.terraform.fake",
+    )
+    monkeypatch.setenv(RESPONSES_ENV_VAR, str(responses))
+    output_file = tmp_path / "outputs.json"
+    create_outputs_file(output_file)
+    assert json.loads(output_file.read_text(encoding="utf-8")) == TERRAFORM_OUTPUTS
+
+    responses.write_text(
+        json.dumps({"output -json": {"stderr": "Error: no state", "returncode": 1}}),
+        encoding="utf-8",
+    )
+    with pytest.raises(CalledProcessError) as error:
+        create_outputs_file(output_file)
+    assert error.value.stderr == "Error: no state"
+    # the previous file is left alone
+    assert json.loads(output_file.read_text(encoding="utf-8")) == TERRAFORM_OUTPUTS
+
+
+def test_create_outputs_file_only_changed_without_changes(
+    tmp_path: Path, terraform_calls: list[Sequence[str]]
+) -> None:
+    output_file = tmp_path / "outputs.json"
+    plan = _plan(arn=["no-op"])
+    assert create_outputs_file(output_file, plan=plan, only_changed=True) is None
+    assert not output_file.exists()
+    assert terraform_calls == []
+
+
+def test_changed_outputs() -> None:
+    plan = _plan(a=["no-op"], b=["create"], c=["delete"])
+    assert changed_outputs(plan) == {"b", "c"}
+    assert changed_outputs(PlanIndex.from_plan(plan)) == {"b", "c"}
@@ -0,0 +1,99 @@
+import gc
+from typing import TYPE_CHECKING, Any
+
+from external_resources_io.terraform.plan import (
+    Action,
+    Plan,
+    ResourceChange,
+    ResourceChangeDetails,
+    parse_plans,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _change(address: str, *actions: str) -> dict[str, Any]:
+    resource_type, name = address.rsplit(".", 2)[-2:]
+    return {
+        "address": address,
+        "type": resource_type,
+        "name": name,
+        "change": {"actions": list(actions), "after_unknown": {}},
+    }
+
+
+def _plan() -> Plan:
+    return Plan.model_validate({
+        "resource_changes": [
+            _change("aws_s3_bucket.a", "update"),
+            _change("aws_s3_bucket.b", "no-op"),
+            _change("module.m.aws_security_group.c", "delete", "create"),
+        ],
+        "resource_drift": [
+            _change("aws_s3_bucket.a", "update"),
+            _change("aws_s3_bucket.gone", "delete"),
+        ],
+        "relevant_attributes": [
+            {"resource": "aws_s3_bucket.a", "attribute": ["tags"]},
+            {"resource": "aws_s3_bucket.a", "attribute": ["tags_all", "Name"]},
+            {
+                "resource": "module.m.aws_security_group.c",
+                "attribute": ["ingress", 0, "cidr_blocks"],
+            },
+            {"resource": "aws_s3_bucket.gone", "attribute": ["bucket"]},
+        ],
+    })
+
+
+def test_change_details() -> None:
+    plan = _plan()
+    assert list(plan.change_details) == [
+        "aws_s3_bucket.a",
+        "aws_s3_bucket.b",
+        "module.m.aws_security_group.c",
+    ]
+    a = plan.details("aws_s3_bucket.a")
+    assert a is not None
+    assert a.change is plan.resource_changes[0]
+    assert a.relevant_attributes == (("tags",), ("tags_all", "Name"))
+    assert a.drift is plan.resource_drift[0]
+
+    assert plan.details("aws_s3_bucket.b") == ResourceChangeDetails(
+        change=plan.resource_changes[1], relevant_attributes=(), drift=None
+    )
+    c = plan.details("module.m.aws_security_group.c")
+    assert c is not None
+    assert c.relevant_attributes == (("ingress", 0, "cidr_blocks"),)
+    assert c.change.change is not None
+    assert c.change.change.actions == [Action.ActionDelete, Action.ActionCreate]
+
+    # drift without a planned change has no details
+    assert plan.details("aws_s3_bucket.gone") is None
+
+
+def test_drifted_changes() -> None:
+    plan = _plan()
+    assert [d.change.address for d in plan.drifted_changes()] == ["aws_s3_bucket.a"]
+    assert list(Plan().drifted_changes()) == []
+
+
+def test_change_details_without_address() -> None:
+    plan = Plan(resource_changes=[ResourceChange(type="aws_s3_bucket", name="a")])
+    assert plan.change_details == {}
+
+
+def test_parse_plans(tmp_path: Path) -> None:
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"plan-{i}.json"
+        plan = Plan.model_validate({
+            "resource_changes": [_change(f"aws_s3_bucket.b{i}", "create")]
+        })
+        path.write_text(plan.model_dump_json())
+        paths.append(str(path))
+    plans = parse_plans(paths, max_workers=4)
+    assert [p.resource_changes[0].address for p in plans] == [
+        f"aws_s3_bucket.b{i}" for i in range(8)
+    ]
+    assert gc.isenabled()
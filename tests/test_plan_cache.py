@@ -0,0 +1,132 @@
+import json
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+from pydantic import ValidationError
+
+from external_resources_io.config import EnvVar
+from external_resources_io.terraform.plan import TerraformJsonPlanParser
+from external_resources_io.terraform.plan_cache import (
+    PlanCache,
+    PlanIndex,
+    ResourceChangeIndex,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _write_plan(path: Path, address: str = "aws_s3_bucket.b") -> Path:
+    path.write_text(
+        json.dumps({
+            "format_version": "1.2",
+            "resource_changes": [
+                {
+                    "address": address,
+                    "type": "aws_s3_bucket",
+                    "name": "b",
+                    "change": {"actions": ["delete", "create"], "after_unknown": {}},
+                }
+            ],
+            "output_changes": {"arn": {"actions": ["update"], "after_unknown": False}},
+        }),
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> PlanCache:
+    return PlanCache(tmp_path / "cache")
+
+
+def _entry(cache: PlanCache, plan_file: Path) -> Path:
+    return cache.directory / f"{cache.key(plan_file.read_bytes())}.plan-index"
+
+
+def test_plan_index(tmp_path: Path) -> None:
+    parser = TerraformJsonPlanParser(str(_write_plan(tmp_path / "plan.json")))
+    assert parser.index == PlanIndex(
+        format_version="1.2",
+        terraform_version=None,
+        complete=None,
+        errored=None,
+        resource_changes=[
+            ResourceChangeIndex(
+                address="aws_s3_bucket.b",
+                type="aws_s3_bucket",
+                name="b",
+                module_address=None,
+                provider_name=None,
+                actions=("delete", "create"),
+            )
+        ],
+        output_changes={"arn": ("update",)},
+    )
+    assert PlanIndex.loads(parser.index.dumps()) == parser.index
+
+
+def test_plan_cache_miss_and_hit(cache: PlanCache, tmp_path: Path) -> None:
+    plan_file = _write_plan(tmp_path / "plan.json")
+    index = TerraformJsonPlanParser(str(plan_file), cache=cache).index
+    assert _entry(cache, plan_file).exists()
+
+    parser = TerraformJsonPlanParser(str(plan_file), cache=cache)
+    assert parser.index == index
+    # the plan hasn't been parsed for the cache hit
+    assert "plan" not in vars(parser)
+    assert parser.plan.resource_changes[0].address == "aws_s3_bucket.b"
+
+
+def test_plan_validation(cache: PlanCache, tmp_path: Path) -> None:
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text('{"resource_changes": 1}', encoding="utf-8")
+    # validated right away without a cache
+    with pytest.raises(ValidationError):
+        TerraformJsonPlanParser(str(plan_file))
+    parser = TerraformJsonPlanParser(str(plan_file), cache=cache)
+    with pytest.raises(ValidationError):
+        _ = parser.plan
+
+
+def test_plan_cache_key_changes_with_content(cache: PlanCache, tmp_path: Path) -> None:
+    plan_a = _write_plan(tmp_path / "a.json", "aws_s3_bucket.a").read_bytes()
+    plan_b = _write_plan(tmp_path / "b.json", "aws_s3_bucket.b").read_bytes()
+    assert cache.key(plan_a) != cache.key(plan_b)
+
+
+def test_plan_cache_corrupt_entry(cache: PlanCache, tmp_path: Path) -> None:
+    plan_file = _write_plan(tmp_path / "plan.json")
+    cache.directory.mkdir()
+    _entry(cache, plan_file).write_bytes(b"garbage")
+    index = TerraformJsonPlanParser(str(plan_file), cache=cache).index
+    assert index.resource_changes[0].address == "aws_s3_bucket.b"
+    assert cache.get(cache.key(plan_file.read_bytes())) == index
+
+
+def test_plan_cache_evicts_least_recently_used(
+    cache: PlanCache, tmp_path: Path
+) -> None:
+    plans = [
+        _write_plan(tmp_path / f"{i}.json", f"aws_s3_bucket.b{i}") for i in range(3)
+    ]
+    for i, plan_file in enumerate(plans):
+        _ = TerraformJsonPlanParser(str(plan_file), cache=cache).index
+        os.utime(_entry(cache, plan_file), (i, i))
+    keys = [cache.key(plan_file.read_bytes()) for plan_file in plans]
+    # touch the oldest entry, so the second one becomes the least recently used
+    assert cache.get(keys[0]) is not None
+    cache.max_bytes = _entry(cache, plans[0]).stat().st_size * 2
+    cache.evict()
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+
+def test_plan_cache_from_env_var(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv(EnvVar.PLAN_CACHE_DIR, str(tmp_path / "cache"))
+    _ = TerraformJsonPlanParser(str(_write_plan(tmp_path / "plan.json"))).index
+    assert len(list((tmp_path / "cache").glob("*.plan-index"))) == 1
@@ -0,0 +1,137 @@
+from typing import Any
+
+import pytest
+
+from external_resources_io.terraform.plan import Action, Plan
+from external_resources_io.terraform.policy import PolicyEngine, Rule, Violation
+
+
+def _change(
+    address: str,
+    *actions: str,
+    before: dict[str, Any] | None = None,
+    after: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    resource_type, name = address.rsplit(".", 2)[-2:]
+    return {
+        "address": address,
+        "type": resource_type,
+        "name": name,
+        "change": {
+            "actions": list(actions),
+            "before": before,
+            "after": after,
+            "after_unknown": {},
+        },
+    }
+
+
+@pytest.fixture
+def plan() -> Plan:
+    return Plan.model_validate({
+        "resource_changes": [
+            _change("aws_db_instance.db", "delete"),
+            _change("aws_db_instance.replica", "delete", "create"),
+            _change("module.app.aws_s3_bucket.b", "update"),
+            _change("aws_s3_bucket.logs", "no-op"),
+            _change(
+                "aws_security_group.sg",
+                "update",
+                before={"tags": {"Name": "a"}, "ingress": [{"cidr": "10.0.0.0/8"}]},
+                after={"tags": {"Name": "a"}, "ingress": [{"cidr": "0.0.0.0/0"}]},
+            ),
+        ]
+    })
+
+
+def _addresses(violations: list[Violation]) -> list[str | None]:
+    return [v.address for v in violations]
+
+
+def test_rule_type_and_action(plan: Plan) -> None:
+    rule = Rule(
+        name="no-db-deletes",
+        message="RDS instances must not be deleted",
+        resource_types=["aws_db_instance"],
+        actions=[Action.ActionDelete],
+    )
+    violations = PolicyEngine([rule]).check(plan)
+    assert violations == [
+        Violation(rule, "aws_db_instance.db", (Action.ActionDelete,)),
+        Violation(
+            rule,
+            "aws_db_instance.replica",
+            (Action.ActionDelete, Action.ActionCreate),
+        ),
+    ]
+    assert violations[0].message == (
+        "aws_db_instance.db: RDS instances must not be deleted"
+    )
+
+
+def test_rule_replace(plan: Plan) -> None:
+    engine = PolicyEngine([
+        Rule(name="no-replace", replace=True),
+        Rule(name="no-db-delete", resource_types=["aws_db_instance"], replace=False),
+    ])
+    assert [(v.rule.name, v.address) for v in engine.check(plan)] == [
+        ("no-db-delete", "aws_db_instance.db"),
+        ("no-replace", "aws_db_instance.replica"),
+    ]
+
+
+def test_rule_addresses(plan: Plan) -> None:
+    engine = PolicyEngine([
+        Rule(name="module-only", exclude_addresses=["module.app.*"]),
+    ])
+    # no-ops are ignored without an explicit no-op action
+    assert _addresses(engine.check(plan)) == [
+        "aws_db_instance.db",
+        "aws_db_instance.replica",
+        "aws_security_group.sg",
+    ]
+    engine = PolicyEngine([
+        Rule(name="buckets", addresses=["*aws_s3_bucket.*"], actions=list(Action)),
+    ])
+    assert _addresses(engine.check(plan)) == [
+        "module.app.aws_s3_bucket.b",
+        "aws_s3_bucket.logs",
+    ]
+
+
+def test_rule_attributes(plan: Plan) -> None:
+    engine = PolicyEngine([
+        Rule(name="ingress", attributes=["ingress.0.cidr"]),
+        Rule(name="tags", attributes=["tags.Name"]),
+    ])
+    assert [(v.rule.name, v.address) for v in engine.check(plan)] == [
+        ("ingress", "aws_security_group.sg")
+    ]
+
+
+def test_rule_attributes_unknown() -> None:
+    change = _change("aws_s3_bucket.b", "update", before={"arn": "a"}, after={})
+    change["change"]["after_unknown"] = {"arn": True}
+    plan = Plan.model_validate({"resource_changes": [change]})
+    engine = PolicyEngine([Rule(name="arn", attributes=["arn"])])
+    assert _addresses(engine.check(plan)) == ["aws_s3_bucket.b"]
+
+
+def test_rules_evaluated_once_per_change(plan: Plan) -> None:
+    # the rule is dispatched via both actions of the replacement
+    rule = Rule(
+        name="db",
+        resource_types=["aws_db_instance"],
+        actions=[Action.ActionDelete, Action.ActionCreate],
+    )
+    assert _addresses(PolicyEngine([rule]).check(plan)) == [
+        "aws_db_instance.db",
+        "aws_db_instance.replica",
+    ]
+
+
+def test_evaluate_stream(plan: Plan) -> None:
+    engine = PolicyEngine([Rule(name="any")])
+    violations = engine.evaluate(iter(plan.resource_changes))
+    assert next(violations).address == "aws_db_instance.db"
+    assert PolicyEngine([]).check(plan) == []
@@ -0,0 +1,57 @@
+import json
+import pstats
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+from external_resources_io.config import EnvVar
+from external_resources_io.profiling import profile, profile_dir, profiled
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+@profiled
+def _work(n: int) -> int:
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return len([str(i) for i in range(n)])
+
+
+@profiled
+def _outer() -> int:
+    return _work(10)
+
+
+def test_profiled_disabled(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(EnvVar.PROFILE_DIR, raising=False)
+    monkeypatch.chdir(tmp_path)
+    profile_dir.cache_clear()
+    assert _work(10) == 10  # ruff: ignore[magic-value-comparison]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiled(profiles: Path) -> None:
+    assert _work(100_000) == 100_000  # ruff: ignore[magic-value-comparison]
+
+    (stats_file,) = profiles.glob("*.pstats")
+    assert stats_file.name.startswith("tests.test_profiling._work-")
+    assert pstats.Stats(str(stats_file)).get_stats_profile().func_profiles
+
+    summary = json.loads(
+        stats_file.parent.joinpath(f"{stats_file.stem}.json").read_text(
+            encoding="utf-8"
+        )
+    )
+    assert summary["name"] == "tests.test_profiling._work"
+    assert summary["wall_time"] > 0
+    assert summary["memory_peak"] > 0
+    assert summary["top_allocations"]
+    assert summary["children_user_time"] + summary["children_system_time"] > 0
+
+
+def test_profiled_nested(profiles: Path) -> None:
+    with profile("block"):
+        _outer()
+    assert [p.stem.split("-")[0] for p in profiles.glob("*.json")] == ["block"]
@@ -0,0 +1,235 @@
+import json
+import sys
+from subprocess import CalledProcessError
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from external_resources_io.config import EnvVar
+from external_resources_io.terraform.fake import RESPONSES_ENV_VAR
+from external_resources_io.terraform.plan import Plan
+from external_resources_io.terraform.provider_schema import (
+    DATA_SOURCE,
+    ProviderSchemaCache,
+    ProviderSchemaIndex,
+    load_provider_schemas,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+AWS = "registry.terraform.io/hashicorp/aws"
+RANDOM = "registry.terraform.io/hashicorp/random"
+
+DB_INSTANCE: dict[str, Any] = {
+    "version": 2,
+    "block": {
+        "attributes": {
+            "identifier": {"type": "string", "optional": True, "computed": True},
+            "password": {"type": "string", "optional": True, "sensitive": True},
+            "tags": {"type": ["map", "string"], "optional": True},
+            "name": {"type": "string", "optional": True, "deprecated": True},
+        },
+    },
+}
+
+SECURITY_GROUP: dict[str, Any] = {
+    "version": 1,
+    "block": {
+        "attributes": {"name": {"type": "string", "required": True}},
+        "block_types": {
+            "ingress": {
+                "nesting_mode": "set",
+                "block": {
+                    "attributes": {
+                        "cidr_blocks": {"type": ["list", "string"], "optional": True}
+                    }
+                },
+            },
+            "timeouts": {
+                "nesting_mode": "single",
+                "block": {"attributes": {"create": {"type": "string"}}},
+            },
+        },
+    },
+}
+
+CLUSTER: dict[str, Any] = {
+    "block": {
+        "attributes": {
+            "nodes": {
+                "nested_type": {
+                    "nesting_mode": "map",
+                    "attributes": {"size": {"type": "number", "required": True}},
+                },
+                "optional": True,
+            },
+        },
+    },
+}
+
+SCHEMAS: dict[str, Any] = {
+    "format_version": "1.0",
+    "provider_schemas": {
+        AWS: {
+            "provider": {"block": {}},
+            "resource_schemas": {
+                "aws_db_instance": DB_INSTANCE,
+                "aws_security_group": SECURITY_GROUP,
+                "aws_cluster": CLUSTER,
+            },
+            "data_source_schemas": {
+                "aws_db_instance": {
+                    "block": {"attributes": {"address": {"type": "string"}}}
+                }
+            },
+        },
+        RANDOM: {
+            "resource_schemas": {
+                "random_password": {
+                    "block": {
+                        "attributes": {"result": {"type": "string", "sensitive": True}}
+                    }
+                }
+            }
+        },
+    },
+}
+
+
+def _record(path: Path, *, schemas: dict[str, Any] | None, aws: str = "5.0.0") -> None:
+    responses: dict[str, Any] = {
+        "version -json": {
+            "stdout": json.dumps({
+                "terraform_version": "1.9.0",
+                "provider_selections": {AWS: aws, RANDOM: "3.6.0"},
+            })
+        },
+    }
+    if schemas is not None:
+        schema_file = path.parent / "schemas.json"
+        schema_file.write_text(json.dumps(schemas), encoding="utf-8")
+        responses["providers schema -json"] = {"stdout_file": str(schema_file)}
+    path.write_text(json.dumps(responses), encoding="utf-8")
+
+
+@pytest.fixture
+def responses(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "responses.json"
+    _record(path, schemas=SCHEMAS)
+    monkeypatch.setenv(
+        EnvVar.TERRAFORM_CMD,
+        f"{sys.executable} -m external_resources_io.terraform.fake",
+    )
+    monkeypatch.setenv(RESPONSES_ENV_VAR, str(path))
+    monkeypatch.setenv(EnvVar.PROVIDER_SCHEMA_CACHE_DIR, str(tmp_path / "schemas"))
+    return path
+
+
+def _plan() -> Plan:
+    return Plan.model_validate({
+        "resource_changes": [
+            {
+                "address": "module.db.aws_db_instance.db",
+                "type": "aws_db_instance",
+                "provider_name": AWS,
+                "change": {"actions": ["update"], "after_unknown": {}},
+            },
+            {
+                "address": "data.aws_db_instance.other",
+                "type": "aws_db_instance",
+                "provider_name": AWS,
+                "change": {"actions": ["read"], "after_unknown": {}},
+            },
+        ]
+    })
+
+
+@pytest.fixture
+def schemas(responses: Path) -> ProviderSchemaIndex:  # ruff: ignore[unused-function-argument]
+    return load_provider_schemas(_plan())
+
+
+def test_load_only_plan_types(schemas: ProviderSchemaIndex) -> None:
+    assert schemas.versions == {AWS: "5.0.0", RANDOM: "3.6.0"}
+    assert schemas.loaded_types == {"aws_db_instance"}
+    # other types are loaded on their first lookup
+    assert schemas.attribute("aws_security_group", ["name"])
+    assert schemas.loaded_types == {"aws_db_instance", "aws_security_group"}
+
+
+def test_attribute(schemas: ProviderSchemaIndex) -> None:
+    password = schemas.attribute("aws_db_instance", ["password"])
+    assert password
+    assert password.sensitive
+    assert password.optional
+    assert not password.computed
+    assert password.type == "string"
+    name = schemas.attribute("aws_db_instance", "name")
+    assert name
+    assert name.deprecated
+    assert schemas.attribute("aws_db_instance", "unknown") is None
+    assert schemas.attribute("aws_unknown", "name") is None
+    assert schemas.attribute("google_sql_instance", "name") is None
+
+
+def test_attribute_paths(schemas: ProviderSchemaIndex) -> None:
+    tags = schemas.attribute("aws_db_instance", ["tags"])
+    assert tags
+    assert schemas.attribute("aws_db_instance", ["tags", "Name"]) == tags
+
+    ingress = schemas.attribute("aws_security_group", ["ingress"])
+    assert ingress
+    assert ingress.nesting_mode == "set"
+    assert ingress.type is None
+    cidr_blocks = schemas.attribute("aws_security_group", ["ingress", 0, "cidr_blocks"])
+    assert cidr_blocks
+    assert cidr_blocks.type == ["list", "string"]
+    assert schemas.attribute("aws_security_group", "ingress.0.cidr_blocks.1") == (
+        cidr_blocks
+    )
+    assert schemas.attribute("aws_security_group", "ingress.cidr_blocks") == (
+        cidr_blocks
+    )
+    assert schemas.attribute("aws_security_group", "timeouts.create")
+    assert schemas.attribute("aws_security_group", "timeouts.0.create") is None
+
+    size = schemas.attribute("aws_cluster", ["nodes", "workers", "size"])
+    assert size
+    assert size.required
+
+
+def test_data_sources_and_providers(schemas: ProviderSchemaIndex) -> None:
+    assert schemas.attribute("aws_db_instance", "address", kind=DATA_SOURCE)
+    assert schemas.attribute("aws_db_instance", "address") is None
+    result = schemas.attribute("random_password", "result")
+    assert result
+    assert result.sensitive
+    assert schemas.attribute("random_password", "result", provider=AWS) is None
+
+
+def test_schemas_cached(responses: Path, tmp_path: Path) -> None:
+    load_provider_schemas()
+    # terraform providers schema fails from now on
+    _record(responses, schemas=None)
+    schemas = load_provider_schemas(resource_types=["aws_db_instance"])
+    assert schemas.loaded_types == {"aws_db_instance"}
+    assert schemas.attribute("aws_db_instance", "password")
+
+    # a new provider version is fetched again
+    _record(responses, schemas=None, aws="5.1.0")
+    with pytest.raises(CalledProcessError):
+        load_provider_schemas()
+    assert len(list((tmp_path / "schemas").iterdir())) == 2  # ruff: ignore[magic-value-comparison]
+
+
+def test_cache_corrupt_entry(tmp_path: Path) -> None:
+    cache = ProviderSchemaCache(tmp_path)
+    cache.put(AWS, "5.0.0", SCHEMAS["provider_schemas"][AWS])
+    cache.put(AWS, "5.0.0", {})
+    assert cache.get(AWS, "5.0.0", "aws_db_instance") == DB_INSTANCE
+    assert cache.get(AWS, "5.0.1", "aws_db_instance") is None
+    assert cache.get(AWS, "5.0.0", "../aws_db_instance") is None
+    for path in tmp_path.glob("*/resource.aws_db_instance.json"):
+        path.write_text("{", encoding="utf-8")
+    assert cache.get(AWS, "5.0.0", "aws_db_instance") is None
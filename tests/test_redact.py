@@ -0,0 +1,188 @@
+import logging
+import sys
+from subprocess import CalledProcessError
+from typing import TYPE_CHECKING
+
+import pytest
+from pydantic import BaseModel, SecretStr
+
+from external_resources_io.config import EnvVar
+from external_resources_io.log import remove_log_filter, setup_logging
+from external_resources_io.redact import (
+    REDACTED,
+    RedactionFilter,
+    Redactor,
+    input_sensitive_values,
+    plan_sensitive_values,
+    redact_logs,
+)
+from external_resources_io.terraform.plan import Plan
+from external_resources_io.terraform.run import terraform_run
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture
+def redactor() -> Redactor:
+    return Redactor(["password", "pass-phrase", "passw0rd!", "s3cr3t", "abc"])
+
+
+def test_redact(redactor: Redactor) -> None:
+    assert (
+        redactor.redact("pw=password1 phrase=pass-phrase abc s3cr3t.")
+        == f"pw={REDACTED}1 phrase={REDACTED} abc {REDACTED}."
+    )
+
+
+def test_redact_longest_match(redactor: Redactor) -> None:
+    assert Redactor(["secret", "secret-value"]).redact("a secret-value") == (
+        f"a {REDACTED}"
+    )
+    assert redactor.redact("passw0rd!") == REDACTED
+
+
+def test_redact_overlapping() -> None:
+    assert Redactor(["abcd", "cdefgh"]).redact("xxabcdefghyy") == (f"xx{REDACTED}yy")
+    # adjacent secrets are replaced as a whole, too
+    assert Redactor(["abcd", "efgh"]).redact("abcdefgh abcd") == (
+        f"{REDACTED} {REDACTED}"
+    )
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 100])
+@pytest.mark.parametrize(
+    ("secrets", "overlapping"),
+    [(["abcd", "cdefgh"], "abcdefgh"), (["ab\ncd", "cd\nef"], "ab\ncd\nef")],
+)
+def test_redact_stream_overlapping(
+    secrets: list[str], overlapping: str, size: int
+) -> None:
+    redactor = Redactor(secrets)
+    text = "".join(f"{i} xx{overlapping}yy\n" for i in range(10))
+    chunks = [text[i : i + size] for i in range(0, len(text), size)]
+    redacted = "".join(redactor.redact_stream(chunks))
+    assert redacted == redactor.redact(text)
+    assert redacted == "".join(f"{i} xx{REDACTED}yy\n" for i in range(10))
+
+
+def test_redact_special_characters() -> None:
+    assert Redactor(["a.b*c", "(x|y)"]).redact("a.b*c axbyc (x|y)") == (
+        f"{REDACTED} axbyc {REDACTED}"
+    )
+
+
+def test_redact_without_secrets() -> None:
+    redactor = Redactor(["abc"])
+    assert redactor.redact("abc") == "abc"
+    assert list(redactor.redact_stream(["a", "b"])) == ["a", "b"]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 100])
+@pytest.mark.parametrize("secrets", [["password", "s3cr3t"], ["multi\nline"]])
+def test_redact_stream(secrets: list[str], size: int) -> None:
+    redactor = Redactor(secrets)
+    text = "".join(f"line {i} {secrets[i % len(secrets)]}\n" for i in range(20))
+    chunks = [text[i : i + size] for i in range(0, len(text), size)]
+    assert "".join(redactor.redact_stream(chunks)) == redactor.redact(text)
+    assert secrets[0] not in "".join(redactor.redact_stream(chunks))
+
+
+def test_redaction_filter(redactor: Redactor) -> None:
+    record = logging.LogRecord(
+        "test", logging.ERROR, __file__, 1, "login with %s", ("password",), None
+    )
+    error = ValueError("s3cr3t")
+    record.exc_info = (ValueError, error, None)
+    assert RedactionFilter(redactor).filter(record)
+    assert record.getMessage() == f"login with {REDACTED}"
+    assert record.exc_text
+    assert "s3cr3t" not in record.exc_text
+
+
+@pytest.fixture
+def installed(redactor: Redactor) -> Iterator[RedactionFilter]:
+    redaction_filter = redact_logs(redactor)
+    yield redaction_filter
+    remove_log_filter(redaction_filter)
+
+
+def test_redact_logs_setup_logging(
+    installed: RedactionFilter, capsys: pytest.CaptureFixture[str]
+) -> None:
+    # the filter survives the reconfiguration
+    setup_logging()
+    logging.getLogger("test").warning("login with %s", "password")
+    err = capsys.readouterr().err
+    assert f"login with {REDACTED}" in err
+    assert "password" not in err
+    assert all(installed in handler.filters for handler in logging.getLogger().handlers)
+
+
+@pytest.mark.usefixtures("installed")
+def test_redact_terraform_run(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setenv(
+        EnvVar.TERRAFORM_CMD,
+        f"{sys.executable} -m external_resources_io.terraform.fake",
+    )
+    # the fake terraform echoes unknown commands to stderr
+    with pytest.raises(CalledProcessError) as error:
+        terraform_run(["apply", "-var=pw=s3cr3t"], dry_run=False)
+    assert "s3cr3t" not in error.value.stderr
+    assert REDACTED in error.value.stderr
+    assert "s3cr3t" not in caplog.text
+
+
+def test_plan_sensitive_values() -> None:
+    plan = Plan.model_validate({
+        "resource_changes": [
+            {
+                "address": "aws_db_instance.db",
+                "change": {
+                    "actions": ["update"],
+                    "before": {"password": "old-password", "port": 5432},
+                    "after": {
+                        "password": "new-password",
+                        "port": 5432,
+                        "tags": {"owner": "team", "token": "tag-token"},
+                    },
+                    "after_unknown": {},
+                    "before_sensitive": {"password": True},
+                    "after_sensitive": {"password": True, "tags": {"token": True}},
+                },
+            }
+        ],
+        "output_changes": {
+            "dsn": {
+                "actions": ["create"],
+                "after": 'db "dsn"',
+                "after_unknown": False,
+                "after_sensitive": True,
+            }
+        },
+    })
+    assert plan_sensitive_values(plan) == {
+        "old-password",
+        "new-password",
+        "tag-token",
+        'db "dsn"',
+        'db \\"dsn\\"',
+    }
+
+
+def test_input_sensitive_values() -> None:
+    class Credentials(BaseModel):
+        user: str
+        password: SecretStr
+
+    class Data(BaseModel):
+        credentials: list[Credentials]
+        api_key: SecretStr | None = None
+
+    data = Data(
+        credentials=[Credentials(user="admin", password=SecretStr("hunter22"))],
+        api_key=SecretStr("key-1234"),
+    )
+    assert input_sensitive_values(data) == {"hunter22", "key-1234"}
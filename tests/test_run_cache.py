@@ -0,0 +1,224 @@
+from typing import TYPE_CHECKING
+
+import pytest
+from pydantic import BaseModel
+
+from external_resources_io.config import EnvVar
+from external_resources_io.exit_status import EXIT_OK, EXIT_SKIP
+from external_resources_io.input import AppInterfaceProvision
+from external_resources_io.terraform import run_cache
+from external_resources_io.terraform.run_cache import (
+    LocalRunCacheStore,
+    RunCache,
+    RunRecord,
+    cached_terraform_run,
+    run_digest,
+    run_key,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    from tests.conftest import Data
+
+
+class AppInterfaceInput(BaseModel):
+    data: BaseModel
+    provision: AppInterfaceProvision
+
+
+@pytest.fixture
+def ai_input(data: Data, provision_data: AppInterfaceProvision) -> AppInterfaceInput:
+    return AppInterfaceInput(data=data, provision=provision_data)
+
+
+@pytest.fixture
+def module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    module = tmp_path / "module"
+    module.mkdir()
+    (module / "backend.tf").write_text('terraform {\n  backend "s3" {}\n}\n')
+    (module / "variables.tf").write_text('variable "region" {\n  type = string\n}\n')
+    monkeypatch.setenv(EnvVar.BACKEND_TF_FILE, str(module / "backend.tf"))
+    monkeypatch.setenv(EnvVar.VARIABLES_TF_FILE, str(module / "variables.tf"))
+    monkeypatch.setenv(EnvVar.MODULE_VERSION, "1.0.0")
+    monkeypatch.setenv(EnvVar.DRY_RUN, "False")
+    return module
+
+
+@pytest.fixture
+def terraform_calls(monkeypatch: pytest.MonkeyPatch) -> list[Sequence[str]]:
+    calls = []
+
+    def terraform_run(args: Sequence[str], *, dry_run: bool | None = None) -> str:  # ruff: ignore[unused-function-argument]
+        calls.append(args)
+        return ""
+
+    monkeypatch.setattr(run_cache, "terraform_run", terraform_run)
+    return calls
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _digest(ai_input: AppInterfaceInput, module: Path, **kwargs: str) -> str:
+    return run_digest(
+        ai_input,
+        backend_tf_file=module / "backend.tf",
+        variables_tf_file=module / "variables.tf",
+        **{"module_version": "1.0.0", "action": "apply", **kwargs},
+    )
+
+
+def test_run_key(ai_input: AppInterfaceInput) -> None:
+    assert run_key(ai_input) == (
+        "test-external-resources-state/"
+        "aws/ter-int-dev/aws-iam-role/test-external-resources-iam-role/terraform.state"
+    )
+
+
+def test_run_digest(ai_input: AppInterfaceInput, module: Path) -> None:
+    digest = _digest(ai_input, module)
+    assert digest == _digest(ai_input, module)
+    assert digest != _digest(ai_input, module, module_version="1.0.1")
+    assert digest != _digest(ai_input, module, action="destroy")
+
+    changed = ai_input.model_copy(
+        update={"data": ai_input.data.model_copy(update={"region": "us-west-2"})}
+    )
+    assert digest != _digest(changed, module)
+
+    (module / "variables.tf").write_text("")
+    assert digest != _digest(ai_input, module)
+
+
+def test_local_store(tmp_path: Path) -> None:
+    store = LocalRunCacheStore(tmp_path / "cache")
+    assert store.get("bucket/key") is None
+    record = RunRecord(digest="abc", finished_at=1.0)
+    store.put("bucket/key", record)
+    assert store.get("bucket/key") == record
+    assert store.get("bucket/other") is None
+    assert (tmp_path / "cache").stat().st_mode & 0o777 == 0o700  # ruff: ignore[magic-value-comparison]
+
+    for path in (tmp_path / "cache").iterdir():
+        path.write_text("{")
+    assert store.get("bucket/key") is None
+
+
+def test_run_cache_max_age(tmp_path: Path) -> None:
+    clock = Clock()
+    cache = RunCache(LocalRunCacheStore(tmp_path), max_age=60, clock=clock)
+    assert not cache.is_fresh("k", "d")
+    cache.record("k", "d")
+    assert cache.is_fresh("k", "d")
+    assert not cache.is_fresh("k", "other")
+    clock.now += 60
+    assert not cache.is_fresh("k", "d")
+
+
+def test_cached_terraform_run(
+    ai_input: AppInterfaceInput,
+    module: Path,
+    tmp_path: Path,
+    terraform_calls: list[Sequence[str]],
+) -> None:
+    cache = RunCache(LocalRunCacheStore(tmp_path / "cache"))
+    assert cached_terraform_run(ai_input, ["apply"], cache=cache) == EXIT_OK
+    assert cached_terraform_run(ai_input, ["apply"], cache=cache) == EXIT_SKIP
+    assert terraform_calls == [["apply"]]
+
+    (module / "backend.tf").write_text("")
+    assert cached_terraform_run(ai_input, ["apply"], cache=cache) == EXIT_OK
+    assert (
+        cached_terraform_run(ai_input, ["apply"], cache=cache, module_version="2")
+        == EXIT_OK
+    )
+    assert len(terraform_calls) == 3  # ruff: ignore[magic-value-comparison]
+
+
+@pytest.mark.usefixtures("module")
+def test_cached_terraform_run_plan_then_apply(
+    ai_input: AppInterfaceInput,
+    tmp_path: Path,
+    terraform_calls: list[Sequence[str]],
+) -> None:
+    cache = RunCache(LocalRunCacheStore(tmp_path / "cache"))
+    steps = [["init"], ["plan", "-out=plan"], ["apply", "plan"]]
+    # plans, e.g. of a merge request, don't record anything
+    for args in steps[:2]:
+        assert cached_terraform_run(ai_input, args, cache=cache) == EXIT_OK
+    assert [cached_terraform_run(ai_input, args, cache=cache) for args in steps] == [
+        EXIT_OK
+    ] * 3
+    assert terraform_calls == [*steps[:2], *steps]
+    # nothing changed since the last apply
+    assert [cached_terraform_run(ai_input, args, cache=cache) for args in steps] == [
+        EXIT_SKIP
+    ] * 3
+
+
+@pytest.mark.usefixtures("module")
+def test_cached_terraform_run_dry_run_apply(
+    ai_input: AppInterfaceInput,
+    tmp_path: Path,
+    terraform_calls: list[Sequence[str]],
+) -> None:
+    cache = RunCache(LocalRunCacheStore(tmp_path / "cache"))
+    args = ["-chdir=module", "apply"]
+    assert cached_terraform_run(ai_input, args, cache=cache, dry_run=True) == EXIT_OK
+    assert cached_terraform_run(ai_input, args, cache=cache) == EXIT_OK
+    assert cached_terraform_run(ai_input, args, cache=cache) == EXIT_SKIP
+    assert len(terraform_calls) == 2  # ruff: ignore[magic-value-comparison]
+
+
+@pytest.mark.usefixtures("module")
+def test_cached_terraform_run_dry_run(
+    ai_input: AppInterfaceInput,
+    tmp_path: Path,
+    terraform_calls: list[Sequence[str]],
+) -> None:
+    cache = RunCache(LocalRunCacheStore(tmp_path / "cache"))
+    for _ in range(2):
+        assert (
+            cached_terraform_run(ai_input, ["plan"], cache=cache, dry_run=True)
+            == EXIT_OK
+        )
+    assert len(terraform_calls) == 2  # ruff: ignore[magic-value-comparison]
+
+
+@pytest.mark.usefixtures("module")
+def test_cached_terraform_run_failure(
+    ai_input: AppInterfaceInput,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def terraform_run(args: Sequence[str], *, dry_run: bool | None = None) -> str:  # ruff: ignore[unused-function-argument]
+        raise RuntimeError
+
+    monkeypatch.setattr(run_cache, "terraform_run", terraform_run)
+    cache = RunCache(LocalRunCacheStore(tmp_path / "cache"))
+    with pytest.raises(RuntimeError):
+        cached_terraform_run(ai_input, ["apply"], cache=cache)
+    assert not cache.is_fresh(run_key(ai_input), _digest(ai_input, tmp_path / "module"))
+
+
+@pytest.mark.usefixtures("module")
+def test_cached_terraform_run_config(
+    ai_input: AppInterfaceInput,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    terraform_calls: list[Sequence[str]],
+) -> None:
+    # without RUN_CACHE_DIR, terraform always runs
+    for _ in range(2):
+        assert cached_terraform_run(ai_input, ["apply"]) == EXIT_OK
+    monkeypatch.setenv(EnvVar.RUN_CACHE_DIR, str(tmp_path / "cache"))
+    assert cached_terraform_run(ai_input, ["apply"]) == EXIT_OK
+    assert cached_terraform_run(ai_input, ["apply"]) == EXIT_SKIP
+    assert len(terraform_calls) == 3  # ruff: ignore[magic-value-comparison]
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from external_resources_io.terraform.scheduler import StateKey, StateKeyScheduler
+
+if TYPE_CHECKING:
+    from external_resources_io.input import AppInterfaceProvision
+
+
+def _provision(provision: AppInterfaceProvision, key: str) -> AppInterfaceProvision:
+    options = provision.module_provision_data.model_copy(update={"tf_state_key": key})
+    return provision.model_copy(update={"module_provision_data": options})
+
+
+def test_state_key_from_provision(provision_data: AppInterfaceProvision) -> None:
+    assert StateKey.from_provision(provision_data) == StateKey(
+        "test-external-resources-state",
+        "aws/ter-int-dev/aws-iam-role/test-external-resources-iam-role/terraform.state",
+    )
+
+
+def test_same_state_key_is_serialized(provision_data: AppInterfaceProvision) -> None:
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+    order = []
+
+    def run(i: int) -> int:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        order.append(i)
+        with lock:
+            running -= 1
+        return i
+
+    with StateKeyScheduler(max_workers=4) as scheduler:
+        futures = [scheduler.submit(provision_data, run, i) for i in range(4)]
+        assert [f.result() for f in futures] == [0, 1, 2, 3]
+
+    assert max_running == 1
+    assert order == [0, 1, 2, 3]
+    metrics = scheduler.wait_metrics()[StateKey.from_provision(provision_data)]
+    assert metrics.runs == len(futures)
+    assert metrics.max_wait >= 0.01  # ruff: ignore[magic-value-comparison]
+    assert metrics.mean_wait <= metrics.max_wait
+
+
+def test_different_state_keys_run_in_parallel(
+    provision_data: AppInterfaceProvision,
+) -> None:
+    # deadlocks (and times out) unless both runs are running at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    with StateKeyScheduler(max_workers=2) as scheduler:
+        futures = [
+            scheduler.submit(_provision(provision_data, key), barrier.wait)
+            for key in ("a", "b")
+        ]
+        assert sorted(f.result() for f in futures) == [0, 1]
+    assert set(scheduler.wait_metrics()) == {
+        StateKey("test-external-resources-state", "a"),
+        StateKey("test-external-resources-state", "b"),
+    }
+
+
+def test_exception_does_not_block_state_key(
+    provision_data: AppInterfaceProvision,
+) -> None:
+    def fail() -> None:
+        raise ValueError
+
+    with StateKeyScheduler() as scheduler:
+        failed = scheduler.submit(provision_data, fail)
+        succeeded = scheduler.submit(provision_data, lambda: "ok")
+        with pytest.raises(ValueError):  # ruff: ignore[pytest-raises-too-broad]
+            failed.result()
+        assert succeeded.result() == "ok"
+
+
+def test_submit_terraform_run_dry_run(provision_data: AppInterfaceProvision) -> None:
+    with StateKeyScheduler() as scheduler:
+        future = scheduler.submit_terraform_run(provision_data, ["plan"], dry_run=True)
+        assert not future.result()
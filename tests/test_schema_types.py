@@ -0,0 +1,95 @@
+# ruff: file-ignore[any-type]
+from datetime import datetime
+from enum import Enum, IntEnum
+from typing import Annotated, Any, Literal
+from uuid import UUID
+
+import pytest
+from pydantic import BaseModel, Field
+
+from external_resources_io.terraform.schema_types import (
+    ANY,
+    NUMBER,
+    STRING,
+    Collection,
+    Object,
+    model_terraform_types,
+    terraform_type,
+)
+
+
+class Color(Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+class Size(IntEnum):
+    SMALL = 1
+    LARGE = 2
+
+
+class Cat(BaseModel):
+    kind: Literal["cat"] = "cat"
+    lives: int
+
+
+class Dog(BaseModel):
+    kind: Literal["dog"] = "dog"
+    lives: int
+
+
+class Tree(BaseModel):
+    name: str
+    children: list["Tree"] = []
+
+
+class Leaf(BaseModel):
+    name: str
+
+
+class Branch(BaseModel):
+    left: Leaf
+    right: Leaf | None = None
+
+
+@pytest.mark.parametrize(
+    ("python_type", "expected"),
+    [
+        (float, "number"),
+        (datetime, "string"),
+        (UUID, "string"),
+        (None | str, "string"),
+        (list[Annotated[int, Field(gt=0)]], "list(number)"),
+        (frozenset[str], "set(string)"),
+        (tuple[int, str], "tuple([number, string])"),
+        (tuple[int, ...], "list(number)"),
+        (Color, "string"),
+        (Size, "number"),
+        (Literal[True], "bool"),
+        (int | str, "any"),
+        (Cat | Dog, "object({kind = string,lives = number})"),
+        (bytes, "any"),
+    ],
+)
+def test_terraform_type(python_type: Any, expected: str) -> None:
+    assert terraform_type(python_type).render() == expected
+
+
+def test_terraform_type_discriminated_union() -> None:
+    assert (
+        terraform_type(Annotated[Cat | Dog, Field(discriminator="kind")]).render()
+        == "object({kind = string,lives = number})"
+    )
+
+
+def test_terraform_type_recursive_model() -> None:
+    assert (
+        terraform_type(Tree).render() == "object({name = string,children = list(any)})"
+    )
+
+
+def test_model_terraform_types() -> None:
+    leaf = Object((("name", STRING),))
+    assert model_terraform_types(Branch) == {"left": leaf, "right": leaf}
+    assert model_terraform_types(Tree)["children"] == Collection("list", ANY)
+    assert terraform_type(Annotated[int, Field(ge=0)]) == NUMBER
@@ -0,0 +1,175 @@
+import io
+import json
+import socket
+import socketserver
+import stat
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from external_resources_io.server import (
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    SERVER_ERROR,
+    Server,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+INPUT_CLASS = "tests.test_cli.AppInterfaceInput"
+
+
+@pytest.fixture
+def server() -> Server:
+    return Server()
+
+
+def _request(method: str, params: dict[str, Any], request_id: int = 1) -> str:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params,
+        "id": request_id,
+    })
+
+
+def _call(server: Server, method: str, params: dict[str, Any]) -> dict[str, Any]:
+    response = server.handle(_request(method, params))
+    assert response
+    return json.loads(response)
+
+
+def test_generate_variables_tf(server: Server, tmp_path: Path) -> None:
+    output = tmp_path / "variables.tf"
+    response = _call(
+        server,
+        "generate-variables-tf",
+        {"input_class": INPUT_CLASS, "output": str(output)},
+    )
+    assert response == {"jsonrpc": "2.0", "result": str(output), "id": 1}
+    assert 'variable "name"' in output.read_text()
+
+
+def test_generate_backend_tf(
+    server: Server, tmp_path: Path, ai_data: dict[str, Any]
+) -> None:
+    output = tmp_path / "backend.tf"
+    input_file = tmp_path / "input.json"
+    ai_data["data"] = {"name": "example-01"}
+    input_file.write_text(json.dumps(ai_data))
+    response = _call(
+        server,
+        "generate-backend-tf",
+        {
+            "input_class": INPUT_CLASS,
+            "input_file": str(input_file),
+            "output": str(output),
+        },
+    )
+    assert response["result"] == str(output)
+    assert "test-external-resources-state" in output.read_text()
+
+
+def test_generate_tf_vars_json_inline_input(
+    server: Server, tmp_path: Path, ai_data: dict[str, Any]
+) -> None:
+    output = tmp_path / "terraform.tfvars.json"
+    ai_data["data"] = {"name": "example-01"}
+    response = _call(
+        server,
+        "generate-tf-vars-json",
+        {"input_class": INPUT_CLASS, "input": ai_data, "output": str(output)},
+    )
+    assert response["result"] == str(output)
+    assert json.loads(output.read_text()) == {"name": "example-01"}
+
+
+def test_parse_plan(server: Server, tmp_path: Path) -> None:
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(
+        json.dumps({
+            "format_version": "1.2",
+            "resource_changes": [
+                {
+                    "address": "aws_s3_bucket.b",
+                    "change": {"actions": ["create"], "after_unknown": {}},
+                }
+            ],
+        })
+    )
+    response = _call(
+        server,
+        "parse-plan",
+        {"plan_file": str(plan_file), "fields": ["format_version", "resource_changes"]},
+    )
+    assert response["result"]["format_version"] == "1.2"
+    assert response["result"]["resource_changes"][0]["change"]["actions"] == ["create"]
+    assert set(response["result"]) == {"format_version", "resource_changes"}
+
+
+@pytest.mark.parametrize(
+    ("line", "code"),
+    [
+        ("not json", PARSE_ERROR),
+        ('{"jsonrpc": "1.0", "method": "parse-plan", "id": 1}', INVALID_REQUEST),
+        ('{"jsonrpc": "2.0", "method": "unknown", "id": 1}', METHOD_NOT_FOUND),
+        (
+            '{"jsonrpc": "2.0", "method": "generate-variables-tf", "params": {}, "id": 1}',
+            INVALID_PARAMS,
+        ),
+        (
+            '{"jsonrpc": "2.0", "method": "parse-plan", "params": {"plan_file": "/does/not/exist"}, "id": 1}',
+            SERVER_ERROR,
+        ),
+    ],
+)
+def test_errors(server: Server, line: str, code: int) -> None:
+    response = server.handle(line)
+    assert response
+    assert json.loads(response)["error"]["code"] == code
+
+
+def test_notification(server: Server) -> None:
+    assert server.handle('{"jsonrpc": "2.0", "method": "unknown"}') is None
+
+
+def test_serve_stdio(server: Server) -> None:
+    stdin = io.StringIO("""\
+{"jsonrpc": "2.0", "method": "unknown", "id": 1}
+
+{"jsonrpc": "2.0", "method": "unknown", "id": 2}
+""")
+    stdout = io.StringIO()
+    server.serve_stdio(stdin, stdout)
+    assert [json.loads(line)["id"] for line in stdout.getvalue().splitlines()] == [
+        1,
+        2,
+    ]
+
+
+def test_serve_unix_socket(
+    server: Server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "server.sock"
+    # a stale socket of a previous server
+    with socket.socket(socket.AF_UNIX) as stale:
+        stale.bind(str(path))
+    modes = []
+    monkeypatch.setattr(
+        socketserver.ThreadingUnixStreamServer,
+        "serve_forever",
+        lambda _: modes.append(path.stat().st_mode),
+    )
+    server.serve_unix_socket(path)
+    assert [stat.filemode(mode) for mode in modes] == ["srw-------"]
+
+
+def test_serve_unix_socket_not_a_socket(server: Server, tmp_path: Path) -> None:
+    path = tmp_path / "server.sock"
+    path.write_text("data")
+    with pytest.raises(FileExistsError):
+        server.serve_unix_socket(path)
+    assert path.read_text() == "data"
@@ -0,0 +1,115 @@
+from typing import Any
+
+import pytest
+
+from external_resources_io.terraform.plan import Plan
+from external_resources_io.terraform.state import StateResource, StateView
+
+
+def _resource(address: str, **values: str) -> dict[str, Any]:
+    resource_type, name = address.rsplit(".", 2)[-2:]
+    return {
+        "address": address,
+        "mode": "managed",
+        "type": resource_type,
+        "name": name,
+        "provider_name": "registry.terraform.io/hashicorp/aws",
+        "values": values,
+    }
+
+
+@pytest.fixture
+def values() -> dict[str, Any]:
+    return {
+        "outputs": {"arn": {"sensitive": False, "value": "arn"}},
+        "root_module": {
+            "resources": [_resource("aws_s3_bucket.root", bucket="root")],
+            "child_modules": [
+                {
+                    "address": "module.a",
+                    "resources": [_resource("module.a.aws_s3_bucket.a", bucket="a")],
+                    "child_modules": [
+                        {
+                            "address": "module.a.module.b",
+                            "resources": [
+                                _resource("module.a.module.b.aws_iam_role.b", name="b")
+                            ],
+                        }
+                    ],
+                },
+                {
+                    "address": "module.c",
+                    "resources": [_resource("module.c.aws_s3_bucket.c", bucket="c")],
+                },
+            ],
+        },
+    }
+
+
+def test_state_view_iter(values: dict[str, Any]) -> None:
+    view = StateView(values)
+    assert [(r.address, r.module_address) for r in view] == [
+        ("aws_s3_bucket.root", None),
+        ("module.a.aws_s3_bucket.a", "module.a"),
+        ("module.a.module.b.aws_iam_role.b", "module.a.module.b"),
+        ("module.c.aws_s3_bucket.c", "module.c"),
+    ]
+    assert [r.address for r in view.of_type("aws_iam_role")] == [
+        "module.a.module.b.aws_iam_role.b"
+    ]
+    assert view.outputs == {"arn": {"sensitive": False, "value": "arn"}}
+
+
+def test_state_view_lookup(values: dict[str, Any]) -> None:
+    view = StateView(values)
+    assert len(view) == 4  # ruff: ignore[magic-value-comparison]
+    assert "module.c.aws_s3_bucket.c" in view
+    assert "module.c.aws_s3_bucket.missing" not in view
+    assert view.get("module.a.module.b.aws_iam_role.b") == StateResource(
+        address="module.a.module.b.aws_iam_role.b",
+        type="aws_iam_role",
+        name="b",
+        provider_name="registry.terraform.io/hashicorp/aws",
+        values={"name": "b"},
+        module_address="module.a.module.b",
+    )
+    assert view.get("module.c.aws_s3_bucket.missing") is None
+    assert view.attributes("module.a.aws_s3_bucket.a") == {"bucket": "a"}
+    assert view.attributes("module.c.aws_s3_bucket.missing") is None
+
+
+def test_state_view_empty() -> None:
+    view = StateView({})
+    assert list(view) == []
+    assert len(view) == 0
+    assert view.outputs == {}
+
+
+def test_state_view_deep_nesting() -> None:
+    module: dict[str, Any] = {"resources": [_resource("aws_s3_bucket.leaf")]}
+    for _ in range(5_000):
+        module = {"child_modules": [module]}
+    assert [r.address for r in StateView({"root_module": module})] == [
+        "aws_s3_bucket.leaf"
+    ]
+
+
+def test_plan_state_views(values: dict[str, Any]) -> None:
+    plan = Plan(
+        planned_values=values,
+        prior_state={"format_version": "1.0", "values": values},
+    )
+    assert plan.planned_values_view is plan.planned_values_view
+    assert plan.planned_values_view.attributes("aws_s3_bucket.root") == {
+        "bucket": "root"
+    }
+    assert plan.prior_state_view.attributes("module.c.aws_s3_bucket.c") == {
+        "bucket": "c"
+    }
+    assert list(Plan().prior_state_view) == []
+    # cached views are not part of the model
+    assert "prior_state_view" not in plan.model_dump()
+    assert plan == Plan(
+        planned_values=values,
+        prior_state={"format_version": "1.0", "values": values},
+    )
@@ -0,0 +1,233 @@
+import csv
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from external_resources_io.terraform.plan import Action
+from external_resources_io.terraform.stream import (
+    ExportFormat,
+    changed_attribute_paths,
+    export_resource_changes,
+    iter_raw_resource_changes,
+    iter_resource_changes,
+    plan_has_changes,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _change(address: str, *actions: str, **change: object) -> dict[str, Any]:
+    resource_type, name = address.rsplit(".", 2)[-2:]
+    return {
+        "address": address,
+        "module_address": address.rsplit(".", 2)[0] if "module." in address else None,
+        "type": resource_type,
+        "name": name,
+        "provider_name": "registry.terraform.io/hashicorp/aws",
+        "change": {"actions": list(actions), "after_unknown": {}, **change},
+    }
+
+
+PLAN: dict[str, Any] = {
+    "format_version": "1.2",
+    "planned_values": {
+        "root_module": {
+            "resources": [
+                {"values": {"tricky": 'a "quoted" } ] { [ \\ value', "n": 1.5e10}}
+            ]
+        }
+    },
+    "resource_drift": [],
+    "resource_changes": [
+        _change(
+            "aws_s3_bucket.b",
+            "update",
+            before={"tags": {"Name": "a", "Env": "x"}, "acl": "private"},
+            after={"tags": {"Name": "b", "Env": "x"}, "acl": "private"},
+            after_unknown={"arn": True},
+        ),
+        _change(
+            "module.m.aws_security_group.sg",
+            "delete",
+            "create",
+            before={"ingress": [{"cidr": "10.0.0.0/8"}]},
+            after={"ingress": [{"cidr": "0.0.0.0/0"}]},
+        ),
+        _change("aws_iam_role.r", "no-op", before={"name": "é ✓"}),
+    ],
+    "output_changes": {},
+    "prior_state": {"values": {"outputs": {"x": {"value": [1, 2, {"a": None}]}}}},
+    "errored": False,
+}
+
+
+@pytest.fixture
+def plan_file(tmp_path: Path) -> Path:
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps(PLAN, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_iter_raw_resource_changes_chunks(plan_file: Path, chunk_size: int) -> None:
+    # planned_values is skipped, resource_changes decoded across chunk boundaries
+    assert (
+        list(iter_raw_resource_changes(plan_file, chunk_size=chunk_size))
+        == PLAN["resource_changes"]
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5])
+@pytest.mark.parametrize("number", [-1.5e-07, 1.5, 12.25, 1e21, -0.0, 10, 2.5e300])
+def test_iter_raw_resource_changes_numbers(
+    tmp_path: Path, number: float, chunk_size: int
+) -> None:
+    # numbers whose prefix is a number too, e.g. "-1.5e" + "-07", are decoded
+    # as a whole across chunk boundaries, also when skipped
+    changes = [{"x": number, "y": [number, number]}, {"x": number}]
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(
+        json.dumps({"x": number, "y": number, "resource_changes": changes}),
+        encoding="utf-8",
+    )
+    assert list(iter_raw_resource_changes(plan_file, chunk_size=chunk_size)) == changes
+
+
+@pytest.mark.parametrize("document", ['{"planned_values": {"a": [1, 2', '{"a": "b'])
+def test_iter_raw_resource_changes_truncated(tmp_path: Path, document: str) -> None:
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(document, encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_raw_resource_changes(plan_file, chunk_size=4))
+
+
+def test_iter_resource_changes(plan_file: Path) -> None:
+    assert list(iter_raw_resource_changes(plan_file)) == PLAN["resource_changes"]
+    changes = list(iter_resource_changes(plan_file))
+    assert [rc.address for rc in changes] == [
+        "aws_s3_bucket.b",
+        "module.m.aws_security_group.sg",
+        "aws_iam_role.r",
+    ]
+    assert changes[1].change is not None
+    assert changes[1].change.actions == [Action.ActionDelete, Action.ActionCreate]
+
+
+def test_iter_resource_changes_empty(tmp_path: Path) -> None:
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text('{"format_version": "1.2"}', encoding="utf-8")
+    assert list(iter_raw_resource_changes(plan_file)) == []
+
+
+def test_changed_attribute_paths() -> None:
+    changes = PLAN["resource_changes"]
+    assert changed_attribute_paths(changes[0]["change"]) == ["tags.Name", "arn"]
+    assert changed_attribute_paths(changes[1]["change"]) == ["ingress.0.cidr"]
+    assert changed_attribute_paths({
+        "before": None,
+        "after": {"a": 1, "b": [1]},
+        "after_unknown": {},
+    }) == ["a", "b"]
+
+
+def test_export_jsonl(plan_file: Path, tmp_path: Path) -> None:
+    output = tmp_path / "changes.jsonl"
+    assert export_resource_changes(plan_file, output, plan_id="p1") == 3  # ruff: ignore[magic-value-comparison]
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert rows[0] == {
+        "plan": "p1",
+        "address": "aws_s3_bucket.b",
+        "type": "aws_s3_bucket",
+        "name": "b",
+        "module_address": None,
+        "provider_name": "registry.terraform.io/hashicorp/aws",
+        "actions": ["update"],
+    }
+    assert rows[1]["module_address"] == "module.m"
+
+    export_resource_changes(
+        plan_file, output, plan_id="p2", append=True, changed_attributes=True
+    )
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["plan"] for row in rows] == ["p1"] * 3 + ["p2"] * 3
+    assert rows[3]["changed_attributes"] == ["tags.Name", "arn"]
+
+
+def test_export_csv(plan_file: Path, tmp_path: Path) -> None:
+    output = tmp_path / "changes.csv"
+    for _ in range(2):
+        export_resource_changes(
+            plan_file,
+            output,
+            export_format=ExportFormat.CSV,
+            changed_attributes=True,
+            append=True,
+        )
+    with output.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 6  # ruff: ignore[magic-value-comparison]
+    assert rows[1] == {
+        "plan": str(plan_file),
+        "address": "module.m.aws_security_group.sg",
+        "type": "aws_security_group",
+        "name": "sg",
+        "module_address": "module.m",
+        "provider_name": "registry.terraform.io/hashicorp/aws",
+        "actions": "delete;create",
+        "changed_attributes": "ingress.0.cidr",
+    }
+
+    # without append, the output is replaced
+    export_resource_changes(plan_file, output, export_format=ExportFormat.CSV)
+    assert len(output.read_text(encoding="utf-8").splitlines()) == 4  # ruff: ignore[magic-value-comparison]
+
+
+def _write(tmp_path: Path, plan: dict[str, Any]) -> Path:
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(json.dumps(plan), encoding="utf-8")
+    return plan_file
+
+
+def test_plan_has_changes(plan_file: Path) -> None:
+    assert plan_has_changes(plan_file)
+
+
+@pytest.mark.parametrize("chunk_size", [3, 1 << 20])
+def test_plan_has_changes_no_op(tmp_path: Path, chunk_size: int) -> None:
+    plan = {
+        **PLAN,
+        "resource_changes": [
+            # actions keys in attribute values are no resource actions
+            _change(
+                "aws_iam_policy.p",
+                "no-op",
+                before={"statement": [{"actions": ["s3:GetObject"]}]},
+            ),
+            _change("aws_s3_bucket.b", "no-op"),
+        ],
+        "output_changes": {"arn": {"actions": ["no-op"], "after_unknown": False}},
+    }
+    assert not plan_has_changes(_write(tmp_path, plan), chunk_size=chunk_size)
+    plan["output_changes"]["arn"]["actions"] = ["update"]
+    assert plan_has_changes(_write(tmp_path, plan), chunk_size=chunk_size)
+
+
+def test_plan_has_changes_empty(tmp_path: Path) -> None:
+    assert not plan_has_changes(_write(tmp_path, {"format_version": "1.2"}))
+    assert not plan_has_changes(
+        _write(tmp_path, {"resource_changes": [], "output_changes": {}})
+    )
+
+
+def test_plan_has_changes_truncated(tmp_path: Path) -> None:
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(
+        json.dumps({"resource_changes": [_change("aws_s3_bucket.b", "no-op")] * 2})[
+            :-20
+        ],
+        encoding="utf-8",
+    )
+    with pytest.raises(json.JSONDecodeError):
+        plan_has_changes(plan_file)
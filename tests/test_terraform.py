@@ -1,21 +1,39 @@
+# ruff: file-ignore[import-private-name]
+import json
 import subprocess
-from typing import TYPE_CHECKING
+import sys
+from decimal import Decimal
+from typing import TYPE_CHECKING, Annotated
+from unittest.mock import Mock
 
 import pytest
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PlainSerializer,
+    SerializerFunctionWrapHandler,
+    computed_field,
+    field_serializer,
+    model_serializer,
+)
 
 from external_resources_io.config import EnvVar
 from external_resources_io.terraform.generators import (
+    SetEncoder,
+    _backend_tf,
+    canonical_tf_vars_json,
     create_backend_tf_file,
+    create_terraform_files,
     create_tf_vars_json,
     terraform_fmt,
+    tf_vars_digest,
 )
-from external_resources_io.terraform.run import terraform_run
+from external_resources_io.terraform.run import terraform_fmt_many, terraform_run
 
 if TYPE_CHECKING:
     from pathlib import Path
 
-    from pydantic import BaseModel
-
     from external_resources_io.input import AppInterfaceProvision
 
 
@@ -83,3 +101,159 @@ def test_terraform_run_error(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setenv("TERRAFORM_CMD", "ls")
     with pytest.raises(subprocess.CalledProcessError):
         terraform_run(["what ever - will throw an error"], dry_run=False)
+
+
+def test_terraform_fmt_many() -> None:
+    documents = ['variable "a" {\ntype = string\n}\n', 'variable "b" {\n}\n']
+    assert terraform_fmt_many(documents) == [terraform_fmt(d) for d in documents]
+
+
+def test_create_terraform_files(
+    provision_data: AppInterfaceProvision, data: BaseModel, tmp_path: Path
+) -> None:
+    ai_input = Mock(provision=provision_data, data=data)
+    files = create_terraform_files(
+        ai_input,
+        backend_tf_file=tmp_path / "backend.tf",
+        tf_vars_file=tmp_path / "terraform.tfvars.json",
+        variables_tf_file=tmp_path / "variables.tf",
+    )
+    assert (
+        files.backend_tf_file.read_text(encoding="utf-8")
+        == terraform_fmt_many([_backend_tf(provision_data)])[0]
+    )
+    assert files.tf_vars_file.read_text(encoding="utf-8") == data.model_dump_json()
+    assert 'variable "inline_policy"' in files.variables_tf_file.read_text(
+        encoding="utf-8"
+    )
+
+
+class StreamingModel(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str
+    optional: str | None = None
+    excluded: str = Field("excluded", exclude=True)
+    nested: dict[str, list[int]] = {}
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def computed(self) -> str:
+        return self.name.upper()
+
+
+@pytest.mark.parametrize("exclude_none", [True, False])
+def test_tf_vars_json_streaming(temp_file: Path, *, exclude_none: bool) -> None:
+    model = StreamingModel(name="foo", nested={"a": [1, 2]}, extra_field=None)
+    create_tf_vars_json(model, temp_file, exclude_none=exclude_none, streaming=True)
+    assert temp_file.read_text(encoding="utf-8") == model.model_dump_json(
+        exclude_none=exclude_none
+    )
+
+
+def test_tf_vars_json_streaming_fixture(data: BaseModel, temp_file: Path) -> None:
+    create_tf_vars_json(data, temp_file, streaming=True)
+    assert temp_file.read_text(encoding="utf-8") == data.model_dump_json(
+        exclude_none=True
+    )
+
+
+class SerializerModel(BaseModel):
+    a: int
+    b: str
+
+    @model_serializer(mode="wrap")
+    def _extra(self, handler: SerializerFunctionWrapHandler) -> dict[str, object]:
+        return {**handler(self), "extra": True}
+
+
+def test_tf_vars_json_streaming_model_serializer(temp_file: Path) -> None:
+    model = SerializerModel(a=1, b="x")
+    create_tf_vars_json(model, temp_file, streaming=True)
+    assert temp_file.read_text(encoding="utf-8") == '{"a":1,"b":"x","extra":true}'
+
+
+class CanonicalModel(BaseModel):
+    names: set[str]
+    ports: frozenset[int | str] = frozenset()
+    tags: dict[str, str] = {}
+    size: float = 1
+    price: Decimal = Decimal(0)
+    optional: str | None = None
+
+
+def test_canonical_tf_vars_json(temp_file: Path) -> None:
+    a = CanonicalModel(
+        names={"b", "a", "c"},
+        ports=frozenset({443, "80", 22}),
+        tags={"z": "1", "a": "2"},
+        size=2.0,
+        price=Decimal("1.50"),
+    )
+    b = CanonicalModel(
+        names={"c", "b", "a"},
+        ports=frozenset({22, "80", 443}),
+        tags={"a": "2", "z": "1"},
+        size=2,
+        price=Decimal("1.5"),
+    )
+    expected = (
+        b'{"names":["a","b","c"],"ports":["80",22,443],"price":"1.5","size":2,'
+        b'"tags":{"a":"2","z":"1"}}'
+    )
+    assert canonical_tf_vars_json(a) == canonical_tf_vars_json(b) == expected
+    assert tf_vars_digest(a) == tf_vars_digest(b)
+    assert tf_vars_digest(a) != tf_vars_digest(a, exclude_none=False)
+
+    create_tf_vars_json(a, temp_file, canonical=True)
+    assert temp_file.read_bytes() == expected
+    with pytest.raises(ValueError, match="can't be combined"):
+        create_tf_vars_json(a, temp_file, canonical=True, streaming=True)
+
+
+def test_canonical_tf_vars_json_hash_seed() -> None:
+    # the iteration order of string sets depends on the hash seed
+    code = (
+        "from tests.test_terraform import CanonicalModel;"
+        "from external_resources_io.terraform.generators import tf_vars_digest;"
+        "print(tf_vars_digest(CanonicalModel(names={str(i) for i in range(100)})))"
+    )
+    digests = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env={"PYTHONHASHSEED": seed},
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        for seed in ("1", "2", "3")
+    }
+    assert len(digests) == 1
+
+
+class JsonSerializerModel(BaseModel):
+    when: int
+    label: Annotated[int, PlainSerializer(lambda v: f"#{v}", when_used="json")]
+    children: list[CanonicalModel] = []
+
+    @field_serializer("when", when_used="json")
+    @staticmethod
+    def _when(value: int) -> str:
+        return f"v{value}"
+
+
+def test_canonical_tf_vars_json_serializers() -> None:
+    # the same values as model_dump_json, JSON only serializers applied
+    model = JsonSerializerModel(
+        when=5, label=1, children=[CanonicalModel(names={"b", "a"})]
+    )
+    assert canonical_tf_vars_json(model) == (
+        b'{"children":[{"names":["a","b"],"ports":[],"price":"0","size":1,'
+        b'"tags":{}}],"label":"#1","when":"v5"}'
+    )
+
+
+def test_set_encoder() -> None:
+    assert json.dumps({"s": {"b", "a"}, "f": frozenset({2, 1})}, cls=SetEncoder) == (
+        '{"s": ["a", "b"], "f": [1, 2]}'
+    )
@@ -5,16 +5,19 @@ from collections.abc import Sequence
 from typing import TYPE_CHECKING, Any, Literal
 
 import pytest
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, RootModel
 from pydantic_core import PydanticUndefined
 
 from external_resources_io.config import EnvVar
 from external_resources_io.terraform.generators import (
     _convert_json_to_hcl,
+    _convert_json_value_to_hcl,
     _generate_terraform_variable,
     _generate_terraform_variables_from_model,
     _get_terraform_type,
     create_variables_tf_file,
+    model_fingerprint,
+    variables_tf_up_to_date,
 )
 from external_resources_io.terraform.run import (
     terraform_available,
@@ -309,3 +312,77 @@ def test_create_variables_tf_file_output_env_var(
     monkeypatch.setenv(EnvVar.VARIABLES_TF_FILE, str(tf_file))
     create_variables_tf_file(sample_model)
     assert tf_file.exists()
+
+
+def test_create_variables_tf_file_fingerprint(
+    tmp_path: Path, sample_model: type[BaseModel]
+) -> None:
+    tf_file = tmp_path / "variables.tf"
+    assert not variables_tf_up_to_date(sample_model, tf_file)
+    create_variables_tf_file(sample_model, tf_file)
+    assert tf_file.read_text(encoding="utf-8").startswith(
+        f"# external-resources-io fingerprint: {model_fingerprint(sample_model)}\n"
+    )
+    assert variables_tf_up_to_date(sample_model, tf_file)
+    assert not variables_tf_up_to_date(NestedModel, tf_file)
+
+
+def test_create_variables_tf_file_skip_unchanged(
+    tmp_path: Path, sample_model: type[BaseModel]
+) -> None:
+    tf_file = tmp_path / "variables.tf"
+    create_variables_tf_file(sample_model, tf_file)
+    tf_file.write_text(tf_file.read_text(encoding="utf-8") + "# untouched\n")
+
+    create_variables_tf_file(sample_model, tf_file)
+    assert tf_file.read_text(encoding="utf-8").endswith("# untouched\n")
+
+    create_variables_tf_file(sample_model, tf_file, force=True)
+    assert not tf_file.read_text(encoding="utf-8").endswith("# untouched\n")
+
+
+def test_model_fingerprint() -> None:
+    class Model(BaseModel):
+        names: set[str] = {"a", "b", "c", "d"}
+
+    class OtherModel(BaseModel):
+        names: set[str] = {"a", "b", "c", "d"}
+        description: str = ""
+
+    assert model_fingerprint(Model) == model_fingerprint(Model)
+    assert model_fingerprint(Model) != model_fingerprint(OtherModel)
+
+
+def _outer_model(inner: type[BaseModel]) -> type[BaseModel]:
+    class Outer(BaseModel):
+        inner: inner  # type: ignore[valid-type]
+
+    return Outer
+
+
+def test_model_fingerprint_nested_change() -> None:
+    class Inner(BaseModel):
+        name: str
+
+    first = _outer_model(Inner)
+
+    class Inner(BaseModel):  # type: ignore[no-redef]
+        name: str
+        size: int
+
+    # same annotation repr, but a different variables.tf
+    assert model_fingerprint(first) != model_fingerprint(_outer_model(Inner))
+
+
+def test_convert_set_default_sorted() -> None:
+    assert _convert_json_value_to_hcl({"c", "a", "b"}) == '["a","b","c"]'
+    assert _convert_json_value_to_hcl(frozenset({2, 1})) == "[1,2]"
+
+
+def test_generate_terraform_variables_from_root_model() -> None:
+    class Ports(RootModel[list[int]]):
+        pass
+
+    assert _generate_terraform_variables_from_model(Ports) == {
+        "variable": {"root": {"type": "list(number)"}}
+    }